@@ -1,7 +1,173 @@
+import csv
+import json
 import os
 import tkinter as tk
 from tkinter import filedialog, messagebox, simpledialog, ttk
 
+from project_scaffold import DEFAULT_SCAFFOLD_SPEC, compute_scaffold, create_scaffold, load_scaffold_spec
+
+# --- Constants ---
+VISIBLE_ENTITY_ROWS = 6  # Rows each entity panel shows (and creates widgets for) at a time
+MAX_ROW_ACTIONS = 2  # Buttons per entity row
+ENTITY_TYPES = {  # Accepted values of the "type" column / JSON keys in bulk imports
+    "character": "characters", "characters": "characters",
+    "location": "locations", "locations": "locations",
+    "asset": "assets", "assets": "assets",
+}
+
+
+# --- Helper Functions ---
+def _split_subfolders(value):
+    return [part.strip() for part in (value or "").split(";") if part.strip()]
+
+
+def load_entities(import_path):
+    """Reads characters, locations and assets for bulk import from a CSV or JSON file.
+
+    CSV files need a header with "type" (character/location/asset) and "name" columns, plus
+    optionally "subfolders" (";"-separated) and "parent" (the row is a subfolder of that
+    location/asset). JSON files hold {"characters": [...], "locations": ..., "assets": ...},
+    where locations and assets are either {"name": [subfolders]} or a list of names or
+    {"name": ..., "subfolders": [...]} objects.
+
+    Returns:
+        {"characters": [names], "locations": {name: [subfolders]}, "assets": {name: [subfolders]}}
+    """
+    entities = {"characters": [], "locations": {}, "assets": {}}
+
+    def add(kind, name, subfolders=(), parent=None):
+        name = name.strip()
+        if not name:
+            return
+        if kind == "characters":
+            entities["characters"].append(name)
+        elif parent:
+            entities[kind].setdefault(parent.strip(), []).append(name)
+        else:
+            entities[kind].setdefault(name, []).extend(subfolders)
+
+    if import_path.lower().endswith(".json"):
+        with open(import_path, "r") as f:
+            data = json.load(f)
+        for key, items in data.items():
+            kind = ENTITY_TYPES.get(key.lower())
+            if kind is None:
+                raise ValueError(f"Unknown entity type '{key}' in {os.path.basename(import_path)}.")
+            if isinstance(items, dict):
+                items = [{"name": name, "subfolders": subfolders or []} for name, subfolders in items.items()]
+            for item in items:
+                if isinstance(item, str):
+                    add(kind, item)
+                else:
+                    add(kind, item["name"], item.get("subfolders", []))
+    else:
+        with open(import_path, "r", newline="") as f:
+            for line_number, row in enumerate(csv.DictReader(f), start=2):
+                kind = ENTITY_TYPES.get((row.get("type") or "").strip().lower())
+                if kind is None:
+                    raise ValueError(f"Line {line_number}: unknown entity type '{row.get('type')}'.")
+                add(kind, row.get("name") or "", _split_subfolders(row.get("subfolders")), row.get("parent"))
+
+    return entities
+
+
+class VirtualRowList(ttk.Frame):
+    """Scrollable list that only has widgets for the visible rows.
+
+    Rows are (key, text, indented, actions) tuples, where actions are (button text, action)
+    pairs. Clicking a button calls on_action(action, key). A fixed pool of row widgets is
+    re-bound as the list scrolls, and a slot is only reconfigured when its row changed, so
+    neither list length nor updates cost more than a screenful of widgets.
+    """
+
+    def __init__(self, parent, on_action, visible_rows=VISIBLE_ENTITY_ROWS, **kwargs):
+        super().__init__(parent, **kwargs)
+        self.on_action = on_action
+        self.visible_rows = visible_rows
+        self.rows = []
+        self.top = 0
+
+        self.scrollbar = ttk.Scrollbar(self, orient="vertical", command=self.on_scroll)
+        self.scrollbar.grid(row=0, column=MAX_ROW_ACTIONS + 1, rowspan=visible_rows, sticky="ns")
+
+        self.slots = []
+        for i in range(visible_rows):
+            label = tk.Label(self, anchor="w")
+            buttons = []
+            for j in range(MAX_ROW_ACTIONS):
+                button = tk.Button(self)
+                button.grid(row=i, column=j + 1, sticky="e", padx=5, pady=2)
+                button.grid_remove()
+                buttons.append(button)
+            label.grid(row=i, column=0, sticky="ew", padx=5, pady=2)
+            label.grid_remove()
+            self.slots.append({"label": label, "buttons": buttons, "row": None})
+
+        self.columnconfigure(0, weight=1)
+        for widget in [self] + [slot["label"] for slot in self.slots]:
+            widget.bind("<MouseWheel>", self.on_mousewheel)
+            widget.bind("<Button-4>", self.on_mousewheel)
+            widget.bind("<Button-5>", self.on_mousewheel)
+
+    def set_rows(self, rows):
+        """Replaces the rows; only visible slots whose row changed are redrawn."""
+        self.rows = rows
+        self.scroll_to(self.top)
+
+    def see(self, index):
+        """Scrolls so that the row at index is visible."""
+        if index < self.top:
+            self.scroll_to(index)
+        elif index >= self.top + self.visible_rows:
+            self.scroll_to(index - self.visible_rows + 1)
+
+    def scroll_to(self, top):
+        self.top = max(0, min(top, len(self.rows) - self.visible_rows))
+        self.refresh()
+
+    def refresh(self):
+        for i, slot in enumerate(self.slots):
+            index = self.top + i
+            row = self.rows[index] if index < len(self.rows) else None
+            if slot["row"] == row:
+                continue
+            slot["row"] = row
+
+            if row is None:
+                slot["label"].grid_remove()
+                for button in slot["buttons"]:
+                    button.grid_remove()
+                continue
+
+            key, text, indented, actions = row
+            slot["label"].config(text=text)
+            slot["label"].grid(padx=20 if indented else 5)
+            for j, button in enumerate(slot["buttons"]):
+                if j < len(actions):
+                    button_text, action = actions[j]
+                    button.config(text=button_text, command=lambda a=action, k=key: self.on_action(a, k))
+                    button.grid()
+                else:
+                    button.grid_remove()
+
+        if self.rows:
+            self.scrollbar.set(self.top / len(self.rows), min(1.0, (self.top + self.visible_rows) / len(self.rows)))
+        else:
+            self.scrollbar.set(0.0, 1.0)
+
+    def on_scroll(self, *args):
+        if args[0] == "moveto":
+            self.scroll_to(round(float(args[1]) * len(self.rows)))
+        elif args[0] == "scroll":
+            step = int(args[1]) * (self.visible_rows if args[2] == "pages" else 1)
+            self.scroll_to(self.top + step)
+
+    def on_mousewheel(self, event):
+        if event.num == 4 or event.delta > 0:
+            self.scroll_to(self.top - 1)
+        else:
+            self.scroll_to(self.top + 1)
+
 
 class FolderAutomationApp:
     def __init__(self, root):
@@ -13,6 +179,8 @@ class FolderAutomationApp:
         self.characters = []
         self.locations = {}
         self.assets = {}
+        self.scaffold_spec = DEFAULT_SCAFFOLD_SPEC
+        self.scaffold_spec_name = tk.StringVar(value="Built-in structure")
 
         # --- Style Configuration ---
         style = ttk.Style()
@@ -55,19 +223,27 @@ class FolderAutomationApp:
 
         # Characters
         self.characters_label = ttk.Label(main_frame, text="Characters:")
-        self.characters_frame = ttk.Frame(main_frame)
+        self.characters_frame = VirtualRowList(main_frame, self.on_character_action)
         self.add_character_button = ttk.Button(main_frame, text="+ Character", command=self.add_character)
 
         # Locations
         self.locations_label = ttk.Label(main_frame, text="Locations:")
-        self.locations_frame = ttk.Frame(main_frame)
+        self.locations_frame = VirtualRowList(main_frame, self.on_location_action)
         self.add_location_button = ttk.Button(main_frame, text="+ Location", command=self.add_location)
 
         # Assets
         self.assets_label = ttk.Label(main_frame, text="Assets:")
-        self.assets_frame = ttk.Frame(main_frame)
+        self.assets_frame = VirtualRowList(main_frame, self.on_asset_action)
         self.add_asset_button = ttk.Button(main_frame, text="+ Asset", command=self.add_asset)
 
+        # Bulk Import
+        self.import_button = ttk.Button(main_frame, text="Import CSV/JSON", command=self.import_entities)
+
+        # Scaffold Spec
+        self.spec_label = ttk.Label(main_frame, text="Scaffold Spec:")
+        self.spec_name_label = ttk.Label(main_frame, textvariable=self.scaffold_spec_name)
+        self.load_spec_button = ttk.Button(main_frame, text="Load Spec", command=self.load_spec)
+
         # Create Button
         self.create_button = ttk.Button(main_frame, text="Create Structure", command=self.create_folders)
 
@@ -96,8 +272,14 @@ class FolderAutomationApp:
         self.assets_frame.grid(row=4, column=1, sticky="ew", padx=5, pady=5)
         self.add_asset_button.grid(row=4, column=2, sticky="w", padx=5, pady=5)
 
-        # Create Button
-        self.create_button.grid(row=5, column=1, sticky="e", padx=5, pady=10)
+        # Scaffold Spec
+        self.spec_label.grid(row=5, column=0, sticky="w", padx=5, pady=5)
+        self.spec_name_label.grid(row=5, column=1, sticky="w", padx=5, pady=5)
+        self.load_spec_button.grid(row=5, column=2, sticky="w", padx=5, pady=5)
+
+        # Import and Create Buttons
+        self.import_button.grid(row=6, column=1, sticky="w", padx=5, pady=10)
+        self.create_button.grid(row=6, column=1, sticky="e", padx=5, pady=10)
 
         # Column Configuration
         root.columnconfigure(1, weight=1)
@@ -116,12 +298,14 @@ class FolderAutomationApp:
         if name:
             self.characters.append(name)
             self.update_character_widgets()
+            self.characters_frame.see(len(self.characters) - 1)
 
     def add_location(self):
         name = simpledialog.askstring("Location Name", "Enter Location Name:")
         if name:
             self.locations[name] = []
             self.update_location_widgets()
+            self.locations_frame.see(len(self.locations_frame.rows) - 1)
 
     def add_location_subfolder(self, location_name):
         subfolder_name = simpledialog.askstring("Sub-Location Name", f"Enter Sub-Location Name for {location_name}:")
@@ -134,6 +318,7 @@ class FolderAutomationApp:
         if name:
             self.assets[name] = []  # Initialize with an empty list of subfolders
             self.update_asset_widgets()
+            self.assets_frame.see(len(self.assets_frame.rows) - 1)
 
     def add_asset_subfolder(self, asset_name):
         subfolder_name = simpledialog.askstring("Sub-Asset Name", f"Enter Sub-Asset Name for {asset_name}:")
@@ -141,64 +326,68 @@ class FolderAutomationApp:
             self.assets[asset_name].append(subfolder_name)
             self.update_asset_widgets()
 
-    def update_character_widgets(self):
-        for widget in self.characters_frame.winfo_children():
-            widget.destroy()
-
-        # widgets based on character list
-        for i, name in enumerate(self.characters):
-            label = tk.Label(self.characters_frame, text=f"{i + 1}. {name}")
-            label.grid(row=i, column=0, sticky="w", padx=5, pady=2)
-
-            delete_button = tk.Button(self.characters_frame, text="Delete",
-                                      command=lambda idx=i: self.delete_character(idx))
-            delete_button.grid(row=i, column=1, sticky="e", padx=5, pady=2)
-
-    def update_location_widgets(self):
-        for widget in self.locations_frame.winfo_children():
-            widget.destroy()
+    def import_entities(self):
+        """Bulk imports characters, locations and assets from a CSV or JSON file."""
+        import_path = filedialog.askopenfilename(title="Select Entity List",
+                                                 filetypes=[("Entity lists", "*.csv *.json"), ("All files", "*.*")])
+        if not import_path:
+            return
 
-        row_num = 0
-        for location_name, subfolders in self.locations.items():
-            label = tk.Label(self.locations_frame, text=f"{location_name}:")
-            label.grid(row=row_num, column=0, sticky="w", padx=5, pady=2)
+        try:
+            entities = load_entities(import_path)
+        except Exception as e:
+            messagebox.showerror("Error", f"Error importing entities: {e}")
+            return
 
-            add_subfolder_button = tk.Button(self.locations_frame, text="+ Add Subfolder",
-                                             command=lambda name=location_name: self.add_location_subfolder(name))
-            add_subfolder_button.grid(row=row_num, column=1, sticky="w", padx=5, pady=2)
+        known = set(self.characters)
+        new_characters = [name for name in dict.fromkeys(entities["characters"]) if name not in known]
+        self.characters.extend(new_characters)
+        for target, imported in ((self.locations, entities["locations"]), (self.assets, entities["assets"])):
+            for name, subfolders in imported.items():
+                existing = target.setdefault(name, [])
+                existing.extend(sub for sub in dict.fromkeys(subfolders) if sub not in existing)
 
-            delete_button = tk.Button(self.locations_frame, text="Delete",
-                                      command=lambda name=location_name: self.delete_location(name))
-            delete_button.grid(row=row_num, column=2, sticky="e", padx=5, pady=2)
+        # One refresh per panel, however many entities were imported
+        self.update_character_widgets()
+        self.update_location_widgets()
+        self.update_asset_widgets()
+        messagebox.showinfo("Import", f"Imported {len(new_characters)} characters, "
+                                      f"{len(entities['locations'])} locations and {len(entities['assets'])} assets.")
+
+    @staticmethod
+    def folder_rows(folders):
+        """Rows for a location/asset panel: each folder followed by its subfolders."""
+        rows = []
+        for name, subfolders in folders.items():
+            rows.append((name, f"{name}:", False, (("+ Add Subfolder", "add_subfolder"), ("Delete", "delete"))))
+            rows.extend(((name, i), f"  - {subfolder_name}", True, ()) for i, subfolder_name in enumerate(subfolders))
+        return rows
 
-            for i, subfolder_name in enumerate(subfolders):
-                subfolder_label = tk.Label(self.locations_frame, text=f"  - {subfolder_name}")
-                subfolder_label.grid(row=row_num + i + 1, column=0, columnspan=3, sticky="w", padx=20, pady=1)  # Indent
+    def update_character_widgets(self):
+        self.characters_frame.set_rows([(i, f"{i + 1}. {name}", False, (("Delete", "delete"),))
+                                        for i, name in enumerate(self.characters)])
 
-            row_num += len(subfolders) + 1
+    def update_location_widgets(self):
+        self.locations_frame.set_rows(self.folder_rows(self.locations))
 
     def update_asset_widgets(self):
-        for widget in self.assets_frame.winfo_children():
-            widget.destroy()
-
-        row_num = 0
-        for asset_name, subfolders in self.assets.items():
-            label = tk.Label(self.assets_frame, text=f"{asset_name}:")
-            label.grid(row=row_num, column=0, sticky="w", padx=5, pady=2)
+        self.assets_frame.set_rows(self.folder_rows(self.assets))
 
-            add_subfolder_button = tk.Button(self.assets_frame, text="+ Add Subfolder",
-                                             command=lambda name=asset_name: self.add_asset_subfolder(name))
-            add_subfolder_button.grid(row=row_num, column=1, sticky="w", padx=5, pady=2)
+    def on_character_action(self, action, index):
+        if action == "delete":
+            self.delete_character(index)
 
-            delete_button = tk.Button(self.assets_frame, text="Delete",
-                                      command=lambda name=asset_name: self.delete_asset(name))
-            delete_button.grid(row=row_num, column=2, sticky="e", padx=5, pady=2)
+    def on_location_action(self, action, location_name):
+        if action == "add_subfolder":
+            self.add_location_subfolder(location_name)
+        elif action == "delete":
+            self.delete_location(location_name)
 
-            for i, subfolder_name in enumerate(subfolders):
-                subfolder_label = tk.Label(self.assets_frame, text=f"  - {subfolder_name}")
-                subfolder_label.grid(row=row_num + i + 1, column=0, columnspan=3, sticky="w", padx=20, pady=1)  # Indent
-
-            row_num += len(subfolders) + 1
+    def on_asset_action(self, action, asset_name):
+        if action == "add_subfolder":
+            self.add_asset_subfolder(asset_name)
+        elif action == "delete":
+            self.delete_asset(asset_name)
 
     def delete_character(self, index):
         del self.characters[index]
@@ -212,6 +401,30 @@ class FolderAutomationApp:
         del self.assets[asset_name]
         self.update_asset_widgets()
 
+    def load_spec(self):
+        """Loads a declarative scaffold spec (JSON or YAML) to create the structure from."""
+        spec_path = filedialog.askopenfilename(title="Select Scaffold Spec",
+                                               filetypes=[("Scaffold specs", "*.json *.yaml *.yml"),
+                                                          ("All files", "*.*")])
+        if not spec_path:
+            return
+
+        try:
+            self.scaffold_spec = load_scaffold_spec(spec_path)
+            self.scaffold_spec_name.set(os.path.basename(spec_path))
+        except Exception as e:
+            messagebox.showerror("Error", f"Error loading scaffold spec: {e}")
+
+    def scaffold_variables(self):
+        """Returns the GUI entries as variables for the scaffold spec."""
+        return {
+            "project": self.project_name.get(),
+            "characters": list(self.characters),
+            "locations": [{"name": name, "subfolders": list(subfolders)}
+                          for name, subfolders in self.locations.items()],
+            "assets": [{"name": name, "subfolders": list(subfolders)} for name, subfolders in self.assets.items()],
+        }
+
     def create_folders(self):
         """Handles the folder creation process."""
         project_path = self.project_path.get()
@@ -222,49 +435,11 @@ class FolderAutomationApp:
             return
 
         try:
-            # Create the core project folder
-            core_folder = os.path.join(project_path, project_name)
-            os.makedirs(core_folder, exist_ok=True)
-
-            # Create subfolders
-            characters_folder = os.path.join(core_folder, f"{project_name}_characters")
-            locations_folder = os.path.join(core_folder, f"{project_name}_locations")
-            assets_folder = os.path.join(core_folder, f"{project_name}_assets")
-            scripts_folder = os.path.join(core_folder, f"{project_name}_scripts")
-            misc_folder = os.path.join(core_folder, f"{project_name}_misc")
-
-            os.makedirs(characters_folder, exist_ok=True)
-            os.makedirs(locations_folder, exist_ok=True)
-            os.makedirs(assets_folder, exist_ok=True)
-            os.makedirs(scripts_folder, exist_ok=True)
-            os.makedirs(misc_folder, exist_ok=True)
-
-            # Create character folders
-            for name in self.characters:
-                char_folder = os.path.join(characters_folder, f"{project_name}_{name}")
-                os.makedirs(char_folder, exist_ok=True)
-
-            # Create location folders and their subfolders
-            for location_name, subfolders in self.locations.items():
-                loc_folder = os.path.join(locations_folder, f"{project_name}_{location_name}")
-                os.makedirs(loc_folder, exist_ok=True)
-
-                # Create subfolders within the location folder
-                for subfolder_name in subfolders:
-                    sub_folder_path = os.path.join(loc_folder, f"{project_name}_{subfolder_name}")
-                    os.makedirs(sub_folder_path, exist_ok=True)
-
-            # Create assets folders and their subfolders
-            for asset_name, subfolders in self.assets.items():
-                ass_folder = os.path.join(assets_folder, f"{project_name}_{asset_name}")
-                os.makedirs(ass_folder, exist_ok=True)
-
-                # Create subfolders within the location folder
-                for subfolder_name in subfolders:
-                    sub_folder_path = os.path.join(ass_folder, f"{project_name}_{subfolder_name}")
-                    os.makedirs(sub_folder_path, exist_ok=True)
-
-            messagebox.showinfo("Success", "Folders created successfully!")
+            # All paths are computed up front and created in one batch
+            directories, seeds = compute_scaffold(self.scaffold_spec, project_path, self.scaffold_variables())
+            created, copied = create_scaffold(directories, seeds)
+            messagebox.showinfo("Success", f"Folders created successfully! ({created} new folders, "
+                                           f"{copied} seed files)")
 
         except Exception as e:
             messagebox.showerror("Error", f"An error occurred: {e}")
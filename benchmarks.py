@@ -0,0 +1,256 @@
+import argparse
+import hashlib
+import os
+import shutil
+import tempfile
+import time
+from functools import partial
+
+# --- Constants ---
+DEFAULT_REPEATS = 20
+
+
+# --- Helper Functions ---
+def best_time(function, repeats=DEFAULT_REPEATS):
+    """Runs function `repeats` times and returns the fastest run in milliseconds."""
+    best = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        function()
+        elapsed = (time.perf_counter() - start) * 1000
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def print_table(headers, rows):
+    """Prints rows as an aligned plain-text table."""
+    rows = [[str(cell) for cell in row] for row in rows]
+    widths = [max(len(str(header)), *(len(row[i]) for row in rows)) for i, header in enumerate(headers)]
+    print("  ".join(str(header).ljust(width) for header, width in zip(headers, widths)))
+    print("  ".join("-" * width for width in widths))
+    for row in rows:
+        print("  ".join(cell.ljust(width) for cell, width in zip(row, widths)))
+
+
+# --- Benchmarks ---
+def benchmark_docs(args):
+    """Documentation rendering: full render vs. re-render after one small field changes."""
+    from markdown_templates import DEFAULT_TEMPLATE, DocumentTemplate
+    from project_documentation_generator import documentation_fields_from_metadata, format_crew, format_themes
+
+    with open(DEFAULT_TEMPLATE, "r", encoding="utf-8") as f:
+        source = f.read()
+
+    rows = []
+    for size in args.sizes:
+        metadata = {
+            "project_name": "Benchmark",
+            "project_description": "A project with a very large crew.",
+            "key_themes": ", ".join(f"theme {i}" for i in range(50)),
+            "crew": "\n".join(f"Crew Member {i} - Department {i % 12}" for i in range(size)),
+            "acknowledgements": "\n".join(f"Thanks to studio partner {i}." for i in range(size)),
+        }
+
+        def full_render():
+            # Fresh template and formatting caches, like the original f-string render
+            format_crew.cache_clear()
+            format_themes.cache_clear()
+            DocumentTemplate(source).render(documentation_fields_from_metadata(metadata))
+
+        template = DocumentTemplate(source)
+        template.render(documentation_fields_from_metadata(metadata))
+        keystrokes = iter(range(10 ** 9))
+
+        def partial_render():
+            # Typing in the client field: crew and acknowledgements come from the caches
+            template.render_sections(documentation_fields_from_metadata(dict(metadata, client=f"Client {next(keystrokes)}")))
+
+        full = best_time(full_render, args.repeats)
+        partial = best_time(partial_render, args.repeats)
+        rows.append([size, f"{full:.3f}", f"{partial:.3f}", f"{full / partial:.1f}x" if partial else "-"])
+
+    print_table(["crew/ack lines", "full render ms", "one-field re-render ms", "speedup"], rows)
+
+
+def sample_textures(size):
+    """Synthetic textures covering the usual cases: photographic noise, smooth gradients and flat masks."""
+    from PIL import Image, ImageDraw
+
+    noise = Image.merge("RGB", [Image.effect_noise((size, size), sigma) for sigma in (30, 40, 50)])
+    gradient = Image.linear_gradient("L").resize((size, size)).convert("RGB")
+    mask = Image.new("RGBA", (size, size), (0, 0, 0, 0))
+    draw = ImageDraw.Draw(mask)
+    for i in range(0, size // 2, max(size // 32, 1)):
+        draw.rectangle([i, i, size - 1 - i, size - 1 - i // 2], fill=(i % 256, 128, 255 - i % 256, 255))
+    return {"noise": noise, "gradient": gradient, "mask": mask}
+
+
+def benchmark_encode(args):
+    """Encoder presets: encode time vs. output size, per image."""
+    from PIL import Image
+
+    from encoder_presets import ENCODER_PRESETS, get_preset, mip_chain, prepare_for_format
+
+    if args.images:
+        images = {}
+        for path in args.images:
+            with Image.open(path) as img:
+                img.load()
+                images[os.path.basename(path)] = img.copy()
+    else:
+        images = sample_textures(args.size)
+    presets = args.presets or list(ENCODER_PRESETS)
+    temp_dir = tempfile.mkdtemp(prefix="encode_benchmark_")
+
+    rows = []
+    for image_name, img in images.items():
+        raw_size = len(img.tobytes())
+        for preset_name in presets:
+            preset = get_preset(preset_name)
+            prepared = prepare_for_format(img, preset["format"])
+            levels = [prepared] + [level_img for _, level_img in mip_chain(prepared, args.mips)]
+            output = {}
+
+            def encode():
+                # Written to real files, like the converter does
+                output["size"] = 0
+                for level, level_img in enumerate(levels):
+                    path = os.path.join(temp_dir, f"level{level}{preset['extension']}")
+                    level_img.save(path, preset["format"], **preset["options"])
+                    output["size"] += os.path.getsize(path)
+
+            elapsed = best_time(encode, args.repeats)
+            rows.append([image_name, preset_name, f"{elapsed:.1f}", f"{output['size'] / 1024:.0f}",
+                         f"{output['size'] / raw_size:.2%}"])
+
+    shutil.rmtree(temp_dir, ignore_errors=True)
+    print_table(["image", "preset", "encode ms", "size KiB", "of raw"], rows)
+
+
+def benchmark_quantize(args):
+    """PNG quantization: pngquant subprocess vs. Pillow in-process, per texture size."""
+    from texture_batch_optimising_tool import (QUALITY_VALUES, compress_texture, pngquant_available,
+                                               quantize_with_pillow)
+
+    quality = QUALITY_VALUES[args.quality]
+    backends = {"pillow": quantize_with_pillow}
+    if pngquant_available():
+        backends["pngquant"] = compress_texture
+    else:
+        print("pngquant is not installed, only the Pillow backend is measured.\n")
+
+    temp_dir = tempfile.mkdtemp(prefix="quantize_benchmark_")
+    rows = []
+    try:
+        for size in args.sizes:
+            for image_name, img in sample_textures(size).items():
+                source = os.path.join(temp_dir, f"{image_name}_{size}.png")
+                img.save(source)
+                for backend, quantize in backends.items():
+                    target = os.path.join(temp_dir, f"{image_name}_{size}_{backend}.png")
+
+                    def run():
+                        shutil.copyfile(source, target)  # Every run starts from the unquantized file
+                        quantize(target, quality)
+
+                    elapsed = best_time(run, args.repeats)
+                    rows.append([f"{size}x{size}", image_name, backend, f"{elapsed:.1f}",
+                                 f"{os.path.getsize(source) / 1024:.0f}", f"{os.path.getsize(target) / 1024:.0f}"])
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+    print_table(["size", "image", "backend", "ms per file", "input KiB", "output KiB"], rows)
+
+
+def benchmark_io(args):
+    """Bulk file I/O: file_ops copies and hashing vs. shutil.copy2 and plain read() loops."""
+    from file_ops import copy_contents, copy_file, hash_file
+
+    temp_dir = tempfile.mkdtemp(prefix="io_benchmark_", dir=args.target_dir)
+    rows = []
+    try:
+        files = args.files
+        if not files:
+            files = []
+            for size in args.sizes:
+                path = os.path.join(temp_dir, f"random_{size}mb.bin")
+                with open(path, "wb") as f:
+                    for _ in range(size):
+                        f.write(os.urandom(1024 * 1024))
+                files.append(path)
+
+        for path in files:
+            size = os.path.getsize(path)
+            target = os.path.join(temp_dir, "copy.tmp")
+
+            def plain_read(buffer_size):
+                # The loop hash_file used before: a new bytes object per chunk
+                digest = hashlib.sha256()
+                with open(path, "rb") as f:
+                    for chunk in iter(lambda: f.read(buffer_size), b""):
+                        digest.update(chunk)
+
+            kernel_method = copy_contents(path, target)  # What copy_file uses for this source and target
+            cases = [("copy", "shutil.copy2", lambda: shutil.copy2(path, target)),
+                     ("copy", f"copy_contents ({kernel_method})", partial(copy_contents, path, target)),
+                     ("copy", "copy_file (temp file + rename)", lambda: copy_file(path, target))]
+            cases += [("copy", f"read/write {kib} KiB", partial(copy_contents, path, target, kib * 1024, False))
+                      for kib in args.buffer_sizes]
+            cases += [("hash", f"read() {kib} KiB", partial(plain_read, kib * 1024)) for kib in args.buffer_sizes]
+            cases += [("hash", f"readinto {kib} KiB", partial(hash_file, path, chunk_size=kib * 1024, use_mmap=False))
+                      for kib in args.buffer_sizes]
+            cases.append(("hash", "mmap", lambda: hash_file(path, use_mmap=True)))
+
+            for operation, method, function in cases:
+                elapsed = best_time(function, args.repeats)
+                rows.append([os.path.basename(path), f"{size / (1024 * 1024):.0f}", operation, method,
+                             f"{elapsed:.1f}", f"{size / (1024 * 1024) / (elapsed / 1000):.0f}" if elapsed else "-"])
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+    print("Files are read from the page cache after the first run; best of "
+          f"{args.repeats} runs, copies written to {args.target_dir or tempfile.gettempdir()}.\n")
+    print_table(["file", "MB", "operation", "method", "ms", "MB/s"], rows)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Micro-benchmarks for the eli_lab tools.")
+    subparsers = parser.add_subparsers(dest="benchmark", required=True)
+
+    docs_parser = subparsers.add_parser("docs", help="Documentation template rendering.")
+    docs_parser.add_argument("--sizes", type=int, nargs="+", default=[10, 1000, 10000, 100000],
+                             help="Crew and acknowledgement list lengths to render.")
+    docs_parser.add_argument("--repeats", type=int, default=DEFAULT_REPEATS)
+    docs_parser.set_defaults(run=benchmark_docs)
+
+    encode_parser = subparsers.add_parser("encode", help="Converter encoder presets: encode time vs. output size.")
+    encode_parser.add_argument("--images", nargs="+", help="Images to encode (default: synthetic textures).")
+    encode_parser.add_argument("--size", type=int, default=1024, help="Side of the synthetic textures.")
+    encode_parser.add_argument("--presets", nargs="+", help="Presets to compare (default: all).")
+    encode_parser.add_argument("--mips", type=int, default=0, help="Also encode this many mip levels per image.")
+    encode_parser.add_argument("--repeats", type=int, default=3)
+    encode_parser.set_defaults(run=benchmark_encode)
+
+    quantize_parser = subparsers.add_parser("quantize", help="Texture optimiser backends: pngquant vs. Pillow.")
+    quantize_parser.add_argument("--sizes", type=int, nargs="+", default=[64, 256, 1024, 2048],
+                                 help="Texture sides to compare.")
+    quantize_parser.add_argument("--quality", default="Medium", help="Quality preset (see QUALITY_VALUES).")
+    quantize_parser.add_argument("--repeats", type=int, default=3)
+    quantize_parser.set_defaults(run=benchmark_quantize)
+
+    io_parser = subparsers.add_parser("io", help="Bulk copies and hashing (file_ops) vs. shutil.copy2 and read().")
+    io_parser.add_argument("--files", nargs="+", help="Files to copy and hash, e.g. large .blend and EXR files "
+                                                      "(default: random files of --sizes).")
+    io_parser.add_argument("--sizes", type=int, nargs="+", default=[16, 256], help="Random file sizes in MB.")
+    io_parser.add_argument("--buffer-sizes", type=int, nargs="+", default=[64, 1024, 8192],
+                           help="Read/write buffer sizes to compare, in KiB.")
+    io_parser.add_argument("--target-dir", help="Where copies are written (default: the temp folder).")
+    io_parser.add_argument("--repeats", type=int, default=3)
+    io_parser.set_defaults(run=benchmark_io)
+
+    args = parser.parse_args(argv)
+    args.run(args)
+
+
+if __name__ == "__main__":
+    main()
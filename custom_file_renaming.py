@@ -7,6 +7,10 @@ from tkinter import filedialog, messagebox
 
 import magic
 
+import instrumentation
+from profiling import profiled
+from run_logging import RunReport, reporting, setup_logging
+
 
 class AdvancedFileRenamer(ttk.Frame):
     """Custom File Renamer GUI."""
@@ -411,20 +415,33 @@ class AdvancedFileRenamer(ttk.Frame):
             self.file_listbox.insert(tk.END, f"{file_info['old_name']} --> {file_info['new_name']}")  # Show result
 
     def apply(self):
-        """renaming files"""
+        """renaming files; a file that cannot be renamed is reported at the end instead of stopping the rest"""
         if not self.selected_directory:
             messagebox.showerror("Error", "Please select a directory first.")
             return
 
+        report = RunReport("rename_files", self.selected_directory)
         try:
-            for file_info in self.file_list:
-                old_path = file_info["filepath"]
-                new_path = os.path.join(self.selected_directory, file_info["new_name"])
-                os.rename(old_path, new_path)
-
-            messagebox.showinfo("Success", "Files renamed successfully.")
+            with profiled("rename_files"), instrumentation.run("rename_files") as metrics, \
+                    reporting(report, metrics):
+                for file_info in self.file_list:
+                    old_path = file_info["filepath"]
+                    new_path = os.path.join(self.selected_directory, file_info["new_name"])
+                    try:
+                        with instrumentation.span("rename", file=file_info["old_name"]):
+                            os.rename(old_path, new_path)
+                    except OSError as e:
+                        report.error(file_info["old_name"], e)
+                        continue
+                    report.count("renamed")
+                    instrumentation.count("files")
         except Exception as e:
             messagebox.showerror("Error", f"Error during rename: {e}")
+        else:
+            if report.errors:
+                messagebox.showwarning("Warning", report.dialog_text())
+            else:
+                messagebox.showinfo("Success", "Files renamed successfully.")
         finally:
             self.populate_file_list()
 
@@ -435,6 +452,7 @@ def integrate_renamer(main_frame):
 
 
 if __name__ == "__main__":
+    setup_logging()
     root = tk.Tk()
     root.title("Advanced File Renamer")
     root.geometry("900x600")
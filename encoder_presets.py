@@ -0,0 +1,87 @@
+import os
+import zlib
+
+# --- Constants ---
+# Each preset names a Pillow format, the file extension it writes and the encoder options passed to save().
+# PNG "compress_type" is the zlib strategy: Z_RLE and Z_FILTERED trade ratio for speed on flat/noisy textures.
+ENCODER_PRESETS = {
+    "PNG": {"format": "PNG", "extension": ".png", "options": {}},  # Pillow defaults (zlib level 6)
+    "PNG Fast": {"format": "PNG", "extension": ".png", "options": {"compress_level": 1}},
+    "PNG RLE": {"format": "PNG", "extension": ".png", "options": {"compress_level": 6, "compress_type": zlib.Z_RLE}},
+    "PNG Filtered": {"format": "PNG", "extension": ".png",
+                     "options": {"compress_level": 9, "compress_type": zlib.Z_FILTERED}},
+    "PNG Smallest": {"format": "PNG", "extension": ".png", "options": {"optimize": True}},
+    "WebP Lossless": {"format": "WEBP", "extension": ".webp", "options": {"lossless": True, "quality": 80, "method": 4}},
+    "WebP Lossy": {"format": "WEBP", "extension": ".webp", "options": {"quality": 90, "method": 4}},
+    # No "optimize" with 4:4:4 subsampling: Pillow's encoder buffer overflows on noisy images
+    "JPEG High": {"format": "JPEG", "extension": ".jpg", "options": {"quality": 92, "subsampling": 0}},
+    "JPEG Medium": {"format": "JPEG", "extension": ".jpg", "options": {"quality": 80, "optimize": True}},
+}
+DEFAULT_PRESET = "PNG"  # Same output as the converter's original save(..., "PNG")
+MAX_MIP_LEVELS = 8
+MIP_SUFFIX = "_mip"  # wood.png -> wood_mip1.png (half size), wood_mip2.png (quarter size), ...
+
+
+# --- Helper Functions ---
+def get_preset(name):
+    """Returns a preset by name, raising ValueError for unknown names."""
+    try:
+        return ENCODER_PRESETS[name]
+    except KeyError:
+        raise ValueError(f"Unknown encoder preset '{name}', expected one of {list(ENCODER_PRESETS)}") from None
+
+
+def output_path(filepath, output_dir, preset_name=DEFAULT_PRESET):
+    """Returns the path a source image is written to with a preset."""
+    name, _ = os.path.splitext(os.path.basename(filepath))
+    return os.path.join(output_dir, name + get_preset(preset_name)["extension"])
+
+
+def mip_path(path, level):
+    """Returns the path of a mip level next to an output file."""
+    base, extension = os.path.splitext(path)
+    return f"{base}{MIP_SUFFIX}{level}{extension}"
+
+
+def prepare_for_format(img, image_format):
+    """Converts an image to a mode the format can store (JPEG has no alpha, WebP only 8-bit RGB(A))."""
+    has_alpha = "A" in img.mode or "transparency" in img.info
+    if image_format == "JPEG" and img.mode not in ("RGB", "L", "CMYK"):
+        return img.convert("RGB")
+    if image_format == "WEBP" and img.mode not in ("RGB", "RGBA"):
+        return img.convert("RGBA" if has_alpha else "RGB")
+    return img
+
+
+def prepare_for_reduce(img):
+    """Converts an image to a mode whose pixels can be averaged (palette indices and 1-bit pixels cannot)."""
+    if img.mode in ("P", "PA"):
+        return img.convert("RGBA" if img.mode == "PA" or "transparency" in img.info else "RGB")
+    if img.mode == "1":
+        return img.convert("L")
+    if img.mode.startswith("I;16"):
+        return img.convert("I")
+    return img
+
+
+def mip_chain(img, levels):
+    """Yields (level, image) for up to `levels` successively halved copies of an image.
+
+    Each level is a 2x2 box filter of the previous one (Image.reduce), which is the usual mip
+    filter and much cheaper than resampling from the full-size source every time. The chain
+    stops once a side would drop below one pixel. Pass the image already prepared for the
+    output format (see prepare_for_format); palette, 1-bit and 16-bit images are converted
+    to a mode reduce supports first.
+    """
+    img = prepare_for_reduce(img)
+    for level in range(1, min(levels, MAX_MIP_LEVELS) + 1):
+        if img.width < 2 or img.height < 2:
+            return
+        img = img.reduce(2)
+        yield level, img
+
+
+def encode_image(img, path, preset_name=DEFAULT_PRESET):
+    """Saves an image with a preset's format and encoder options."""
+    preset = get_preset(preset_name)
+    prepare_for_format(img, preset["format"]).save(path, preset["format"], **preset["options"])
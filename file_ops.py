@@ -0,0 +1,222 @@
+import errno
+import hashlib
+import json
+import mmap
+import os
+import shutil
+import sys
+
+# --- Constants ---
+COPY_MODES = ("copy", "reflink", "hardlink")
+FICLONE = 0x40049409  # Linux ioctl that shares extents between two files (btrfs, XFS, bcachefs ...)
+COPY_BUFFER_SIZE = 1024 * 1024  # Buffer of the read/write copy, when the kernel cannot copy in place
+HASH_BUFFER_SIZE = 1024 * 1024  # Read size when hashing
+MMAP_MIN_SIZE = 4 * 1024 * 1024  # With use_mmap, files this large are hashed through a memory map
+KERNEL_COPY_CHUNK = 64 * 1024 * 1024  # Bytes per copy_file_range/sendfile call
+# Errors meaning "the kernel cannot copy between these files", after which the next method is tried
+KERNEL_COPY_UNSUPPORTED = {errno.EINVAL, errno.ENOSYS, errno.EOPNOTSUPP, errno.EXDEV, errno.ENOTSOCK, errno.EBADF}
+
+
+# --- Helper Functions ---
+def _reflink(source, destination):
+    """Clones source into destination without copying data. Raises OSError if unsupported."""
+    if not sys.platform.startswith("linux"):
+        raise OSError(errno.EOPNOTSUPP, "reflink is only implemented for Linux")
+
+    import fcntl
+
+    with open(source, "rb") as src, open(destination, "wb") as dst:
+        fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+    shutil.copystat(source, destination)
+
+
+def _remove_quietly(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+def _kernel_copy(copy_chunk, size):
+    """Calls copy_chunk(offset) until it copies nothing more; False if the kernel cannot copy these files."""
+    copied = 0
+    try:
+        while True:
+            count = copy_chunk(copied)
+            if not count:
+                break
+            copied += count
+    except OSError as e:
+        if copied or e.errno not in KERNEL_COPY_UNSUPPORTED:
+            raise
+        return False
+    return copied > 0 or size == 0  # Some filesystems report 0 bytes instead of an error
+
+
+def _copy_buffered(src, dst, buffer_size):
+    buffer = bytearray(buffer_size)
+    view = memoryview(buffer)
+    while True:
+        count = src.readinto(buffer)
+        if not count:
+            break
+        dst.write(view[:count])
+
+
+def copy_contents(source, destination, buffer_size=COPY_BUFFER_SIZE, kernel=True):
+    """Copies the data of source into destination (created or truncated); no metadata.
+
+    The copy stays in the kernel when it can: os.copy_file_range (Linux; on NFS 4.2, SMB,
+    btrfs and XFS it can be a server-side copy or an extent clone), then os.sendfile. Otherwise
+    the data goes through one reused buffer of buffer_size bytes.
+
+    Args:
+        source: The file to copy.
+        destination: The file to write.
+        buffer_size: Buffer of the read/write fallback.
+        kernel: Try the kernel copies first (False forces the read/write loop, for benchmarks).
+
+    Returns:
+        The method used: "copy_file_range", "sendfile" or "read".
+    """
+    with open(source, "rb") as src, open(destination, "wb") as dst:
+        src_fd, dst_fd = src.fileno(), dst.fileno()
+        size = os.fstat(src_fd).st_size
+        if kernel and hasattr(os, "copy_file_range"):
+            if _kernel_copy(lambda offset: os.copy_file_range(src_fd, dst_fd, KERNEL_COPY_CHUNK), size):
+                return "copy_file_range"
+        if kernel and hasattr(os, "sendfile"):
+            if _kernel_copy(lambda offset: os.sendfile(dst_fd, src_fd, offset, KERNEL_COPY_CHUNK), size):
+                return "sendfile"
+        _copy_buffered(src, dst, buffer_size)
+        return "read"
+
+
+def copy_file(source, destination, mode="copy"):
+    """Copies a file, optionally as a reflink or hard link.
+
+    "reflink" and "hardlink" fall back to a regular copy when the filesystem does not support
+    them (or source and destination are on different devices). Hard links share the inode
+    with the source, which is only safe for files that are replaced on save rather than
+    rewritten in place (Blender saves through a temporary file, so .blend files are fine).
+
+    The result is written next to the destination and renamed over it, so an existing
+    destination is never written through (it may itself be a hard link to the source).
+
+    Args:
+        source: The file to copy.
+        destination: The target file path (replaced if it exists).
+        mode: One of COPY_MODES.
+
+    Returns:
+        The mode that was actually used.
+    """
+    if mode not in COPY_MODES:
+        raise ValueError(f"Unknown copy mode '{mode}', expected one of {COPY_MODES}")
+
+    temp_path = f"{destination}.{os.getpid()}.tmp"
+    _remove_quietly(temp_path)
+    used_mode = "copy"
+    try:
+        if mode == "reflink":
+            try:
+                _reflink(source, temp_path)
+                used_mode = "reflink"
+            except OSError:
+                _remove_quietly(temp_path)
+        elif mode == "hardlink":
+            try:
+                os.link(source, temp_path)
+                used_mode = "hardlink"
+            except OSError:
+                _remove_quietly(temp_path)
+
+        if used_mode == "copy":
+            copy_contents(source, temp_path)
+            shutil.copystat(source, temp_path)  # Preserve metadata, like shutil.copy2
+        os.replace(temp_path, destination)
+    except BaseException:
+        _remove_quietly(temp_path)
+        raise
+    return used_mode
+
+
+def hash_file(path, algorithm="sha256", chunk_size=HASH_BUFFER_SIZE, use_mmap=False):
+    """Returns the hex digest of a file's contents.
+
+    The file is read into one reused buffer of chunk_size bytes. With use_mmap, files of
+    MMAP_MIN_SIZE or more are hashed straight from a read-only memory map instead. Only use
+    that for local files nobody else writes: if a mapped file is truncated (e.g. by another
+    node on the shared project mount), the process is killed by SIGBUS instead of getting
+    an OSError.
+    """
+    digest = hashlib.new(algorithm)
+    with open(path, "rb") as f:
+        if use_mmap and os.fstat(f.fileno()).st_size >= MMAP_MIN_SIZE:
+            try:
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except (OSError, ValueError):
+                mapped = None  # e.g. a filesystem without mmap support
+            if mapped is not None:
+                with mapped:
+                    if hasattr(mmap, "MADV_SEQUENTIAL"):
+                        mapped.madvise(mmap.MADV_SEQUENTIAL)  # Read ahead aggressively, drop pages behind
+                    digest.update(mapped)
+                return digest.hexdigest()
+
+        buffer = bytearray(chunk_size)
+        view = memoryview(buffer)
+        while True:
+            count = f.readinto(buffer)
+            if not count:
+                break
+            digest.update(view[:count])
+    return digest.hexdigest()
+
+
+def fsync_file(path):
+    """Flushes a file's data to disk."""
+    fd = os.open(path, os.O_RDONLY if os.name == "posix" else os.O_RDWR)  # Windows needs write access
+
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def fsync_directory(path):
+    """Flushes a directory's entries (renames, new and removed files) to disk; a no-op off POSIX."""
+    if os.name != "posix":
+        return
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def write_text_atomic(path, text, fsync=False):
+    """Writes text to a temp file next to path and renames it into place.
+
+    With fsync the data (and on POSIX the directory entry) is flushed to disk before the
+    call returns, so a crash leaves either the old or the new file, never a torn one.
+    """
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(temp_path, "w") as f:
+            f.write(text)
+            if fsync:
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(temp_path, path)
+    except BaseException:
+        _remove_quietly(temp_path)
+        raise
+
+    if fsync:
+        fsync_directory(os.path.dirname(os.path.abspath(path)))
+
+
+def write_json_atomic(path, data, fsync=False):
+    """Writes JSON to a temp file next to path and renames it into place (see write_text_atomic)."""
+    write_text_atomic(path, json.dumps(data, indent=4), fsync)
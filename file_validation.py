@@ -1,9 +1,17 @@
 import json
+import logging
 import os
-import threading
 import tkinter as tk
 from tkinter import filedialog, messagebox, ttk
 
+import instrumentation
+import metadata_store
+from job_runtime import DONE, JobRuntime
+from run_logging import setup_logging
+from thumbnail_cache import PREVIEW_SIZE, get_thumbnail, is_cacheable
+
+logger = logging.getLogger(__name__)
+
 # --- Constants ---
 VALIDATION_FILE = "folder_validation.json"
 DEFAULT_FONT = ("Bahnschrift", 10)
@@ -22,20 +30,26 @@ def get_folder_size(start_path='.'):
 
 
 def analyze_directory(root_directory):
-    """Analyzes a directory and its subdirectories, returning file metadata."""
+    """Analyzes a directory and its subdirectories, returning file metadata.
+
+    Each folder's scan is timed as one span (see instrumentation); a stat is too cheap to time per file.
+    """
     files = {}
-    for dirpath, dirnames, filenames in os.walk(root_directory):
-        for filename in filenames:
-            filepath = os.path.join(dirpath, filename)
-            # Calculate relative path
-            relative_path = os.path.relpath(filepath, root_directory)
-            try:
-                files[relative_path] = {
-                    "size": os.path.getsize(filepath),
-                    "modified": os.path.getmtime(filepath)
-                }
-            except Exception as e:
-                print(f"Error analyzing file {filepath}: {e}")
+    with instrumentation.run("analyze_directory"):
+        for dirpath, dirnames, filenames in os.walk(root_directory):
+            with instrumentation.span("scan_folder", folder=os.path.relpath(dirpath, root_directory)):
+                for filename in filenames:
+                    filepath = os.path.join(dirpath, filename)
+                    # Calculate relative path
+                    relative_path = os.path.relpath(filepath, root_directory)
+                    try:
+                        files[relative_path] = {
+                            "size": os.path.getsize(filepath),
+                            "modified": os.path.getmtime(filepath)
+                        }
+                    except Exception as e:
+                        logger.error(f"Error analyzing file {filepath}: {e}")
+            instrumentation.count("files", len(filenames))
     return files
 
 
@@ -48,7 +62,7 @@ def load_validation_data(directory):
     except FileNotFoundError:
         return {"files": {}}  # Default empty state if no JSON
     except Exception as e:
-        print(f"Error loading validation {e}")
+        logger.error(f"Error loading validation {e}")
         return {"files": {}}
 
 
@@ -59,7 +73,7 @@ def save_validation_data(directory, data):
         with open(filepath, 'w') as f:
             json.dump(data, f, indent=4)
     except Exception as e:
-        print(f"Error saving validation data to {filepath}: {e}")
+        logger.error(f"Error saving validation data to {filepath}: {e}")
 
 
 def compare_directory(directory):
@@ -104,14 +118,12 @@ def chip_directory(directory):
 
     # Load project metadata from project_metadata.json if it exists
     metadata = {}
-    metadata_path = os.path.join(directory, "project_metadata.json")  # Assuming metadata is in same directory for now
     try:
-        with open(metadata_path, 'r') as f:
-            metadata = json.load(f)
+        metadata = metadata_store.load_metadata(directory)  # Assuming metadata is in same directory for now
     except FileNotFoundError:
-        print("project_metadata.json not found in this directory. Skipping.")  # Inform if it was not found
+        logger.info("project_metadata.json not found in this directory. Skipping.")  # Inform if it was not found
     except Exception as e:
-        print(f"Error loading project_metadata.json: {e}")
+        logger.error(f"Error loading project_metadata.json: {e}")
 
     # Save validation data, including metadata and version, in a structured way
     validation_data = {
@@ -120,171 +132,241 @@ def chip_directory(directory):
         "files": files,  # List of files and their metadata
     }
     save_validation_data(directory, validation_data)
-    messagebox.showinfo("Info", f"Directory '{os.path.basename(directory)}' chipped successfully.")
 
 
-# --- GUI Integration ---
-def display_directory_structure(root_directory, tree):
-    """Populates the Tkinter Treeview with the project structure and statuses."""
-    tree.delete(*tree.get_children())
-    status_cache = {}  # Cache status for each directory to avoid repeated calculations
+def scan_directory_structure(root_directory, job=None):
+    """Walks the project and returns the rows of the status tree, without touching any widget.
+
+    Returns:
+        A list of (parent_key, key, text, tag, is_directory) rows, parents before children.
+        Keys are paths relative to root_directory ("" is the root).
+    """
+    with instrumentation.run("scan_directory_structure"):  # The analyses of every folder add to one run
+        return _scan_directory_structure(root_directory, job)
+
+
+def _scan_directory_structure(root_directory, job):
+    rows = []
 
-    def add_node(parent, directory):
-        """Recursively add directory structure to Treeview, displaying file statuses."""
+    def add_node(parent_key, directory):
+        """Recursively collects the directory structure with file statuses."""
+        if job is not None:
+            job.check()
         try:
-            status = status_cache[directory] if directory in status_cache else compare_directory(
-                directory)  # Compare whole directory at once
+            status = compare_directory(directory)  # Compare whole directory at once
         except Exception as e:  # handle errors in directories and write
-            print(f"Error during analysis: {e}")
+            logger.error(f"Error during analysis: {e}")
             return
 
         for item in os.listdir(directory):
             item_path = os.path.join(directory, item)
             tag = "valid"
-            if item == VALIDATION_FILE:
+            if item in (VALIDATION_FILE, metadata_store.LOCK_FILE):
                 continue
             if item in status:
                 tag = status[item]
 
             text = item  # Default text is just the item name
-            # Add tag to display in tkinter
+            key = os.path.join(parent_key, item) if parent_key else item
 
             if os.path.isfile(item_path):
                 if tag != "valid":  # Check for not valid (new, modified, deleted)
                     text = f"[{tag.upper()}] {text}"  # Prepend status to the file name
-                tree.insert(parent, 'end', text=text, tags=(tag,))
+                rows.append((parent_key, key, text, tag, False))
             elif os.path.isdir(item_path):
-                node_id = tree.insert(parent, 'end', text=text, open=False, tags=(tag,))
-                add_node(node_id, item_path)
+                rows.append((parent_key, key, text, tag, True))
+                add_node(key, item_path)
 
     add_node("", root_directory)
+    return rows
+
+
+# --- GUI Integration ---
+def populate_tree(tree, rows):
+    """Fills the Tkinter Treeview with rows from scan_directory_structure (Tk thread only).
+
+    Item ids are the relative paths, so a selection maps straight back to its file.
+    """
+    tree.delete(*tree.get_children())
+    for parent_key, key, text, tag, is_directory in rows:
+        if is_directory:
+            tree.insert(parent_key, 'end', iid=key, text=text, open=False, tags=(tag,))
+        else:
+            tree.insert(parent_key, 'end', iid=key, text=text, tags=(tag,))
+
+
+def display_directory_structure(root_directory, tree):
+    """Populates the Tkinter Treeview with the project structure and statuses."""
+    populate_tree(tree, scan_directory_structure(root_directory))
+
+
+def main():
+    setup_logging()
+
+    # --- GUI Setup ---
+    root = tk.Tk()
+    root.title("Project Analyzer")
+    root.geometry("1000x600")
+
+    # --- Styling ---
+    style = ttk.Style(root)
+    style.theme_use('clam')
+
+    # Color scheme
+    bg_color = '#2e2e2e'
+    fg_color = 'white'
+    text_color = '#d3d3d3'
+    button_bg_color = '#4a4a4a'
+    entry_bg_color = "#4a4a4a"
+    button_active_bg_color = '#606060'
+    new_color = '#A9A9A9'  # Dark Gray
+    modified_color = '#FFFF00'  # Yellow
+    deleted_color = '#FF0000'  # Red
+    valid_color = '#00FF00'  # Green
+
+    style.configure('.', background=bg_color, foreground=fg_color, font=DEFAULT_FONT)
+    style.configure('TLabel', background=bg_color, foreground=fg_color, padding=5, font=("Bahnschrift", 12))
+    style.configure('TButton', background=button_bg_color, foreground=fg_color, padding=8, relief='flat',
+                    font=("Bahnschrift", 11), borderwidth=0, focuscolor='gray',
+                    activebackground=button_active_bg_color, activeforeground=fg_color)
+    style.map('TButton',
+              background=[('active', button_active_bg_color), ('disabled', button_bg_color)],
+              foreground=[('disabled', 'gray')])
+    style.configure('TEntry', fieldbackground=entry_bg_color, foreground=text_color, font=("Bahnschrift", 11))
+    style.configure('Horizontal.TProgressbar', troughcolor=button_bg_color, background=fg_color)
+
+    # --- Main Frame ---
+    main_frame = ttk.Frame(root, padding=20)
+    main_frame.pack(expand=True, fill='both')
+
+    # --- Folder Selection ---
+    folder_label = ttk.Label(main_frame, text="Project Folder:")
+    folder_label.pack(pady=(0, 5), fill='x')
+
+    folder_path_entry = ttk.Entry(main_frame, width=50)
+    folder_path_entry.pack(pady=(0, 5), fill='x')
+
+    def browse_folder():
+        folder_path = filedialog.askdirectory()
+        if folder_path:
+            folder_path_entry.delete(0, tk.END)
+            folder_path_entry.insert(0, folder_path)
+
+    browse_button = ttk.Button(main_frame, text="Browse", command=browse_folder)
+    browse_button.pack(pady=(0, 10), fill='x')
+
+    # --- Treeview Widget ---
+    tree_frame = ttk.Frame(main_frame)
+    tree_frame.pack(expand=True, fill='both')
+
+    tree = ttk.Treeview(tree_frame, show="tree", padding=5)
+    tree.pack(side='left', expand=True, fill='both')
+
+    # --- Image Preview ---
+    # Previews come from the thumbnail cache, so browsing never decodes full-resolution sources twice
+    preview_label = ttk.Label(tree_frame, text="No preview", anchor='center', width=PREVIEW_SIZE // 8)
+    preview_label.pack(side='right', fill='y', padx=(10, 0))
+    preview = {"path": None, "image": None}
+
+    # Define treeview tags and colors
+    tree.tag_configure('new', foreground=new_color)
+    tree.tag_configure('modified', foreground=modified_color)
+    tree.tag_configure('deleted', foreground=deleted_color)
+    tree.tag_configure('valid', foreground=valid_color)  # if it's checked and no changes, show
+
+    # --- Button Functions ---
+    runtime = JobRuntime()
+
+    def set_buttons_state(state):
+        analyze_button["state"] = state
+        chip_button["state"] = state
+        browse_button["state"] = state
+        refresh_button["state"] = state
+
+    def show_scan_result(job, project_directory, chipped=False):
+        """Job completion handler (runs on the Tk thread)."""
+        set_buttons_state("normal")
+        if job.state != DONE:
+            if job.error is not None:
+                messagebox.showerror("Error", f"Error analyzing '{project_directory}': {job.error}")
+            return
+        populate_tree(tree, job.result)
+        if chipped:
+            messagebox.showinfo("Info", f"Directory '{os.path.basename(project_directory)}' chipped successfully.")
+
+    def analyze_project():
+        project_directory = folder_path_entry.get()
+        if not project_directory:
+            messagebox.showerror("Error", "Please select a project folder.")
+            return
+
+        # GUI DISABLE
+        set_buttons_state("disabled")
+
+        # The scan runs as a job; the tree is filled on the Tk thread once it is done
+        runtime.submit(lambda job: scan_directory_structure(project_directory, job), name="Analyze Project",
+                       on_done=lambda job: show_scan_result(job, project_directory))
+
+    def chip_selected_directory():
+        project_directory = folder_path_entry.get()  # gets the dirr
+        if not project_directory:
+            messagebox.showerror("Error", "Please select a project folder.")  # message
+            return
+
+        def chip_and_scan(job):
+            chip_directory(project_directory)  # Just "chip" the main directory
+            return scan_directory_structure(project_directory, job)  # display directory
+
+        # Disabe the buttons
+        set_buttons_state("disabled")
+
+        runtime.submit(chip_and_scan, name="Chip Directory",
+                       on_done=lambda job: show_scan_result(job, project_directory, chipped=True))
+
+    def show_preview(job, path):
+        """Job completion handler: shows the thumbnail if the file is still selected."""
+        if preview["path"] != path:
+            return
+        if job.state != DONE or job.result is None:
+            preview_label.configure(image="", text="No preview")
+            return
+        try:
+            preview["image"] = tk.PhotoImage(file=job.result)  # Keep a reference, Tk does not
+        except tk.TclError as e:
+            logger.warning(f"Error showing preview of '{path}': {e}")
+            return
+        preview_label.configure(image=preview["image"], text="")
+
+    def preview_selected(event=None):
+        selection = tree.selection()
+        project_directory = folder_path_entry.get()
+        path = os.path.join(project_directory, selection[0]) if selection and project_directory else None
+        if path is None or not is_cacheable(path) or not os.path.isfile(path):
+            preview["path"] = None
+            preview_label.configure(image="", text="No preview")
+            return
+        preview["path"] = path
+        preview_label.configure(text="Loading preview...")
+        runtime.submit(lambda job: get_thumbnail(path), name="Preview",
+                       on_done=lambda job: show_preview(job, path))
+
+    tree.bind("<<TreeviewSelect>>", preview_selected)
+
+    # --- GUI Buttons ---
+    analyze_button = ttk.Button(main_frame, text="Analyze Project", command=analyze_project)
+    analyze_button.pack(pady=(15, 0), fill='x')
+
+    chip_button = ttk.Button(main_frame, text="Chip Directory", command=chip_selected_directory)
+    chip_button.pack(pady=(5, 0), fill='x')
+
+    refresh_button = ttk.Button(main_frame, text="Refresh View", command=analyze_project)
+    refresh_button.pack(pady=(5, 0), fill='x')  # refresh view
 
+    # --- Run the GUI ---
+    runtime.attach(root)
+    root.mainloop()
+    runtime.shutdown()
 
-# --- GUI Setup ---
-root = tk.Tk()
-root.title("Project Analyzer")
-root.geometry("800x600")
-
-# --- Styling ---
-style = ttk.Style(root)
-style.theme_use('clam')
-
-# Color scheme
-bg_color = '#2e2e2e'
-fg_color = 'white'
-text_color = '#d3d3d3'
-button_bg_color = '#4a4a4a'
-entry_bg_color = "#4a4a4a"
-button_active_bg_color = '#606060'
-new_color = '#A9A9A9'  # Dark Gray
-modified_color = '#FFFF00'  # Yellow
-deleted_color = '#FF0000'  # Red
-valid_color = '#00FF00'  # Green
-
-style.configure('.', background=bg_color, foreground=fg_color, font=DEFAULT_FONT)
-style.configure('TLabel', background=bg_color, foreground=fg_color, padding=5, font=("Bahnschrift", 12))
-style.configure('TButton', background=button_bg_color, foreground=fg_color, padding=8, relief='flat',
-                font=("Bahnschrift", 11), borderwidth=0, focuscolor='gray',
-                activebackground=button_active_bg_color, activeforeground=fg_color)
-style.map('TButton',
-          background=[('active', button_active_bg_color), ('disabled', button_bg_color)],
-          foreground=[('disabled', 'gray')])
-style.configure('TEntry', fieldbackground=entry_bg_color, foreground=text_color, font=("Bahnschrift", 11))
-style.configure('Horizontal.TProgressbar', troughcolor=button_bg_color, background=fg_color)
-
-# --- Main Frame ---
-main_frame = ttk.Frame(root, padding=20)
-main_frame.pack(expand=True, fill='both')
-
-# --- Folder Selection ---
-folder_label = ttk.Label(main_frame, text="Project Folder:")
-folder_label.pack(pady=(0, 5), fill='x')
-
-folder_path_entry = ttk.Entry(main_frame, width=50)
-folder_path_entry.pack(pady=(0, 5), fill='x')
-
-
-def browse_folder():
-    folder_path = filedialog.askdirectory()
-    if folder_path:
-        folder_path_entry.delete(0, tk.END)
-        folder_path_entry.insert(0, folder_path)
-
-
-browse_button = ttk.Button(main_frame, text="Browse", command=browse_folder)
-browse_button.pack(pady=(0, 10), fill='x')
-
-# --- Treeview Widget ---
-tree = ttk.Treeview(main_frame, show="tree", padding=5)
-tree.pack(expand=True, fill='both')
-
-# Define treeview tags and colors
-tree.tag_configure('new', foreground=new_color)
-tree.tag_configure('modified', foreground=modified_color)
-tree.tag_configure('deleted', foreground=deleted_color)
-tree.tag_configure('valid', foreground=valid_color)  # if it's checked and no changes, show
-
-
-# --- Button Functions ---
-def analyze_project():
-    project_directory = folder_path_entry.get()
-    if not project_directory:
-        messagebox.showerror("Error", "Please select a project folder.")
-        return
-
-    # GUI DISABLE
-    analyze_button["state"] = "disabled"
-    chip_button["state"] = "disabled"
-    browse_button["state"] = "disabled"
-    refresh_button["state"] = "disabled"  # Disable the refresh
-
-    # Update in the GUI with thread process
-    def after_action():
-        # Now list the directory and display to gui
-        display_directory_structure(project_directory, tree)
-        # after
-        analyze_button["state"] = "normal"
-        chip_button["state"] = "normal"
-        browse_button["state"] = "normal"
-        refresh_button["state"] = "normal"  # Enable the refresh
-
-    threading.Thread(target=after_action, daemon=True).start()  # update to GUI
-
-
-def chip_selected_directory():
-    project_directory = folder_path_entry.get()  # gets the dirr
-    if not project_directory:
-        messagebox.showerror("Error", "Please select a project folder.")  # message
-        return
-
-    def after_action():
-        chip_directory(project_directory)  # Just "chip" the main directory
-        display_directory_structure(project_directory, tree)  # display directory
-
-        # after
-        analyze_button["state"] = "normal"
-        chip_button["state"] = "normal"
-        browse_button["state"] = "normal"
-        refresh_button["state"] = "normal"  # Enable the refresh
-
-    # Disabe the buttons
-    analyze_button["state"] = "disabled"
-    chip_button["state"] = "disabled"
-    browse_button["state"] = "disabled"
-    refresh_button["state"] = "disabled"  # Disable the refresh
-
-    threading.Thread(target=after_action, daemon=True).start()  # update in the gui display
-
-
-# --- GUI Buttons ---
-analyze_button = ttk.Button(main_frame, text="Analyze Project", command=analyze_project)
-analyze_button.pack(pady=(15, 0), fill='x')
-
-chip_button = ttk.Button(main_frame, text="Chip Directory", command=chip_selected_directory)
-chip_button.pack(pady=(5, 0), fill='x')
-
-refresh_button = ttk.Button(main_frame, text="Refresh View", command=analyze_project)
-refresh_button.pack(pady=(5, 0), fill='x')  # refresh view
 
-# --- Run the GUI ---
-root.mainloop()
+if __name__ == "__main__":
+    main()
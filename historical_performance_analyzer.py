@@ -1,18 +1,195 @@
 import datetime
+import json
+import logging
 import os
 import tkinter as tk
 import tkinter.ttk as ttk
+from concurrent.futures import ThreadPoolExecutor
 from tkinter import filedialog, messagebox
 
+from job_runtime import CANCELLED, DONE, JobRuntime
+from run_logging import RunReport, reporting, setup_logging
+from task_name_normalizer import canonical_name_map, cluster_task_names, rewrite_task_records
+from throughput import format_eta
+
+logger = logging.getLogger(__name__)
+
+# --- Constants ---
+TASK_CACHE_FILE = ".task_history_cache.json"  # Per-project parse cache kept in the studio root
+DISCOVERY_MAX_DEPTH = 4  # How deep below the studio root to look for project directories
+SCAN_WORKERS = 16  # Task scanning is I/O bound, so threads beyond the CPU count still help
+
+
+# --- Helper Functions ---
+def is_task_file(file_name):
+    """Checks if a file name follows the Task Assigner naming scheme."""
+    return file_name.startswith("task for ") and file_name.endswith(".txt")
+
+
+def parse_task_file(task_path):
+    """Reads a task file into a dict of its "key: value" lines."""
+    task = {}
+    with open(task_path, "r") as f:
+        for line in f:
+            if ":" in line:
+                key, value = line.strip().split(":", 1)
+                task[key.strip()] = value.strip()
+    return task
+
+
+def project_signature(project_dir):
+    """Returns [name, mtime_ns, size] for every task file, used to tell if a project changed."""
+    signature = []
+    with os.scandir(project_dir) as entries:
+        for entry in entries:
+            if is_task_file(entry.name) and entry.is_file():
+                stat = entry.stat()
+                signature.append([entry.name, stat.st_mtime_ns, stat.st_size])
+    signature.sort()
+    return signature
+
+
+def discover_task_projects(studio_root, max_depth=DISCOVERY_MAX_DEPTH):
+    """Finds every directory below studio_root that holds task files.
+
+    A directory with task files is treated as a project and not descended into, so large
+    asset trees inside projects are never walked.
+    """
+    projects = []
+    root_depth = studio_root.rstrip(os.sep).count(os.sep)
+    for dirpath, dirnames, filenames in os.walk(studio_root):
+        if any(is_task_file(f) for f in filenames):
+            projects.append(dirpath)
+            dirnames[:] = []
+            continue
+        dirnames[:] = [d for d in dirnames if not d.startswith(".")]
+        if dirpath.count(os.sep) - root_depth >= max_depth:
+            dirnames[:] = []
+    return projects
+
+
+def collect_project_tasks(project_dir, signature=None):
+    """Parses all task files of one project.
+
+    Returns:
+        (tasks, errors) where errors is a list of (task_path, message) tuples.
+    """
+    tasks = []
+    errors = []
+    names = [name for name, _, _ in signature] if signature is not None else \
+        [f for f in os.listdir(project_dir) if is_task_file(f)]
+    for file_name in names:
+        task_path = os.path.join(project_dir, file_name)
+        try:
+            task = parse_task_file(task_path)
+            task["_path"] = task_path  # Needed to rewrite the record later
+            tasks.append(task)
+        except Exception as e:
+            errors.append((task_path, str(e)))
+    return tasks, errors
+
+
+def load_task_cache(studio_root):
+    """Loads the per-project parse cache of a studio root (empty if missing or unreadable)."""
+    try:
+        with open(os.path.join(studio_root, TASK_CACHE_FILE), "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_task_cache(studio_root, cache):
+    """Saves the per-project parse cache of a studio root."""
+    cache_path = os.path.join(studio_root, TASK_CACHE_FILE)
+    try:
+        with open(cache_path, "w") as f:
+            json.dump(cache, f)
+    except OSError as e:
+        logger.error(f"Error saving task cache to {cache_path}: {e}")
+
+
+def collect_studio_tasks(studio_root, max_workers=SCAN_WORKERS, use_cache=True, report=None, job=None):
+    """Collects tasks of every project below a studio root into one dataset.
+
+    Projects are scanned in parallel. Parsed tasks are cached per project together with the
+    task files' names, sizes and mtimes, so only projects that changed are re-read. Parse
+    errors are cached with them and reported again until the files change. With a report
+    (a run_logging.RunReport), the task count and every error are also recorded there. With a
+    job (a job_runtime.Job), progress is reported per project, and cancelling it stops the
+    scan after the projects being read (raising JobCancelled).
+
+    Returns:
+        (tasks, errors). Every task gets a "project" column holding the project's path
+        relative to the studio root.
+    """
+    projects = discover_task_projects(studio_root)
+    cache = load_task_cache(studio_root) if use_cache else {}
+
+    def scan(project_dir):
+        project = os.path.relpath(project_dir, studio_root)
+        try:
+            signature = project_signature(project_dir)
+        except OSError as e:
+            return project, None, [], [(project_dir, str(e))]
+
+        cached = cache.get(project)
+        if cached and cached["signature"] == signature:
+            tasks = [dict(task, _path=os.path.join(project_dir, task["_file"])) for task in cached["tasks"]]
+            errors = [(os.path.join(project_dir, name), message) for name, message in cached.get("errors", [])]
+            return project, cached, tasks, errors
+
+        tasks, errors = collect_project_tasks(project_dir, signature)
+        entry = {
+            "signature": signature,
+            "tasks": [{**{k: v for k, v in task.items() if k != "_path"},
+                       "_file": os.path.basename(task["_path"])} for task in tasks],
+            "errors": [(os.path.relpath(path, project_dir), message) for path, message in errors],
+        }
+        return project, entry, tasks, errors
+
+    all_tasks = []
+    all_errors = []
+    new_cache = {}
+    if job is not None:
+        job.start(len(projects))
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for done, (project, entry, tasks, errors) in enumerate(executor.map(scan, projects), 1):
+            if entry is not None:
+                new_cache[project] = entry
+            for task in tasks:
+                task.pop("_file", None)
+                task["project"] = project
+            all_tasks.extend(tasks)
+            all_errors.extend(errors)
+            if job is not None:
+                job.progress(done)
+                job.check()
+
+    if use_cache:
+        save_task_cache(studio_root, new_cache)
+    if report is not None:
+        report.count("projects", len(projects))
+        report.count("tasks", len(all_tasks))
+        for task_path, error in all_errors:
+            report.error(os.path.relpath(task_path, studio_root), error)
+    return all_tasks, all_errors
+
 
 class HistoricalPerformanceAnalyzer(ttk.Frame):
-    def __init__(self, parent, project_dir=None):
+    def __init__(self, parent, project_dir=None, runtime=None):
         super().__init__(parent)
         self.parent = parent
         self.project_dir = project_dir
+        self.current_job = None
         self.load_style()
         self.init_ui()
 
+        # Scans run as jobs; their events are delivered on the Tk thread
+        self.runtime = runtime
+        if self.runtime is None:
+            self.runtime = JobRuntime()
+            self.runtime.attach(self)
+
     def load_style(self):
         style = ttk.Style()
         style.theme_use('clam')
@@ -57,8 +234,15 @@ class HistoricalPerformanceAnalyzer(ttk.Frame):
         self.browse_button.grid(row=0, column=2, sticky="w", padx=5, pady=5)
 
         # --- Buttons ---
+        self.studio_mode_var = tk.BooleanVar(value=False)
+        self.studio_mode_check = ttk.Checkbutton(self, text="Studio root (analyze all projects below)",
+                                                 variable=self.studio_mode_var)
+        self.studio_mode_check.grid(row=1, column=1, sticky="w", padx=5, pady=10)
+
         self.analyze_button = ttk.Button(self, text="Analyze Project", command=self.analyze_project)
         self.analyze_button.grid(row=1, column=1, sticky="e", padx=5, pady=10)
+        self.cancel_button = ttk.Button(self, text="Cancel", command=self.cancel_analysis, state="disabled")
+        self.cancel_button.grid(row=1, column=2, sticky="w", padx=5, pady=10)
 
         # --- Report Display ---
         self.report_label = ttk.Label(self, text="Analysis Report:")
@@ -86,6 +270,12 @@ class HistoricalPerformanceAnalyzer(ttk.Frame):
         self.ideal_author_text.grid(row=5, column=1, sticky="ew", padx=5, pady=5)
         self.ideal_author_text.config(state=tk.DISABLED)
 
+        # --- Progress Bar ---
+        self.progress_bar = ttk.Progressbar(self, orient="horizontal", mode="determinate")
+        self.progress_bar.grid(row=6, column=1, sticky="ew", padx=5, pady=(10, 0))
+        self.progress_label = ttk.Label(self, text="")  # Projects scanned and ETA
+        self.progress_label.grid(row=7, column=1, sticky="ew", padx=5)
+
         self.columnconfigure(1, weight=1)
 
     def browse_project_directory(self):
@@ -99,35 +289,77 @@ class HistoricalPerformanceAnalyzer(ttk.Frame):
             messagebox.showerror("Error", "Please select a project directory first.")
             return
 
-        task_data = self.collect_task_data()
+        # Unreadable task files are collected in one report instead of a dialog per file
+        report = RunReport("analyze_tasks", self.project_dir)
+        studio_mode = self.studio_mode_var.get()
+
+        def scan(job):
+            with reporting(report):
+                if studio_mode:
+                    return collect_studio_tasks(self.project_dir, report=report, job=job)[0]
+                return self.collect_task_data(report)
+
+        self.set_buttons_state("disabled")
+        self.cancel_button["state"] = "normal"
+        self.current_job = self.runtime.submit(scan, name="Analyze Tasks", on_start=self.start_progress,
+                                               on_progress=self.update_progress,
+                                               on_done=lambda job: self.scan_finished(job, report))
+
+    # Job events are delivered on the Tk thread by the runtime, so these may touch widgets
+    def start_progress(self, maximum):
+        self.progress_bar["maximum"] = maximum
+        self.progress_bar["value"] = 0
+
+    def update_progress(self, value):
+        self.progress_bar["value"] = value
+        meter = self.current_job.meter
+        self.progress_label["text"] = f"{value}/{meter.total} projects, ETA {format_eta(meter.eta)}"
+
+    def scan_finished(self, job, report):
+        """Job completion handler: analyzes and displays the scanned tasks."""
+        self.current_job = None
+        self.progress_bar["value"] = 0
+        self.progress_label["text"] = ""
+        self.set_buttons_state("normal")
+        self.cancel_button["state"] = "disabled"
+        if job.state == CANCELLED:
+            return
+        if job.state != DONE:
+            messagebox.showerror("Error", f"Error analyzing '{self.project_dir}': {job.error}")
+            return
+
+        task_data = job.result
+        if report.errors:
+            messagebox.showwarning("Warning", f"Some task files could not be read.\n\n{report.dialog_text()}")
         if not task_data:
             messagebox.showinfo("Info", "No task data found in the project directory.")
             return
 
         analysis_results = self.perform_analysis(task_data)
         self.display_report(analysis_results["report"])
-        self.display_ideal_names(analysis_results["ideal_names"])
+        self.display_ideal_names(analysis_results["name_clusters"])
         self.display_ideal_authors(analysis_results["ideal_authors"])
 
         self.task_data = task_data
         self.autocorrect_names = analysis_results["ideal_names"]
-
-    def collect_task_data(self):
-        """Collects data from task files in the project directory."""
-        task_data = []
-        for file_name in os.listdir(self.project_dir):
-            if file_name.startswith("task for ") and file_name.endswith(".txt"):
-                try:
-                    task_path = os.path.join(self.project_dir, file_name)
-                    with open(task_path, "r") as f:
-                        task = {}
-                        for line in f:
-                            if ":" in line:
-                                key, value = line.strip().split(":", 1)
-                                task[key.strip()] = value.strip()
-                        task_data.append(task)
-                except Exception as e:
-                    messagebox.showerror("Error", f"Error reading task file {file_name}: {e}")
+        self.name_clusters = analysis_results["name_clusters"]
+
+    def cancel_analysis(self):
+        if self.current_job is not None:
+            self.current_job.cancel()
+
+    def set_buttons_state(self, state):
+        self.browse_button["state"] = state
+        self.studio_mode_check["state"] = state
+        self.analyze_button["state"] = state
+        self.autocorrect["state"] = state
+
+    def collect_task_data(self, report):
+        """Collects data from task files in the project directory, recording unreadable files in report."""
+        task_data, errors = collect_project_tasks(self.project_dir)
+        report.count("tasks", len(task_data))
+        for task_path, error in errors:
+            report.error(os.path.basename(task_path), error)
         return task_data
 
     def perform_analysis(self, task_data):
@@ -154,15 +386,15 @@ class HistoricalPerformanceAnalyzer(ttk.Frame):
             artist = task["assigned artist"]
             artist_task_counts[artist] = artist_task_counts.get(artist, 0) + 1
 
-        # 3. Common Problem Identification (Name Analyze)
-        task_name_counts = {}
+        project_task_counts = {}
         for task in task_data:
-            name = task["task name"]
-            task_name_counts[name] = task_name_counts.get(name, 0) + 1
+            if "project" in task:
+                project_task_counts[task["project"]] = project_task_counts.get(task["project"], 0) + 1
 
-        # Identify "ideal" name
-        ideal_names = sorted(task_name_counts.items(), key=lambda x: x[1], reverse=True)[:5]
-        ideal_names_list = [name for name, count in ideal_names]
+        # 3. Common Problem Identification (Name Analyze)
+        # Near-duplicate names are clustered, the most used spelling is the "ideal" name
+        name_clusters = cluster_task_names(task.get("task name", "") for task in task_data)
+        ideal_names_list = [cluster["canonical"] for cluster in name_clusters[:5]]
 
         author_name_counts = {}
         for task in task_data:
@@ -178,10 +410,15 @@ class HistoricalPerformanceAnalyzer(ttk.Frame):
         report += "Task Counts by Artist:\n"
         for artist, count in artist_task_counts.items():
             report += f" - {artist}: {count}\n"
+        if project_task_counts:
+            report += f"\nTask Counts by Project ({len(project_task_counts)} projects):\n"
+            for project, count in sorted(project_task_counts.items()):
+                report += f" - {project}: {count}\n"
 
         analysis_result = {
             "report": report,
             "ideal_names": ideal_names_list,
+            "name_clusters": name_clusters,
             "ideal_authors": ideal_authors_list
         }
 
@@ -193,11 +430,19 @@ class HistoricalPerformanceAnalyzer(ttk.Frame):
         self.report_text.insert("1.0", report)  # Insert the report
         self.report_text.config(state=tk.DISABLED)  # Disable editing
 
-    def display_ideal_names(self, ideal_names):
-        """Displays a report for a "better task name" in text."""
+    def display_ideal_names(self, name_clusters):
+        """Displays a report for a "better task name" in text, one cluster per line."""
+        lines = []
+        for cluster in name_clusters:
+            others = [variant for variant in cluster["variants"] if variant != cluster["canonical"]]
+            line = cluster["canonical"]
+            if others:
+                line += f"  <-  {', '.join(others)}"
+            lines.append(line)
+
         self.ideal_names_text.config(state=tk.NORMAL)
         self.ideal_names_text.delete("1.0", tk.END)
-        self.ideal_names_text.insert("1.0", "\n".join(ideal_names))
+        self.ideal_names_text.insert("1.0", "\n".join(lines))
         self.ideal_names_text.config(state=tk.DISABLED)
 
     def display_ideal_authors(self, authors):
@@ -207,8 +452,42 @@ class HistoricalPerformanceAnalyzer(ttk.Frame):
         self.ideal_author_text.insert("1.0", "\n".join(authors))
         self.ideal_author_text.config(state=tk.DISABLED)
 
+    def selected_name_clusters(self):
+        """Returns the clusters whose lines are selected in the ideal names box (all if none)."""
+        clusters = getattr(self, "name_clusters", [])
+        selection = self.ideal_names_text.tag_ranges("sel")
+        if not selection:
+            return clusters
+
+        first_line = int(str(selection[0]).split(".")[0])
+        last_line = int(str(selection[1]).split(".")[0])
+        return clusters[first_line - 1:last_line]
+
     def autocorrect_task(self):
-        messagebox.showinfo("showinfo", "Not done yet, still in development")
+        """Rewrites task records to the canonical name of their cluster."""
+        if not getattr(self, "task_data", None):
+            messagebox.showerror("Error", "Please analyze a project first.")
+            return
+
+        name_map = canonical_name_map(self.selected_name_clusters())
+        task_paths = [task["_path"] for task in self.task_data
+                      if task.get("task name") in name_map and "_path" in task]
+        if not task_paths:
+            messagebox.showinfo("Info", "No task names need correcting.")
+            return
+
+        if not messagebox.askyesno("Autocorrect", f"Rename {len(task_paths)} task(s) to their ideal names?"):
+            return
+
+        report = RunReport("autocorrect_task_names", self.project_dir)
+        with reporting(report):
+            rewritten, failed = rewrite_task_records(task_paths, name_map, report)
+        if failed:
+            messagebox.showwarning("Autocorrect", f"Corrected {len(rewritten)} task(s), failed to correct "
+                                                  f"{len(failed)}.\n\n{report.dialog_text()}")
+        else:
+            messagebox.showinfo("Autocorrect", f"Corrected {len(rewritten)} task(s).")
+        self.analyze_project()
 
 
 def integrate_historical_performance_analyzer(main_frame, project_dir=None):
@@ -217,9 +496,11 @@ def integrate_historical_performance_analyzer(main_frame, project_dir=None):
 
 
 if __name__ == "__main__":
+    setup_logging()
     root = tk.Tk()
     root.title("Historical Performance Analyzer")
     root.geometry("800x600")
     analyzer = HistoricalPerformanceAnalyzer(root)
     analyzer.pack(expand=True, fill="both")
     root.mainloop()
+    analyzer.runtime.shutdown()
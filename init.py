@@ -87,6 +87,7 @@ categories = {
     "Control": [
         ("Automated Task Management & Reporting", "task_assigner"),
         ("Historical Performance Analyzer", "historical_performance_analyzer"),
+        ("Background Jobs", "job_daemon"),
     ],
 }
 
@@ -0,0 +1,241 @@
+import json
+import logging
+import math
+import os
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from functools import partial
+
+import profiling
+
+logger = logging.getLogger(__name__)
+
+# --- Constants ---
+METRICS_DIR_ENV = "ELI_LAB_METRICS_DIR"  # Where run metrics are exported (e.g. a shared folder on the farm)
+DEFAULT_METRICS_DIR = os.path.join(os.path.expanduser("~"), ".eli_lab", "metrics")
+PERCENTILES = (50, 95, 99)
+
+_local = threading.local()  # The Metrics collecting spans on each thread
+
+
+# --- Helper Functions ---
+def default_metrics_dir():
+    return os.environ.get(METRICS_DIR_ENV) or DEFAULT_METRICS_DIR
+
+
+def percentile(sorted_values, percent):
+    """Returns the nearest-rank percentile of an already sorted list (0.0 for an empty one)."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(percent / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def format_seconds(seconds):
+    return f"{seconds * 1000:.1f}ms" if seconds < 1 else f"{seconds:.2f}s"
+
+
+def format_bytes(count):
+    return f"{count / (1024 * 1024):.1f} MB"
+
+
+class Metrics:
+    """Timed spans and counters collected during one run of a tool.
+
+    A span is one timed stage of the work ("decode", "encode", "fsync", ...) with optional
+    details such as the file it belongs to; counters add up amounts such as files processed
+    and bytes read or written. Spans are timed with time.perf_counter (monotonic) and kept in
+    memory; export writes them as JSON lines and summary condenses them into count, total and
+    p50/p95/p99 per stage.
+    """
+
+    def __init__(self, tool):
+        self.tool = tool
+        self.started = time.time()
+        self.spans = []  # (stage, seconds, details)
+        self.counters = defaultdict(int)
+        self._start = time.perf_counter()
+        self._lock = threading.Lock()  # Results from several worker threads are merged into one run
+
+    def record(self, stage, seconds, details=None):
+        with self._lock:
+            self.spans.append((stage, seconds, details or {}))
+
+    def count(self, name, amount=1):
+        with self._lock:
+            self.counters[name] += amount
+
+    def merge(self, spans, counters):
+        """Adds the spans and counters a worker collected (see instrumented)."""
+        with self._lock:
+            self.spans.extend(spans)
+            for name, amount in counters.items():
+                self.counters[name] += amount
+
+    @property
+    def wall_time(self):
+        return time.perf_counter() - self._start
+
+    def summary(self):
+        """Condenses the run.
+
+        Returns:
+            {"tool", "wall_time", "counters": {name: n},
+             "stages": {stage: {"count", "total", "p50", "p95", "p99", "max"}}}
+        """
+        durations = defaultdict(list)
+        with self._lock:
+            for stage, seconds, _ in self.spans:
+                durations[stage].append(seconds)
+            counters = dict(self.counters)
+
+        stages = {}
+        for stage, values in durations.items():
+            values.sort()
+            stats = {"count": len(values), "total": sum(values), "max": values[-1]}
+            for percent in PERCENTILES:
+                stats[f"p{percent}"] = percentile(values, percent)
+            stages[stage] = stats
+        return {"tool": self.tool, "wall_time": self.wall_time, "counters": counters, "stages": stages}
+
+    def export(self, directory=None):
+        """Writes the run as JSON lines: a "run" line, one "span" line per span, then a "summary" line.
+
+        Returns:
+            The path of the file, <metrics dir>/<tool>_<date>-<time>.jsonl.
+        """
+        directory = directory or default_metrics_dir()
+        os.makedirs(directory, exist_ok=True)
+        stamp = time.strftime("%Y%m%d-%H%M%S", time.localtime(self.started))
+        path = os.path.join(directory, f"{self.tool}_{stamp}_{os.getpid()}.jsonl")
+        with self._lock:
+            spans = list(self.spans)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(json.dumps({"type": "run", "tool": self.tool, "started": self.started, "pid": os.getpid()}) + "\n")
+            for stage, seconds, details in spans:
+                f.write(json.dumps({"type": "span", "stage": stage, "seconds": seconds, **details}) + "\n")
+            f.write(json.dumps({"type": "summary", **self.summary()}) + "\n")
+        return path
+
+
+def format_summary(summary):
+    """Renders a Metrics summary as a table of stages and a line of counters."""
+    counters = summary["counters"]
+    lines = [f"{summary['tool']}: {counters.get('files', 0)} files in {format_seconds(summary['wall_time'])}"]
+    if summary["stages"]:
+        header = "".join(f"{'p' + str(percent):>10}" for percent in PERCENTILES)
+        lines.append(f"  {'stage':<16}{'count':>8}{'total':>10}{header}{'max':>10}")
+        for stage, stats in sorted(summary["stages"].items(), key=lambda item: item[1]["total"], reverse=True):
+            values = "".join(f"{format_seconds(stats['p' + str(percent)]):>10}" for percent in PERCENTILES)
+            lines.append(f"  {stage:<16}{stats['count']:>8}{format_seconds(stats['total']):>10}{values}"
+                         f"{format_seconds(stats['max']):>10}")
+    others = [f"{name}: {format_bytes(amount) if name.startswith('bytes') else amount}"
+              for name, amount in sorted(counters.items()) if name != "files"]
+    if others:
+        lines.append("  " + ", ".join(others))
+    return "\n".join(lines)
+
+
+def current():
+    """Returns the Metrics collecting on this thread, or None."""
+    return getattr(_local, "metrics", None)
+
+
+@contextmanager
+def span(stage, **details):
+    """Times the enclosed block as one span of `stage` in the run active on this thread.
+
+    Outside a run (see run and instrumented) nothing is timed, so library functions can be
+    instrumented unconditionally.
+    """
+    metrics = current()
+    if metrics is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        metrics.record(stage, time.perf_counter() - start, details)
+
+
+def count(name, amount=1):
+    """Adds to a counter of the run active on this thread (ignored outside a run)."""
+    metrics = current()
+    if metrics is not None:
+        metrics.count(name, amount)
+
+
+def counter(name):
+    """Returns a counter of the run active on this thread so far (0 outside a run)."""
+    metrics = current()
+    return metrics.counters.get(name, 0) if metrics is not None else 0
+
+
+@contextmanager
+def run(tool, export=True):
+    """Collects the spans and counters of one run of a tool on this thread.
+
+    When the run ends (also by an error or a cancel), its metrics are exported as JSON lines
+    (see Metrics.export) and the per-stage summary is logged. A tool started inside another
+    tool's run (e.g. from a batch job) adds to that run instead of starting its own.
+
+    Yields:
+        The Metrics of the run.
+    """
+    outer = current()
+    if outer is not None:
+        yield outer
+        return
+    metrics = Metrics(tool)
+    _local.metrics = metrics
+    try:
+        yield metrics
+    finally:
+        _local.metrics = None
+        logger.info(format_summary(metrics.summary()))
+        if export:
+            try:
+                logger.info(f"Metrics written to '{metrics.export()}'")
+            except OSError as e:
+                logger.error(f"Error writing metrics: {e}")
+
+
+def _run_instrumented(function, profile, item):
+    metrics = Metrics(getattr(function, "__name__", "worker"))
+    previous, _local.metrics = current(), metrics
+    stats = None
+    try:
+        if profile:
+            result, stats = profiling.profile_call(function, item)
+        else:
+            result = function(item)
+    finally:
+        _local.metrics = previous
+    return result, metrics.spans, dict(metrics.counters), stats
+
+
+def instrumented(function):
+    """Wraps a Job.map work function so the spans it records in a worker reach the caller's run.
+
+    Worker threads and processes have no run of their own, so the wrapper collects their spans
+    and returns them with the result; pass each result through collect. The wrapper is
+    picklable whenever function is, so it also works on the process pool. While a CPU
+    profile is running (see profiling), each work item is also profiled where it runs.
+    """
+    session = profiling.active()
+    return partial(_run_instrumented, function, session is not None and session.cpu)
+
+
+def collect(instrumented_result):
+    """Merges the spans (and profile) of an instrumented work item into this thread's run and returns its result."""
+    result, spans, counters, stats = instrumented_result
+    metrics = current()
+    if metrics is not None:
+        metrics.merge(spans, counters)
+    session = profiling.active()
+    if stats is not None and session is not None:
+        session.add_worker_stats(stats)
+    return result
@@ -0,0 +1,679 @@
+import argparse
+import json
+import logging
+import os
+import queue
+import socket
+import sqlite3
+import subprocess
+import sys
+import threading
+import time
+import tkinter as tk
+from tkinter import messagebox, ttk
+
+from job_runtime import CANCELLED, DONE, FAILED, QUEUED, RUNNING, JobRuntime
+from profiling import PROFILE_ENV, add_profiling_arguments
+from run_logging import add_logging_arguments, setup_logging
+
+logger = logging.getLogger(__name__)
+
+# --- Constants ---
+DAEMON_DIR_ENV = "ELI_LAB_JOBD_DIR"  # Where the socket, database and log live
+DEFAULT_DAEMON_DIR = os.path.join(os.path.expanduser("~"), ".eli_lab")
+SOCKET_FILE = "jobd.sock"
+DATABASE_FILE = "jobs.sqlite3"
+LOG_FILE = "jobd.log"
+DAEMON_WORKERS = 2  # Jobs the daemon runs at the same time
+PROGRESS_WRITE_INTERVAL = 0.5  # Seconds between progress writes to the database per job
+WATCH_INTERVAL = 0.5  # Seconds between updates sent to a watching client
+CONNECT_TIMEOUT = 2.0
+ACCEPT_TIMEOUT = 0.5  # How often the accept loop checks for a shutdown request
+STARTUP_TIMEOUT = 5.0
+MONITOR_REFRESH_MS = 1000
+LIST_LIMIT = 100
+FINISHED_STATES = (DONE, FAILED, CANCELLED)
+
+
+# --- Helper Functions ---
+def daemon_available():
+    """The daemon talks over a Unix domain socket, which not every platform has."""
+    return hasattr(socket, "AF_UNIX")
+
+
+def daemon_dir(directory=None):
+    return directory or os.environ.get(DAEMON_DIR_ENV) or DEFAULT_DAEMON_DIR
+
+
+def socket_path(directory=None):
+    return os.path.join(daemon_dir(directory), SOCKET_FILE)
+
+
+# --- Job Types ---
+# Every job type takes the job plus JSON arguments and returns a JSON-friendly summary.
+def run_convert_textures(job, directory, preset="PNG", mip_levels=0, dedup=None):
+    from run_logging import RunReport
+    from texture_batch_converter import convert_textures
+
+    report = RunReport("convert_textures", directory)
+    converted = convert_textures(directory, progress_callback=job.progress, start_progress_callback=job.start, job=job,
+                                 preset=preset, mip_levels=mip_levels, dedup=dedup, report=report)
+    return {"converted": converted, "failed": len(report.errors), "report": report.paths and report.paths[1]}
+
+
+def run_compress_textures(job, root_folder, quality_setting="Medium", backend="auto", dedup=None):
+    from texture_batch_optimising_tool import compress_textures
+
+    return compress_textures(root_folder, quality_setting, job=job, backend=backend, dedup=dedup)
+
+
+def run_validate_project(job, root_directory, copy_mode="copy", config_path=None):
+    from project_validation import SEEDING_CATEGORIES, validate_project
+    from template_registry import load_template_registry
+
+    registry = load_template_registry(root_directory, config_path)
+    plan = validate_project(root_directory, progress_callback=job.progress, start_progress_callback=job.start,
+                            copy_mode=copy_mode, registry=registry, job=job)
+    return {category: len(plan[category]) for category in SEEDING_CATEGORIES}
+
+
+def run_generate_documentation(job, studio_root, force=False):
+    from project_documentation_generator import generate_documentation_batch
+
+    results = generate_documentation_batch(studio_root, force=force)
+    return {outcome: len(projects) for outcome, projects in results.items()}
+
+
+def run_cache_thumbnails(job, root):
+    from thumbnail_cache import cache_library
+
+    return cache_library(root, job=job)
+
+
+JOB_TYPES = {
+    "convert_textures": run_convert_textures,
+    "compress_textures": run_compress_textures,
+    "validate_project": run_validate_project,
+    "generate_documentation": run_generate_documentation,
+    "cache_thumbnails": run_cache_thumbnails,
+}
+
+
+class JobStore:
+    """Job state in sqlite, so queued and interrupted jobs survive a daemon restart."""
+
+    COLUMNS = ("id", "type", "args", "state", "value", "maximum", "result", "error",
+               "submitted_at", "started_at", "finished_at")
+
+    def __init__(self, path):
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._connection:
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    type TEXT NOT NULL,
+                    args TEXT NOT NULL,
+                    state TEXT NOT NULL,
+                    value INTEGER NOT NULL DEFAULT 0,
+                    maximum INTEGER NOT NULL DEFAULT 0,
+                    result TEXT,
+                    error TEXT,
+                    submitted_at REAL,
+                    started_at REAL,
+                    finished_at REAL
+                )""")
+
+    def _row(self, row):
+        job = dict(zip(self.COLUMNS, row))
+        job["args"] = json.loads(job["args"])
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        return job
+
+    def add(self, job_type, args):
+        with self._lock, self._connection:
+            cursor = self._connection.execute(
+                "INSERT INTO jobs (type, args, state, submitted_at) VALUES (?, ?, ?, ?)",
+                (job_type, json.dumps(args), QUEUED, time.time()))
+            return cursor.lastrowid
+
+    def update(self, job_id, **fields):
+        if "result" in fields:
+            fields["result"] = json.dumps(fields["result"])
+        assignments = ", ".join(f"{name} = ?" for name in fields)
+        with self._lock, self._connection:
+            self._connection.execute(f"UPDATE jobs SET {assignments} WHERE id = ?", (*fields.values(), job_id))
+
+    def get(self, job_id):
+        with self._lock:
+            row = self._connection.execute(
+                f"SELECT {', '.join(self.COLUMNS)} FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._row(row) if row else None
+
+    def list(self, limit=LIST_LIMIT):
+        with self._lock:
+            rows = self._connection.execute(
+                f"SELECT {', '.join(self.COLUMNS)} FROM jobs ORDER BY id DESC LIMIT ?", (limit,)).fetchall()
+        return [self._row(row) for row in rows]
+
+    def unfinished(self):
+        with self._lock:
+            rows = self._connection.execute(
+                f"SELECT {', '.join(self.COLUMNS)} FROM jobs WHERE state IN (?, ?) ORDER BY id",
+                (QUEUED, RUNNING)).fetchall()
+        return [self._row(row) for row in rows]
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
+
+
+class JobDaemon:
+    """Accepts jobs over a Unix socket and runs them on a bounded job runtime.
+
+    The protocol is one JSON object per line. Requests have an "op":
+        ping, submit {type, args}, status {job_id}, list, cancel {job_id},
+        watch {job_id} (streams the job until it finishes), shutdown.
+    Every response has "ok" and either the data or an "error".
+    """
+
+    def __init__(self, directory=None, workers=DAEMON_WORKERS):
+        self.directory = daemon_dir(directory)
+        os.makedirs(self.directory, mode=0o700, exist_ok=True)  # Only the artist can reach the socket, database and log
+        self.store = JobStore(os.path.join(self.directory, DATABASE_FILE))
+        self.runtime = JobRuntime(max_jobs=workers)
+        self.jobs = {}  # Database id -> live runtime Job
+        self.cancelled_by_user = set()
+        self._changed = threading.Condition()
+        self._stopping = threading.Event()
+        self._server = None
+
+    # --- Jobs ---
+    def start_job(self, row):
+        job_id = row["id"]
+        runner = JOB_TYPES[row["type"]]
+        last_write = [0.0]
+
+        def on_start(maximum):
+            self.store.update(job_id, state=RUNNING, maximum=maximum, value=0)
+            self._notify()
+
+        def on_progress(value):
+            now = time.monotonic()
+            if now - last_write[0] >= PROGRESS_WRITE_INTERVAL:
+                last_write[0] = now
+                self.store.update(job_id, value=value)
+            self._notify()
+
+        def on_done(job):
+            state = job.state
+            if state == CANCELLED and self._stopping.is_set() and job_id not in self.cancelled_by_user:
+                state = QUEUED  # Interrupted by the daemon shutting down, resumed by the next daemon
+            fields = {"state": state, "value": job.value, "finished_at": time.time()}
+            if job.state == DONE:
+                fields["result"] = job.result
+            if job.error is not None:
+                fields["error"] = str(job.error)
+            self.store.update(job_id, **fields)
+            self.jobs.pop(job_id, None)
+            self._notify()
+
+        def run(job, args):
+            self.store.update(job_id, state=RUNNING, started_at=time.time())
+            return runner(job, **args)
+
+        self.jobs[job_id] = self.runtime.submit(run, row["args"], name=f"{row['type']} #{job_id}",
+                                                on_start=on_start, on_progress=on_progress, on_done=on_done)
+
+    def resume(self):
+        """Re-queues the jobs that were queued or running when the daemon last stopped."""
+        for row in self.store.unfinished():
+            logger.info(f"Resuming job #{row['id']} ({row['type']})")
+            self.store.update(row["id"], state=QUEUED, value=0)
+            self.start_job(row)
+
+    def job_status(self, job_id):
+        row = self.store.get(job_id)
+        job = self.jobs.get(job_id)
+        if row is not None and job is not None:
+            row["value"], row["maximum"] = job.value, job.maximum  # Fresher than the throttled database
+        return row
+
+    def _notify(self):
+        with self._changed:
+            self._changed.notify_all()
+
+    # --- Requests ---
+    def handle_request(self, request, send):
+        op = request.get("op")
+        if op == "ping":
+            send({"ok": True, "pid": os.getpid()})
+        elif op == "submit":
+            job_type, args = request.get("type"), request.get("args", {})
+            if job_type not in JOB_TYPES:
+                send({"ok": False, "error": f"Unknown job type '{job_type}', expected one of {sorted(JOB_TYPES)}"})
+                return
+            job_id = self.store.add(job_type, args)
+            self.start_job(self.store.get(job_id))
+            send({"ok": True, "job_id": job_id})
+        elif op == "status":
+            row = self.job_status(request.get("job_id"))
+            send({"ok": True, "job": row} if row else {"ok": False, "error": "No such job."})
+        elif op == "list":
+            rows = self.store.list(request.get("limit", LIST_LIMIT))
+            send({"ok": True, "jobs": [self.job_status(row["id"]) or row for row in rows]})
+        elif op == "cancel":
+            job = self.jobs.get(request.get("job_id"))
+            if job is None:
+                send({"ok": False, "error": "Job is not queued or running."})
+                return
+            self.cancelled_by_user.add(request.get("job_id"))
+            job.cancel()
+            send({"ok": True})
+        elif op == "watch":
+            job_id = request.get("job_id")
+            while not self._stopping.is_set():
+                row = self.job_status(job_id)
+                if row is None:
+                    send({"ok": False, "error": "No such job."})
+                    return
+                send({"ok": True, "job": row})
+                if row["state"] in FINISHED_STATES:
+                    return
+                with self._changed:
+                    self._changed.wait(WATCH_INTERVAL)
+        elif op == "shutdown":
+            send({"ok": True})
+            self._stopping.set()
+        else:
+            send({"ok": False, "error": f"Unknown op '{op}'"})
+
+    def handle_connection(self, connection):
+        with connection, connection.makefile("rw", encoding="utf-8") as stream:
+            def send(message):
+                stream.write(json.dumps(message) + "\n")
+                stream.flush()
+
+            for line in stream:
+                try:
+                    request = json.loads(line)
+                    if not isinstance(request, dict):
+                        send({"ok": False, "error": "Requests must be JSON objects."})
+                        continue
+                    self.handle_request(request, send)
+                except (OSError, ValueError) as e:
+                    try:
+                        send({"ok": False, "error": str(e)})
+                    except OSError:
+                        return
+
+    def serve_forever(self):
+        """Listens on the socket until a shutdown request; resumes unfinished jobs first."""
+        path = socket_path(self.directory)
+        if os.path.exists(path):
+            if is_running(self.directory):
+                raise RuntimeError(f"A job daemon is already listening on {path}")
+            os.remove(path)  # Left behind by a daemon that did not shut down cleanly
+
+        self._server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        # Only the artist's own tools may submit jobs; the socket is created 0600 rather than
+        # chmodded after bind, so there is no moment in which others can connect
+        umask = os.umask(0o177)
+        try:
+            self._server.bind(path)
+        finally:
+            os.umask(umask)
+        self._server.listen()
+        self._server.settimeout(ACCEPT_TIMEOUT)
+        logger.info(f"Job daemon listening on {path} (pid {os.getpid()})")
+        self.resume()
+
+        try:
+            while not self._stopping.is_set():
+                try:
+                    connection, _ = self._server.accept()
+                except socket.timeout:
+                    continue
+                connection.settimeout(None)
+                threading.Thread(target=self.handle_connection, args=(connection,), daemon=True).start()
+        finally:
+            self._server.close()
+            if os.path.exists(path):
+                os.remove(path)
+            # Running jobs stop at their next check and are queued again for the next daemon
+            self.runtime.shutdown(cancel=True)
+            self.store.close()
+
+
+# --- Client ---
+def connect(directory=None, timeout=CONNECT_TIMEOUT):
+    client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    client.settimeout(timeout)
+    try:
+        client.connect(socket_path(directory))
+    except OSError:
+        client.close()
+        raise
+    return client
+
+
+def send_request(request, directory=None, timeout=CONNECT_TIMEOUT):
+    """Sends one request to the daemon and returns its response; raises RuntimeError on errors."""
+    with connect(directory, timeout) as client, client.makefile("rw", encoding="utf-8") as stream:
+        stream.write(json.dumps(request) + "\n")
+        stream.flush()
+        response = json.loads(stream.readline())
+    if not response.get("ok"):
+        raise RuntimeError(response.get("error", "Job daemon request failed."))
+    return response
+
+
+def is_running(directory=None):
+    try:
+        send_request({"op": "ping"}, directory)
+        return True
+    except (OSError, ValueError, RuntimeError):
+        return False
+
+
+def ensure_daemon(directory=None):
+    """Starts the daemon in its own session (so closing the launcher does not stop it) if needed."""
+    if is_running(directory):
+        return
+    directory = daemon_dir(directory)
+    os.makedirs(directory, mode=0o700, exist_ok=True)
+    with open(os.path.join(directory, LOG_FILE), "a") as log:
+        subprocess.Popen([sys.executable, os.path.abspath(__file__), "--dir", directory, "serve"],
+                         stdin=subprocess.DEVNULL, stdout=log, stderr=subprocess.STDOUT, start_new_session=True)
+
+    deadline = time.monotonic() + STARTUP_TIMEOUT
+    while time.monotonic() < deadline:
+        if is_running(directory):
+            return
+        time.sleep(0.1)
+    raise RuntimeError(f"The job daemon did not start, see {os.path.join(directory, LOG_FILE)}")
+
+
+def submit_job(job_type, args, directory=None):
+    """Submits a job to the daemon (starting it if needed) and returns the job id."""
+    ensure_daemon(directory)
+    return send_request({"op": "submit", "type": job_type, "args": args}, directory)["job_id"]
+
+
+def job_status(job_id, directory=None):
+    return send_request({"op": "status", "job_id": job_id}, directory)["job"]
+
+
+def watch_job(job_id, directory=None):
+    """Yields the job's state as it changes, until it finishes (reattach from any client)."""
+    with connect(directory, timeout=None) as client, client.makefile("rw", encoding="utf-8") as stream:
+        stream.write(json.dumps({"op": "watch", "job_id": job_id}) + "\n")
+        stream.flush()
+        for line in stream:
+            response = json.loads(line)
+            if not response.get("ok"):
+                raise RuntimeError(response.get("error"))
+            yield response["job"]
+
+
+def format_job(job):
+    progress = f"{job['value']}/{job['maximum']}" if job["maximum"] else "-"
+    return f"#{job['id']:<5} {job['type']:<24} {job['state']:<10} {progress}"
+
+
+class DaemonJobPoller:
+    """Submits a job to the daemon and follows it from a Tk window.
+
+    The socket calls (starting the daemon, submitting, watching and cancelling) run on a
+    background thread, which hands the job's state to the Tk thread through a queue drained
+    with after(), so a slow or missing daemon never freezes the window. on_progress(value,
+    maximum) is called while the job runs and on_done(job) once it finished, or with a failed
+    job if the daemon could not be reached. Closing the window only stops following the job.
+    """
+
+    def __init__(self, widget, job_type, args, on_progress, on_done, directory=None,
+                 interval_ms=int(WATCH_INTERVAL * 1000)):
+        self.widget = widget
+        self.directory = directory
+        self.job_id = None
+        self.on_progress = on_progress
+        self.on_done = on_done
+        self.interval_ms = interval_ms
+        self._updates = queue.Queue()
+        self._cancel = threading.Event()
+        threading.Thread(target=self._follow, args=(job_type, args), daemon=True).start()
+        self.widget.after(interval_ms, self.poll)
+
+    def cancel(self):
+        """Asks the daemon to cancel the job; the request is sent by the background thread."""
+        self._cancel.set()
+
+    def _follow(self, job_type, args):
+        """Background thread: submits the job and queues its state until it finished."""
+        try:
+            self.job_id = submit_job(job_type, args, self.directory)
+        except (OSError, ValueError, RuntimeError) as e:
+            self._updates.put({"id": None, "state": FAILED, "error": f"Could not submit the job to the daemon: {e}",
+                               "result": None})
+            return
+
+        cancel_sent = False
+        try:
+            for job in watch_job(self.job_id, self.directory):  # The daemon sends at least every WATCH_INTERVAL
+                self._updates.put(job)
+                if job["state"] in FINISHED_STATES:
+                    return
+                if self._cancel.is_set() and not cancel_sent:
+                    cancel_sent = True
+                    try:
+                        send_request({"op": "cancel", "job_id": self.job_id}, self.directory)
+                    except (OSError, RuntimeError) as e:
+                        logger.error(f"Error cancelling job #{self.job_id}: {e}")
+            error = "the daemon stopped"
+        except (OSError, ValueError, RuntimeError) as e:
+            error = str(e)
+        self._updates.put({"id": self.job_id, "state": FAILED, "error": f"Lost the job daemon: {error}",
+                           "result": None})
+
+    def poll(self):
+        """Delivers the latest state of the job (Tk thread), then reschedules itself."""
+        job = None
+        while True:
+            try:
+                job = self._updates.get_nowait()
+            except queue.Empty:
+                break
+            if job["state"] in FINISHED_STATES:
+                break
+
+        if job is not None and job["state"] in FINISHED_STATES:
+            self.on_done(job)
+            return
+        if job is not None:
+            self.on_progress(job["value"], job["maximum"])
+        try:
+            self.widget.after(self.interval_ms, self.poll)
+        except tk.TclError:
+            pass  # The window was destroyed
+
+
+# --- GUI Integration ---
+class JobMonitor(ttk.Frame):
+    """Lists the daemon's jobs with their progress; any window can reattach to running jobs.
+
+    Requests to the daemon run as jobs of a JobRuntime, so the window stays responsive while
+    the daemon starts or does not answer.
+    """
+
+    def __init__(self, parent, directory=None, runtime=None):
+        super().__init__(parent, padding=20)
+        self.directory = directory
+        self.runtime = runtime
+        if self.runtime is None:
+            self.runtime = JobRuntime()
+            self.runtime.attach(self)
+
+        self.tree = ttk.Treeview(self, columns=("type", "state", "progress", "time"), show="headings", height=15)
+        for column, heading, width in (("type", "Job", 220), ("state", "State", 90),
+                                       ("progress", "Progress", 110), ("time", "Time", 80)):
+            self.tree.heading(column, text=heading)
+            self.tree.column(column, width=width, anchor="w")
+        self.tree.pack(expand=True, fill="both")
+
+        self.status_label = ttk.Label(self, text="")
+        self.status_label.pack(fill="x", pady=(5, 0))
+
+        self.cancel_button = ttk.Button(self, text="Cancel Selected Job", command=self.cancel_selected)
+        self.cancel_button.pack(fill="x", pady=(5, 0))
+        self.start_button = ttk.Button(self, text="Start Job Daemon", command=self.start_daemon)
+        self.start_button.pack(fill="x", pady=(5, 0))
+
+        self.refresh()
+
+    def start_daemon(self):
+        def daemon_started(job):
+            self.start_button["state"] = "normal"
+            if job.error is not None:
+                messagebox.showerror("Error", str(job.error))
+            self.refresh(reschedule=False)
+
+        self.start_button["state"] = "disabled"
+        self.runtime.submit(lambda job: ensure_daemon(self.directory), name="Start Job Daemon", on_done=daemon_started)
+
+    def cancel_selected(self):
+        def cancel_jobs(job, job_ids):
+            errors = []
+            for job_id in job_ids:
+                try:
+                    send_request({"op": "cancel", "job_id": job_id}, self.directory)
+                except (OSError, RuntimeError) as e:
+                    errors.append(f"Error cancelling job #{job_id}: {e}")
+            return errors
+
+        def jobs_cancelled(job):
+            if job.result:
+                messagebox.showerror("Error", "\n".join(job.result))
+
+        job_ids = [int(item) for item in self.tree.selection()]
+        if job_ids:
+            self.runtime.submit(cancel_jobs, job_ids, name="Cancel Jobs", on_done=jobs_cancelled)
+
+    def refresh(self, reschedule=True):
+        def list_jobs(job):
+            try:
+                return send_request({"op": "list"}, self.directory)["jobs"]
+            except (OSError, ValueError, RuntimeError):
+                return None
+
+        self.runtime.submit(list_jobs, name="List Jobs", on_done=lambda job: self.show_jobs(job.result, reschedule))
+
+    def show_jobs(self, jobs, reschedule=True):
+        """Fills the tree with the listed jobs (None: the daemon is not running), then schedules the next refresh."""
+        if jobs is None:
+            self.status_label.config(text="Job daemon is not running.")
+        else:
+            self.status_label.config(text=f"Connected to {socket_path(self.directory)}")
+            selection = self.tree.selection()
+            self.tree.delete(*self.tree.get_children())
+            now = time.time()
+            for job in jobs:
+                percent = f" ({100 * job['value'] // job['maximum']}%)" if job["maximum"] else ""
+                progress = f"{job['value']}/{job['maximum']}{percent}" if job["maximum"] else "-"
+                elapsed = ""
+                if job["started_at"]:
+                    elapsed = f"{(job['finished_at'] or now) - job['started_at']:.0f}s"
+                self.tree.insert("", "end", iid=str(job["id"]), values=(
+                    f"#{job['id']} {job['type']}", job["state"], progress, elapsed))
+            self.tree.selection_set([item for item in selection if self.tree.exists(item)])
+
+        if reschedule:
+            self.after(MONITOR_REFRESH_MS, self.refresh)
+
+
+def run_monitor(directory=None):
+    root = tk.Tk()
+    root.title("Background Jobs")
+    root.geometry("600x500")
+
+    style = ttk.Style(root)
+    style.theme_use('clam')
+    bg_color = '#2e2e2e'
+    fg_color = 'white'
+    button_bg_color = '#4a4a4a'
+    button_active_bg_color = '#606060'
+    style.configure('.', background=bg_color, foreground=fg_color, font=("Bahnschrift", 10))
+    style.configure('TLabel', background=bg_color, foreground=fg_color, padding=5, font=("Bahnschrift", 11))
+    style.configure('TButton', background=button_bg_color, foreground=fg_color, padding=8, relief='flat',
+                    font=("Bahnschrift", 11), borderwidth=0, focuscolor='gray',
+                    activebackground=button_active_bg_color, activeforeground=fg_color)
+    style.map('TButton', background=[('active', button_active_bg_color)])
+
+    monitor = JobMonitor(root, directory)
+    monitor.pack(expand=True, fill="both")
+    root.mainloop()
+    monitor.runtime.shutdown()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Background job daemon for the eli_lab tools.")
+    parser.add_argument("--dir", help=f"Daemon directory (default: ${DAEMON_DIR_ENV} or {DEFAULT_DAEMON_DIR}).")
+    subparsers = parser.add_subparsers(dest="command")
+
+    serve_parser = subparsers.add_parser("serve", help="Run the daemon in the foreground.")
+    serve_parser.add_argument("--workers", type=int, default=DAEMON_WORKERS)
+    add_profiling_arguments(serve_parser)
+    subparsers.add_parser("start", help="Start the daemon in the background if it is not running.")
+    submit_parser = subparsers.add_parser("submit", help="Submit a job.")
+    submit_parser.add_argument("type", choices=sorted(JOB_TYPES))
+    submit_parser.add_argument("args", help='Job arguments as JSON, e.g. \'{"directory": "/textures"}\'')
+    submit_parser.add_argument("--watch", action="store_true", help="Follow the job until it finishes.")
+    subparsers.add_parser("list", help="List recent jobs.")
+    for command in ("status", "watch", "cancel"):
+        subparsers.add_parser(command).add_argument("job_id", type=int)
+    subparsers.add_parser("shutdown", help="Stop the daemon; running jobs resume on the next start.")
+    add_logging_arguments(parser)
+    args = parser.parse_args(argv)
+    setup_logging(args.log_level)
+
+    if args.command is None:
+        run_monitor(args.dir)  # Launched from init.py
+        return 0
+    if not daemon_available():
+        print("The job daemon needs Unix domain sockets, which this platform does not provide.")
+        return 1
+
+    try:
+        if args.command == "serve":
+            if args.profile:
+                os.environ[PROFILE_ENV] = args.profile  # Each job is profiled as it runs (see JobRuntime._run)
+            JobDaemon(args.dir, args.workers).serve_forever()
+        elif args.command == "start":
+            ensure_daemon(args.dir)
+            print(f"Job daemon running on {socket_path(args.dir)}")
+        elif args.command == "submit":
+            job_id = submit_job(args.type, json.loads(args.args), args.dir)
+            print(f"Submitted job #{job_id}")
+            if args.watch:
+                for job in watch_job(job_id, args.dir):
+                    print(format_job(job))
+        elif args.command == "list":
+            for job in send_request({"op": "list"}, args.dir)["jobs"]:
+                print(format_job(job))
+        elif args.command == "status":
+            print(json.dumps(job_status(args.job_id, args.dir), indent=4))
+        elif args.command == "watch":
+            for job in watch_job(args.job_id, args.dir):
+                print(format_job(job))
+        elif args.command == "cancel":
+            send_request({"op": "cancel", "job_id": args.job_id}, args.dir)
+        elif args.command == "shutdown":
+            send_request({"op": "shutdown"}, args.dir)
+    except (OSError, RuntimeError, ValueError) as e:
+        print(f"Error: {e}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,334 @@
+import itertools
+import logging
+import os
+import queue
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+
+from profiling import profiled
+from throughput import ThroughputMeter
+
+logger = logging.getLogger(__name__)
+
+# --- Constants ---
+MAX_CONCURRENT_JOBS = 2  # Jobs taken off the queue at the same time; the rest wait their turn
+THREAD_WORKERS = 8  # Shared pool for I/O-bound work items (copies, subprocesses, scans)
+PROCESS_WORKERS = None  # Shared pool for CPU-bound work items (None: one per CPU)
+PUMP_INTERVAL_MS = 50  # How often the Tk main thread drains job events
+PUMP_BUDGET_SECONDS = 0.02  # Longest a single pump may run before yielding back to Tk
+PROGRESS_INTERVAL = 0.1  # Progress events are sent at most this often, which caps the progress bar redraws
+JOB_KINDS = ("thread", "process")
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+
+class JobCancelled(Exception):
+    """Raised inside a job when its cancellation token was triggered."""
+
+
+class CancellationToken:
+    """A flag a job polls to find out that it should stop."""
+
+    def __init__(self):
+        self._event = threading.Event()
+
+    def cancel(self):
+        self._event.set()
+
+    @property
+    def cancelled(self):
+        return self._event.is_set()
+
+    def raise_if_cancelled(self):
+        if self._event.is_set():
+            raise JobCancelled()
+
+
+class Job:
+    """One unit of long-running work, plus the events it reports back.
+
+    The job function receives the Job as its first argument and uses it to report progress
+    (start/progress), to check for cancellation (check) and to fan work items out over the
+    shared pools (map). Event callbacks run on the Tk main thread when the runtime is attached
+    to a widget, and directly otherwise, so the same function works from a GUI and a CLI.
+    job.meter (a throughput.ThroughputMeter) has the files/sec, MB/sec and ETA of the progress.
+
+    A Job can also be created on its own (Job("name")) to call job-aware functions synchronously.
+    """
+
+    _ids = itertools.count(1)
+
+    def __init__(self, name, runtime=None, on_start=None, on_progress=None, on_done=None):
+        self.id = next(self._ids)
+        self.name = name
+        self.runtime = runtime
+        self.token = CancellationToken()
+        self.state = QUEUED
+        self.result = None
+        self.error = None
+        self.maximum = 0
+        self.value = 0
+        self.on_start = on_start
+        self.on_progress = on_progress
+        self.on_done = on_done
+        self.meter = ThroughputMeter()
+        self._progress_posted = 0.0
+        self.queued_at = time.perf_counter()
+        self.started_at = None
+        self.finished_at = None
+        self.future = None
+
+    # --- Timing ---
+    @property
+    def wait_time(self):
+        """Seconds the job spent in the queue."""
+        return (self.started_at or time.perf_counter()) - self.queued_at
+
+    @property
+    def run_time(self):
+        """Seconds the job has been (or was) running."""
+        if self.started_at is None:
+            return 0.0
+        return (self.finished_at or time.perf_counter()) - self.started_at
+
+    # --- Reporting ---
+    def _post(self, callback, *args):
+        if callback is None:
+            return
+        if self.runtime is not None:
+            self.runtime.post(callback, *args)
+        else:
+            callback(*args)
+
+    def start(self, maximum, done=0):
+        """Announces the number of steps the job will take (done: steps finished by an earlier run)."""
+        self.maximum = maximum
+        self.value = done
+        self.meter.start(maximum, done)
+        self._post(self.on_start, maximum)
+
+    def progress(self, value, bytes_done=None):
+        """Reports the number of steps completed so far, and optionally the bytes processed.
+
+        The meter sees every call, but on_progress is sent at most every PROGRESS_INTERVAL
+        seconds (and for the last step), so a fast batch does not redraw the GUI per file.
+        """
+        self.value = value
+        self.meter.update(value, bytes_done)
+        now = time.perf_counter()
+        if value < self.maximum and now - self._progress_posted < PROGRESS_INTERVAL:
+            return
+        self._progress_posted = now
+        self._post(self.on_progress, value)
+
+    # --- Cancellation ---
+    def cancel(self):
+        """Asks the job to stop at its next check; queued jobs never start."""
+        self.token.cancel()
+        if self.future is not None and self.future.cancel():
+            # Never started, so _run will not report it
+            self.state = CANCELLED
+            self.started_at = self.finished_at = time.perf_counter()
+            if self.runtime is not None:
+                self.runtime.forget(self)
+            self._post(self.on_done, self)
+
+    def check(self):
+        """Raises JobCancelled if the job was cancelled (call between work items)."""
+        self.token.raise_if_cancelled()
+
+    # --- Work items ---
+    def map(self, function, items, kind="thread", max_workers=None):
+        """Runs function(item) for every item on a shared pool, yielding (item, result) as they finish.
+
+        At most twice the pool size (or max_workers, to run fewer items at once) is in flight,
+        so cancelling stops the job after the running items instead of draining a queue of
+        thousands. "process" items need a picklable, module-level function (functools.partial
+        of one is fine).
+        """
+        if self.runtime is not None:
+            executor, workers, owned = self.runtime.executor(kind), self.runtime.workers(kind), False
+        else:
+            executor, workers, owned = _new_executor(kind, max_workers), max_workers or _pool_size(kind), True
+        in_flight = max_workers or workers * 2
+
+        items = iter(items)
+        pending = {}
+        try:
+            while True:
+                self.check()
+                while len(pending) < in_flight:
+                    item = next(items, _END)
+                    if item is _END:
+                        break
+                    pending[executor.submit(function, item)] = item
+                if not pending:
+                    return
+
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    item = pending.pop(future)
+                    yield item, future.result()
+        finally:
+            for future in pending:
+                future.cancel()
+            if owned:
+                executor.shutdown(wait=True, cancel_futures=True)
+
+    # --- Results ---
+    def wait(self, timeout=None):
+        """Blocks until the job finished and returns its result (re-raising its error)."""
+        if self.future is not None and not self.future.cancelled():
+            self.future.result(timeout)
+        if self.state == CANCELLED:
+            raise JobCancelled()
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+
+_END = object()
+
+
+def _pool_size(kind):
+    if kind == "process":
+        return PROCESS_WORKERS or os.cpu_count() or 1
+    return THREAD_WORKERS
+
+
+def _new_executor(kind, workers=None):
+    if kind not in JOB_KINDS:
+        raise ValueError(f"Unknown job kind '{kind}', expected one of {JOB_KINDS}")
+    if kind == "process":
+        return ProcessPoolExecutor(max_workers=workers or _pool_size(kind))
+    return ThreadPoolExecutor(max_workers=workers or _pool_size(kind), thread_name_prefix="job-worker")
+
+
+class JobRuntime:
+    """A job queue with shared thread and process pools, used by every long-running tool.
+
+    Jobs are queued and at most max_jobs run at once. Their work items run on one shared
+    thread pool (I/O) and one shared process pool (CPU, created on first use). Job events are
+    queued and delivered on the Tk main thread by a pump scheduled with after(), so job code
+    never touches widgets; without an attached widget events are delivered immediately.
+    """
+
+    def __init__(self, max_jobs=MAX_CONCURRENT_JOBS, thread_workers=THREAD_WORKERS, process_workers=PROCESS_WORKERS):
+        self._job_executor = ThreadPoolExecutor(max_workers=max_jobs, thread_name_prefix="job")
+        self._pool_sizes = {"thread": thread_workers, "process": process_workers or _pool_size("process")}
+        self._pools = {}
+        self._pools_lock = threading.Lock()
+        self._events = queue.Queue()
+        self._widget = None
+        self.jobs = {}  # Job id -> Job, while queued or running
+        self._jobs_lock = threading.Lock()
+
+    # --- Pools ---
+    def workers(self, kind):
+        return self._pool_sizes[kind]
+
+    def executor(self, kind):
+        """Returns the shared pool for a kind of work item, creating it on first use."""
+        with self._pools_lock:
+            if kind not in self._pools:
+                self._pools[kind] = _new_executor(kind, self._pool_sizes.get(kind))
+            return self._pools[kind]
+
+    # --- Events ---
+    def attach(self, widget, interval_ms=PUMP_INTERVAL_MS):
+        """Delivers job events on the Tk main thread of widget from now on."""
+        self._widget = widget
+        self._interval_ms = interval_ms
+        widget.after(interval_ms, self.pump)
+
+    def post(self, callback, *args):
+        if self._widget is None:
+            callback(*args)
+        else:
+            self._events.put((callback, args))
+
+    def pump(self):
+        """Runs queued event callbacks (Tk main thread), then reschedules itself."""
+        deadline = time.perf_counter() + PUMP_BUDGET_SECONDS
+        try:
+            while time.perf_counter() < deadline:
+                try:
+                    callback, args = self._events.get_nowait()
+                except queue.Empty:
+                    break
+                try:
+                    callback(*args)
+                except Exception as e:
+                    logger.error(f"Error in job event callback {getattr(callback, '__name__', callback)}: {e}")
+        finally:
+            if self._widget is not None:
+                try:
+                    self._widget.after(self._interval_ms, self.pump)
+                except Exception:
+                    self._widget = None  # The window was destroyed
+
+    # --- Jobs ---
+    def submit(self, function, *args, name=None, on_start=None, on_progress=None, on_done=None, **kwargs):
+        """Queues function(job, *args, **kwargs) and returns the Job.
+
+        Args:
+            function: The job function; it receives the Job as its first argument.
+            name: Name used in logs (defaults to the function name).
+            on_start: Called with the step count when the job calls job.start().
+            on_progress: Called with the completed step count.
+            on_done: Called with the Job once it finished, failed or was cancelled; check
+                job.state, job.result and job.error.
+        """
+        job = Job(name or getattr(function, "__name__", "job"), self, on_start, on_progress, on_done)
+        with self._jobs_lock:
+            self.jobs[job.id] = job
+        job.future = self._job_executor.submit(self._run, job, function, args, kwargs)
+        return job
+
+    def _run(self, job, function, args, kwargs):
+        job.started_at = time.perf_counter()
+        job.state = RUNNING
+        try:
+            job.check()
+            with profiled(job.name):  # Only if $ELI_LAB_PROFILE asks for it
+                job.result = function(job, *args, **kwargs)
+            job.state = DONE
+        except JobCancelled:
+            job.state = CANCELLED
+        except Exception as e:
+            job.error = e
+            job.state = FAILED
+            logger.error(f"Job '{job.name}' failed: {e}")
+        finally:
+            job.finished_at = time.perf_counter()
+            logger.info(f"Job '{job.name}' {job.state} in {job.run_time:.2f}s (queued {job.wait_time:.2f}s)")
+            self.forget(job)
+            job._post(job.on_done, job)
+
+    def forget(self, job):
+        """Drops a finished job, so a long-running GUI does not keep every job it ever ran."""
+        with self._jobs_lock:
+            self.jobs.pop(job.id, None)
+
+    def cancel_all(self):
+        with self._jobs_lock:
+            jobs = list(self.jobs.values())
+        for job in jobs:
+            if job.state in (QUEUED, RUNNING):
+                job.cancel()
+
+    def shutdown(self, cancel=True):
+        """Stops the runtime; with cancel, running jobs are asked to stop first."""
+        if cancel:
+            self.cancel_all()
+        self._widget = None
+        self._job_executor.shutdown(wait=True, cancel_futures=cancel)
+        with self._pools_lock:
+            for pool in self._pools.values():
+                pool.shutdown(wait=True, cancel_futures=cancel)
+            self._pools.clear()
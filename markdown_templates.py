@@ -0,0 +1,127 @@
+import hashlib
+import os
+import re
+import string
+
+# --- Constants ---
+TEMPLATES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "documentation_templates")
+DEFAULT_TEMPLATE = os.path.join(TEMPLATES_DIR, "project_documentation.md")
+PROJECT_TEMPLATE_FILE = "project_documentation_template.md"  # Per-project override, next to the metadata
+TEMPLATE_ENV = "ELI_LAB_DOC_TEMPLATE"  # Studio-wide override
+DEFAULT_SECTION = "header"  # Name of the text before the first section marker
+
+# A marker line starts a new section: <!-- section: crew -->
+SECTION_MARKER = re.compile(r"^<!--\s*section:\s*([\w-]+)\s*-->[ \t]*\n?", re.MULTILINE)
+
+_template_cache = {}  # path -> ((mtime_ns, size), DocumentTemplate)
+
+
+# --- Helper Functions ---
+def compile_section(text):
+    """Splits a section into (literal, field name) parts once, so rendering is a join."""
+    parts = []
+    for literal, field, format_spec, conversion in string.Formatter().parse(text):
+        if format_spec or conversion:
+            raise ValueError(f"Template field '{field}' uses a format spec or conversion, which is not supported.")
+        parts.append((literal, field))
+    return parts
+
+
+class DocumentTemplate:
+    """A Markdown template made of named sections that are rendered and cached separately.
+
+    Sections are delimited by "<!-- section: name -->" lines (the markers are not part of the
+    output) and use {field} placeholders. Each section remembers the field values it was last
+    rendered with, so after one input changes only the sections using that field are rendered
+    again; the others come straight from the fragment cache.
+    """
+
+    def __init__(self, source, name="<string>"):
+        self.name = name
+        self.source_hash = hashlib.sha256(source.encode("utf-8")).hexdigest()
+        self.sections = []  # (section name, compiled parts, fields used)
+        self._fragments = {}  # section name -> (field values, rendered text)
+
+        pieces = SECTION_MARKER.split(source)
+        # split() yields [text before the first marker, name, text, name, text, ...]
+        named_sections = list(zip(pieces[1::2], pieces[2::2]))
+        if pieces[0]:
+            named_sections.insert(0, (DEFAULT_SECTION, pieces[0]))
+
+        seen = set()
+        for section_name, text in named_sections:
+            if section_name in seen:
+                raise ValueError(f"Template '{name}' defines section '{section_name}' more than once.")
+            seen.add(section_name)
+            parts = compile_section(text)
+            fields = tuple(sorted({field for _, field in parts if field is not None}))
+            self.sections.append((section_name, parts, fields))
+
+    def fields(self):
+        """Returns every field the template uses."""
+        return sorted({field for _, _, fields in self.sections for field in fields})
+
+    def render_sections(self, values):
+        """Renders the template section by section.
+
+        Args:
+            values: Dict of field name -> value.
+
+        Returns:
+            A list of (section name, rendered text), in template order.
+        """
+        rendered = []
+        for section_name, parts, fields in self.sections:
+            try:
+                key = tuple(values[field] for field in fields)
+            except KeyError as e:
+                raise ValueError(f"Template '{self.name}' section '{section_name}' uses unknown field {e}.") from None
+
+            cached = self._fragments.get(section_name)
+            if cached is not None and cached[0] == key:
+                rendered.append((section_name, cached[1]))
+                continue
+
+            text = []
+            for literal, field in parts:
+                text.append(literal)
+                if field is not None:
+                    text.append(str(values[field]))
+            text = "".join(text)
+            self._fragments[section_name] = (key, text)
+            rendered.append((section_name, text))
+        return rendered
+
+    def render(self, values):
+        """Renders the whole template to a string."""
+        return "".join(text for _, text in self.render_sections(values))
+
+
+def load_template(path):
+    """Loads and compiles a template file, reusing the compiled template while the file is unchanged."""
+    path = os.path.abspath(path)
+    stat = os.stat(path)
+    stat_key = (stat.st_mtime_ns, stat.st_size)
+    cached = _template_cache.get(path)
+    if cached is not None and cached[0] == stat_key:
+        return cached[1]
+
+    with open(path, "r", encoding="utf-8") as f:
+        template = DocumentTemplate(f.read(), name=path)
+    _template_cache[path] = (stat_key, template)
+    return template
+
+
+def find_template(project_dir=None, template_path=None):
+    """Returns the template path to use for a project.
+
+    Lookup order: the explicit template_path, project_documentation_template.md in the project
+    directory, the ELI_LAB_DOC_TEMPLATE environment variable, then the bundled default.
+    """
+    if template_path:
+        return template_path
+    if project_dir:
+        candidate = os.path.join(project_dir, PROJECT_TEMPLATE_FILE)
+        if os.path.isfile(candidate):
+            return candidate
+    return os.environ.get(TEMPLATE_ENV) or DEFAULT_TEMPLATE
@@ -0,0 +1,152 @@
+import contextlib
+import copy
+import json
+import os
+import threading
+import time
+
+from file_ops import write_json_atomic
+
+# --- Constants ---
+METADATA_FILE = "project_metadata.json"
+LOCK_FILE = METADATA_FILE + ".lock"  # Sidecar lock; the metadata file itself is replaced on every save
+SCHEMA_VERSION = 1
+LOCK_TIMEOUT = 10.0  # Seconds to wait for another artist's save before giving up
+LOCK_POLL_INTERVAL = 0.05
+
+_cache = {}  # metadata path -> (inode, mtime_ns, size, metadata)
+_cache_lock = threading.Lock()
+
+
+# --- Helper Functions ---
+def metadata_path(directory):
+    """Returns the path of the project metadata file in a directory."""
+    return os.path.join(directory, METADATA_FILE)
+
+
+@contextlib.contextmanager
+def locked(directory, timeout=LOCK_TIMEOUT):
+    """Holds the exclusive advisory lock of a directory's metadata file.
+
+    Only writers lock: saves replace the file atomically, so readers always see a complete
+    file without locking (and work on read-only shares). Raises TimeoutError if the lock
+    cannot be taken within timeout seconds.
+    """
+    lock_path = os.path.join(directory, LOCK_FILE)
+    fd = os.open(lock_path, os.O_RDWR | os.O_CREAT, 0o666)
+    try:
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                _lock_fd(fd)
+                break
+            except OSError:
+                if time.monotonic() >= deadline:
+                    raise TimeoutError(f"Timed out waiting for the metadata lock '{lock_path}'.")
+                time.sleep(LOCK_POLL_INTERVAL)
+        try:
+            yield
+        finally:
+            _unlock_fd(fd)
+    finally:
+        os.close(fd)
+
+
+if os.name == "nt":
+    import msvcrt
+
+    def _lock_fd(fd):
+        os.lseek(fd, 0, os.SEEK_SET)
+        msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+
+    def _unlock_fd(fd):
+        os.lseek(fd, 0, os.SEEK_SET)
+        msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+else:
+    import fcntl
+
+    def _lock_fd(fd):
+        fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+
+    def _unlock_fd(fd):
+        fcntl.flock(fd, fcntl.LOCK_UN)
+
+
+def migrate(metadata):
+    """Brings metadata written by older versions up to SCHEMA_VERSION."""
+    version = metadata.get("schema_version", 0)
+    if version > SCHEMA_VERSION:
+        raise ValueError(f"Metadata schema version {version} is newer than supported ({SCHEMA_VERSION}).")
+    # Version 0 (files written before versioning) only lacks the version field
+    metadata["schema_version"] = SCHEMA_VERSION
+    return metadata
+
+
+def _stat_key(path):
+    # Every save is a new inode, which also catches saves within the mtime granularity of a share
+    stat = os.stat(path)
+    return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+
+def load_metadata(directory):
+    """Loads the project metadata of a directory.
+
+    Results are cached in-process and reused while the file's inode, mtime and size are
+    unchanged, so repeated loads only cost a stat. Callers get their own copy to modify.
+
+    Raises:
+        FileNotFoundError: No metadata file in the directory.
+        ValueError: The file is not valid JSON or has an unsupported schema version.
+    """
+    path = metadata_path(directory)
+    key = _stat_key(path)
+    with _cache_lock:
+        cached = _cache.get(path)
+    if cached and cached[:3] == key:
+        return copy.deepcopy(cached[3])
+
+    with open(path, "r") as f:
+        stat = os.fstat(f.fileno())  # Describes exactly the file being read
+        key = stat.st_ino, stat.st_mtime_ns, stat.st_size
+        metadata = migrate(json.load(f))
+
+    with _cache_lock:
+        _cache[path] = (*key, metadata)
+    return copy.deepcopy(metadata)
+
+
+def save_metadata(directory, metadata):
+    """Replaces the project metadata atomically under the exclusive lock."""
+    os.makedirs(directory, exist_ok=True)
+    with locked(directory):
+        _write(directory, metadata)
+
+
+def update_metadata(directory, changes):
+    """Merges changes into the project metadata under the exclusive lock.
+
+    Fields other tools added (status, crew, ...) survive, and two artists saving at the same
+    time cannot lose each other's fields.
+
+    Returns:
+        The merged metadata.
+    """
+    os.makedirs(directory, exist_ok=True)
+    path = metadata_path(directory)
+    with locked(directory):
+        try:
+            with open(path, "r") as f:
+                metadata = migrate(json.load(f))
+        except FileNotFoundError:
+            metadata = {}
+        metadata.update(changes)
+        _write(directory, metadata)
+    return copy.deepcopy(metadata)
+
+
+def _write(directory, metadata):
+    path = metadata_path(directory)
+    metadata = migrate(dict(metadata))
+    write_json_atomic(path, metadata, fsync=True)
+    with _cache_lock:
+        _cache[path] = (*_stat_key(path), copy.deepcopy(metadata))
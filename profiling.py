@@ -0,0 +1,220 @@
+import cProfile
+import io
+import logging
+import os
+import pstats
+import re
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+# --- Constants ---
+PROFILE_DIR_ENV = "ELI_LAB_PROFILE_DIR"
+DEFAULT_PROFILE_DIR = os.path.join(os.path.expanduser("~"), ".eli_lab", "profiles")
+PROFILE_ENV = "ELI_LAB_PROFILE"  # Profiling switch for the GUIs and the job daemon: "cpu", "memory" or "all"
+PROFILE_MODES = ("cpu", "memory", "all")
+TOP_HOTSPOTS = 20  # Functions (by cumulative time) and allocation sites (by size) printed after a run
+TRACEMALLOC_FRAMES = 10  # Stack depth kept per allocation; deeper is more useful and slower
+
+_session = None  # The ProfilingSession of this process, one at a time
+_session_lock = threading.Lock()
+
+
+# --- Helper Functions ---
+def default_profile_dir():
+    return os.environ.get(PROFILE_DIR_ENV) or DEFAULT_PROFILE_DIR
+
+
+def mode_from_environment():
+    """Returns the profiling mode asked for with $ELI_LAB_PROFILE, or None."""
+    mode = os.environ.get(PROFILE_ENV, "").strip().lower()
+    if not mode:
+        return None
+    if mode not in PROFILE_MODES:
+        logger.warning(f"Ignoring {PROFILE_ENV}={mode!r}, expected one of {PROFILE_MODES}")
+        return None
+    return mode
+
+
+def add_profiling_arguments(parser):
+    """Adds --profile to a command line parser (wrap the run in profiled(tool, args.profile))."""
+    parser.add_argument("--profile", choices=PROFILE_MODES, default=mode_from_environment(),
+                        help=f"Profile the run with cProfile (cpu), tracemalloc (memory) or both; "
+                             f"files are written to ${PROFILE_DIR_ENV} or {DEFAULT_PROFILE_DIR}.")
+
+
+class _CollectedStats:
+    """Lets pstats load the stats dict of a profile taken in a worker (see profile_call)."""
+
+    def __init__(self, stats):
+        self.stats = stats
+
+    def create_stats(self):
+        pass
+
+
+class ProfilingSession:
+    """cProfile and/or tracemalloc around one run of a tool.
+
+    Before Python 3.12 cProfile only sees the thread it was started on; from 3.12 it sees
+    every thread of the process, but only one profiler can be active at a time. Work items
+    that the session cannot see (other threads before 3.12, worker processes) are profiled
+    one by one where they run (see profile_call, used by instrumentation.instrumented) and
+    their stats are merged into a separate <tool>_<time>_workers.prof. tracemalloc covers
+    every thread of this process, but not worker processes.
+    """
+
+    def __init__(self, tool, mode="cpu", directory=None, top=TOP_HOTSPOTS):
+        self.tool = re.sub(r"[^A-Za-z0-9]+", "_", tool).strip("_").lower() or "run"
+        self.cpu = mode in ("cpu", "all")
+        self.memory = mode in ("memory", "all")
+        self.directory = directory or default_profile_dir()
+        self.top = top
+        self.profiler = None
+        self.worker_stats = []  # Stats dicts of the work items, merged when the session stops
+        self._lock = threading.Lock()
+        self._started_tracemalloc = False
+        self._stamp = time.strftime("%Y%m%d-%H%M%S")
+        self.pid = os.getpid()  # Forked workers inherit the session, but it does not profile them
+
+    def start(self):
+        if self.memory and not tracemalloc.is_tracing():
+            tracemalloc.start(TRACEMALLOC_FRAMES)
+            self._started_tracemalloc = True
+        if self.cpu:
+            self.profiler = cProfile.Profile()
+            self.profiler.enable()
+
+    def add_worker_stats(self, stats):
+        """Merges the stats dict of a work item profiled on a pool (see profile_call)."""
+        with self._lock:
+            self.worker_stats.append(stats)
+
+    def _path(self, suffix):
+        return os.path.join(self.directory, f"{self.tool}_{self._stamp}_{os.getpid()}{suffix}")
+
+    def stop(self):
+        """Stops profiling, writes the files and logs the top hotspots.
+
+        Returns:
+            The paths of the files written.
+        """
+        snapshot = peak = None
+        if self.profiler is not None:
+            self.profiler.disable()
+        if self._started_tracemalloc:
+            snapshot = tracemalloc.take_snapshot()
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+        os.makedirs(self.directory, exist_ok=True)
+        paths = []
+        report = []
+        if self.profiler is not None:
+            paths.append(self._path(".prof"))
+            self.profiler.dump_stats(paths[-1])
+            report.append(self.format_stats(pstats.Stats(self.profiler), f"CPU hotspots of {self.tool}"))
+        if self.worker_stats:
+            worker_stats = pstats.Stats(*(_CollectedStats(stats) for stats in self.worker_stats))
+            paths.append(self._path("_workers.prof"))
+            worker_stats.dump_stats(paths[-1])
+            report.append(self.format_stats(worker_stats, f"CPU hotspots of {self.tool}'s work items"))
+        if snapshot is not None:
+            paths.append(self._path(".tracemalloc"))
+            snapshot.dump(paths[-1])
+            report.append(self.format_snapshot(snapshot, peak))
+
+        if report:
+            logger.info("\n\n".join(report))
+        logger.info("Profile written to " + ", ".join(f"'{path}'" for path in paths))
+        return paths
+
+    def format_stats(self, stats, title):
+        stream = io.StringIO()
+        stats.stream = stream
+        stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(self.top)
+        return f"{title}:\n{stream.getvalue().strip()}"
+
+    def format_snapshot(self, snapshot, peak):
+        snapshot = snapshot.filter_traces([tracemalloc.Filter(False, tracemalloc.__file__),
+                                           tracemalloc.Filter(False, "<frozen importlib._bootstrap*>")])
+        lines = [f"Memory of {self.tool}: peak {peak / (1024 * 1024):.1f} MB traced, largest allocation sites:"]
+        for stat in snapshot.statistics("lineno")[:self.top]:
+            frame = stat.traceback[0]
+            lines.append(f"  {stat.size / 1024:10.1f} KiB {stat.count:8} blocks  {frame.filename}:{frame.lineno}")
+        return "\n".join(lines)
+
+
+def active():
+    """Returns the running ProfilingSession of this process, or None."""
+    return _session
+
+
+@contextmanager
+def profiled(tool, mode=None, directory=None):
+    """Profiles the enclosed run of a tool.
+
+    Args:
+        tool: Name used for the files, e.g. "convert_textures".
+        mode: "cpu", "memory", "all", or None to use $ELI_LAB_PROFILE (no profiling if unset).
+        directory: Where the files go (defaults to $ELI_LAB_PROFILE_DIR or ~/.eli_lab/profiles).
+
+    Only one run per process is profiled at a time; a run started while another is being
+    profiled (e.g. a second job in a GUI) runs unprofiled.
+
+    Yields:
+        The ProfilingSession, or None if this run is not profiled.
+    """
+    global _session
+    mode = mode or mode_from_environment()
+    with _session_lock:
+        if not mode or _session is not None:
+            session = None
+        else:
+            session = _session = ProfilingSession(tool, mode, directory)
+    if session is None:
+        yield None
+        return
+    session.start()
+    try:
+        yield session
+    finally:
+        try:
+            session.stop()
+        except OSError as e:
+            logger.error(f"Error writing the profile of {tool}: {e}")
+        finally:
+            with _session_lock:
+                _session = None
+
+
+def _monitoring_profiler():
+    """Returns the name of the sys.monitoring profiler of this process (Python 3.12+), or None."""
+    if sys.version_info < (3, 12):
+        return None
+    return sys.monitoring.get_tool(sys.monitoring.PROFILER_ID)
+
+
+def profile_call(function, *args):
+    """Runs function(*args) under cProfile (in a worker), returning (result, stats dict).
+
+    The stats are None when the item is not profiled separately: on Python 3.12+ the
+    session's own profiler already sees every thread of its process, and a profiler of
+    another tool blocks cProfile. A worker process forked from a profiled run inherits the
+    session's profiler, which collects nothing anyone reads; it is released first.
+    """
+    session = _session
+    profiler_tool = _monitoring_profiler()
+    if profiler_tool is not None:
+        if (session is not None and session.pid == os.getpid()) or profiler_tool != "cProfile":
+            return function(*args), None
+        sys.monitoring.set_events(sys.monitoring.PROFILER_ID, 0)
+        sys.monitoring.free_tool_id(sys.monitoring.PROFILER_ID)
+    profiler = cProfile.Profile()
+    result = profiler.runcall(function, *args)
+    profiler.create_stats()
+    return result, profiler.stats
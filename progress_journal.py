@@ -0,0 +1,149 @@
+import json
+import logging
+import os
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# --- Constants ---
+JOURNAL_SUFFIX = "_journal.jsonl"
+FSYNC_INTERVAL = 2.0  # Seconds between fsyncs; every line is still flushed to the OS straight away
+
+
+# --- Helper Functions ---
+def journal_path(directory, operation):
+    """Returns the journal file of an operation run on a directory, e.g. <dir>/.texture_convert_journal.jsonl."""
+    return os.path.join(directory, f".{operation}{JOURNAL_SUFFIX}")
+
+
+def read_journal(path):
+    """Replays a journal file.
+
+    A line cut short by a crash is ignored, so a journal is always readable up to the last
+    complete event.
+
+    Returns:
+        None if there is no journal, otherwise a dict describing the last run:
+        {"options": dict, "completed": {key: details}, "interrupted": {key: details},
+         "complete": bool}. "interrupted" holds items that were started but never finished.
+    """
+    try:
+        f = open(path, "r", encoding="utf-8")
+    except FileNotFoundError:
+        return None
+
+    state = None
+    started = {}
+    with f:
+        for line in f:
+            try:
+                event = json.loads(line)
+            except ValueError:
+                continue  # Partially written last line
+            kind = event.get("event")
+            if kind == "run":
+                state = {"options": event.get("options", {}), "completed": {}, "complete": False}
+                started = {}
+            elif state is None:
+                continue
+            elif kind == "start":
+                started[event["key"]] = event.get("details", {})
+            elif kind == "done":
+                started.pop(event["key"], None)
+                state["completed"][event["key"]] = event.get("details", {})
+            elif kind == "complete":
+                state["complete"] = True
+
+    if state is not None:
+        state["interrupted"] = started
+    return state
+
+
+class ProgressJournal:
+    """An append-only record of a batch run, so a killed run resumes where it stopped.
+
+    Every line is one JSON event: "run" opens a run with its options, "start" is written when
+    a work item is handed to a worker, "done" when its result came back, and "complete" once
+    the whole batch finished (the journal is then removed). Opening a journal whose last run
+    never completed, with the same options, resumes it: `completed` holds the finished items
+    and `interrupted` the ones that were in flight and need to be verified before they are
+    trusted or redone. Any other journal is replaced by a new run.
+
+    Lines are flushed as they are written, so they survive the process being killed, and the
+    file is fsynced at most every FSYNC_INTERVAL seconds, so they also survive a power cut
+    without an fsync per file.
+    """
+
+    def __init__(self, path, options=None):
+        self.path = path
+        self.options = json.loads(json.dumps(options or {}))  # As it reads back from the file
+        self.completed = {}
+        self.interrupted = {}
+        self.resumed = False
+        self._lock = threading.Lock()
+        self._last_sync = time.monotonic()
+
+        previous = read_journal(path)
+        if previous and not previous["complete"] and previous["options"] == self.options:
+            self.completed = previous["completed"]
+            self.interrupted = previous["interrupted"]
+            self.resumed = True
+            self._file = open(path, "a", encoding="utf-8")
+            self._write({"event": "resume", "time": time.time()})
+            logger.info(f"Resuming from journal '{path}': {len(self.completed)} done, "
+                        f"{len(self.interrupted)} interrupted")
+        else:
+            self._file = open(path, "w", encoding="utf-8")
+            self._write({"event": "run", "options": self.options, "time": time.time()})
+
+    def _write(self, event, sync=False):
+        with self._lock:
+            self._file.write(json.dumps(event) + "\n")
+            self._file.flush()
+            now = time.monotonic()
+            if sync or now - self._last_sync >= FSYNC_INTERVAL:
+                os.fsync(self._file.fileno())
+                self._last_sync = now
+
+    def start(self, key, **details):
+        """Records that a work item was handed to a worker."""
+        self._write({"event": "start", "key": key, "details": details})
+
+    def done(self, key, **details):
+        """Records that a work item finished, with whatever a resumed run needs to trust it."""
+        self.interrupted.pop(key, None)
+        self._write({"event": "done", "key": key, "details": details})
+
+    def track(self, items, key, details=None):
+        """Yields items, recording a "start" for each one as it is taken.
+
+        Pass the result to Job.map: items are taken as they are submitted, so the journal
+        knows exactly which items were in flight.
+
+        Args:
+            items: The work items.
+            key: Function returning the journal key of an item.
+            details: Optional function returning a dict stored with the "start" event.
+        """
+        for item in items:
+            self.start(key(item), **(details(item) if details else {}))
+            yield item
+
+    def close(self):
+        """Syncs and closes the journal, leaving it in place for a resumed run."""
+        with self._lock:
+            if self._file.closed:
+                return
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._file.close()
+
+    def complete(self):
+        """Marks the run as finished and removes the journal."""
+        self._write({"event": "complete", "time": time.time()}, sync=True)
+        self.close()
+        try:
+            os.remove(self.path)
+        except OSError as e:
+            logger.warning(f"Error removing journal '{self.path}': {e}")
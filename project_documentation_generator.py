@@ -1,15 +1,191 @@
+import argparse
+import hashlib
 import json
+import logging
 import os
+import sys
 import tkinter as tk
 import tkinter.ttk as ttk
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from tkinter import filedialog, messagebox
 
+import instrumentation
+import metadata_store
+from file_ops import write_json_atomic, write_text_atomic
+from markdown_templates import DEFAULT_TEMPLATE, find_template, load_template
+from run_logging import RunReport, add_logging_arguments, reporting, setup_logging
+
+logger = logging.getLogger(__name__)
+
+# --- Constants ---
+RENDER_DELAY_MS = 300  # Quiet time after the last keystroke before the preview is re-rendered
+DOCUMENTATION_FILE = "project_documentation.md"
+STATUS_CHOICES = ["In Development", "Pre-Production", "Production", "Ready"]
+LICENSE_CHOICES = ["MIT", "GNU GPL v3", "Apache License 2.0", "Other"]
+BATCH_STATE_FILE = ".documentation_batch_state.json"  # Kept in the studio root by batch runs
+BATCH_WORKERS = 16
+
+
+# --- Helper Functions ---
+@lru_cache(maxsize=8)
+def format_themes(key_themes):
+    """Formats comma-separated key themes as a Markdown list."""
+    themes = [theme.strip() for theme in key_themes.split(",")]
+    return "\n".join([f"* {theme}" for theme in themes])
+
+
+@lru_cache(maxsize=8)
+def format_crew(crew):
+    """Formats one crew member per line as a Markdown list (cached, crews can be long)."""
+    crew_members = [member.strip() for member in crew.split("\n")]
+    return "\n".join([f"* **{member}**" for member in crew_members])
+
+
+def render_markdown(fields, template=None):
+    """Renders the documentation with a template (the bundled default if none is given)."""
+    if template is None:
+        template = load_template(DEFAULT_TEMPLATE)
+    return template.render(fields)
+
+
+def documentation_fields(project_name, project_status, license_name, synopsis, project_code, client,
+                         pipeline_version, lead_artist, key_themes, contact_info, crew, acknowledgements):
+    """Turns the raw documentation values into the fields the documentation templates use."""
+    return {
+        "project_name": project_name,
+        "status_badge": project_status.replace(" ", "%20"),
+        "license_badge": license_name.replace(" ", "%20"),
+        "synopsis": synopsis,
+        "project_code": project_code,
+        "client": client,
+        "pipeline_version": pipeline_version,
+        "lead_artist": lead_artist,
+        "formatted_themes": format_themes(key_themes),
+        "formatted_crew": format_crew(crew),
+        "contact_info": contact_info,
+        "acknowledgements": acknowledgements,
+    }
+
+
+def documentation_fields_from_metadata(metadata):
+    """Builds the template fields straight from metadata, as the GUI would populate them."""
+    return documentation_fields(
+        project_name=metadata.get("project_name", "[Project Name Placeholder]"),
+        project_status=metadata.get("project_status", STATUS_CHOICES[0]),
+        license_name=metadata.get("license", LICENSE_CHOICES[0]),
+        synopsis=metadata.get("project_description", "").strip(),
+        project_code=metadata.get("project_code", ""),
+        client=metadata.get("client", ""),
+        pipeline_version=metadata.get("pipeline_version", ""),
+        lead_artist=metadata.get("lead_artist", ""),
+        key_themes=metadata.get("key_themes", ""),
+        contact_info=metadata.get("contact", ""),
+        crew=metadata.get("crew", "").strip(),
+        acknowledgements=metadata.get("acknowledgements", "").strip(),
+    )
+
+
+def find_metadata_dirs(studio_root):
+    """Finds every directory below studio_root that holds a project_metadata.json."""
+    metadata_dirs = []
+    for dirpath, dirnames, filenames in os.walk(studio_root):
+        dirnames[:] = [d for d in dirnames if not d.startswith(".")]
+        if metadata_store.METADATA_FILE in filenames:
+            metadata_dirs.append(dirpath)
+    return metadata_dirs
+
+
+def generate_documentation_batch(studio_root, max_workers=BATCH_WORKERS, force=False, template_path=None,
+                                 report=None):
+    """Renders project_documentation.md for every project below a studio root.
+
+    Projects are rendered in parallel from compiled templates (template_path, or each
+    project's own template as found by find_template). A project is skipped when its
+    documentation exists and neither its metadata (by content hash, or by inode/mtime/size
+    without even reading it) nor its template changed since the last batch run.
+
+    Outcomes and failures also go to report (a run_logging.RunReport, created if not given),
+    which is written to the reports folder when the run ends.
+
+    Returns:
+        {"rendered": [...], "skipped": [...], "failed": [(metadata_dir, error), ...],
+         "report": path of the text report}
+    """
+    report = report or RunReport("generate_documentation", os.path.abspath(studio_root))
+    with instrumentation.run("generate_documentation") as metrics, reporting(report, metrics):
+        results = _generate_documentation_batch(studio_root, max_workers, force, template_path, report)
+    results["report"] = report.paths and report.paths[1]
+    return results
+
+
+def _generate_documentation_batch(studio_root, max_workers, force, template_path, report):
+    state_path = os.path.join(studio_root, BATCH_STATE_FILE)
+    try:
+        with open(state_path, "r") as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        state = {}
+
+    def render_project(metadata_dir):
+        project = os.path.relpath(metadata_dir, studio_root)
+        template = load_template(find_template(metadata_dir, template_path))
+        template_hash = template.source_hash
+        previous = state.get(project, {})
+        output_path = os.path.join(metadata_dir, DOCUMENTATION_FILE)
+        stat = os.stat(metadata_store.metadata_path(metadata_dir))
+        stat_key = [stat.st_ino, stat.st_mtime_ns, stat.st_size]
+        up_to_date = not force and previous.get("template_hash") == template_hash and os.path.exists(output_path)
+
+        if up_to_date and previous.get("stat") == stat_key:
+            return project, "skipped", previous
+
+        metadata = metadata_store.load_metadata(metadata_dir)
+        metadata_hash = hashlib.sha256(json.dumps(metadata, sort_keys=True).encode("utf-8")).hexdigest()
+        entry = {"template_hash": template_hash, "metadata_hash": metadata_hash, "stat": stat_key}
+        if up_to_date and previous.get("metadata_hash") == metadata_hash:
+            return project, "skipped", entry
+
+        write_text_atomic(output_path, template.render(documentation_fields_from_metadata(metadata)))
+        return project, "rendered", entry
+
+    def safe_render(metadata_dir):
+        try:
+            return render_project(metadata_dir)
+        except Exception as e:
+            return os.path.relpath(metadata_dir, studio_root), "failed", str(e)
+
+    results = {"rendered": [], "skipped": [], "failed": []}
+    new_state = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for project, outcome, detail in executor.map(safe_render, find_metadata_dirs(studio_root)):
+            instrumentation.count("files")
+            report.count(outcome)
+            if outcome == "failed":
+                results["failed"].append((project, detail))
+                report.error(project, detail)
+                continue
+            new_state[project] = detail
+            results[outcome].append(project)
+
+    try:
+        write_json_atomic(state_path, new_state)
+    except OSError as e:
+        report.error(BATCH_STATE_FILE, f"Could not save the batch state: {e}")
+    return results
+
 
 class DocumentationGenerator(ttk.Frame):
     def __init__(self, parent, metadata_dir=None):
         super().__init__(parent)
         self.parent = parent
         self.metadata_dir = metadata_dir
+        self.metadata = None
+        self.render_job = None  # Pending debounced render (Tk after id)
+        self.rendered_markdown = None
+        self.template_path = None  # None looks the template up per project (see find_template)
+        self.template = None
+        self.rendered_sections = []  # (section name, text) currently shown in the editor
         self.load_style()
         self.init_ui()
 
@@ -61,7 +237,7 @@ class DocumentationGenerator(ttk.Frame):
         # --- Project Status ---
         self.status_label = ttk.Label(self, text="Project Status:")
         self.status_label.grid(row=1, column=0, sticky="w", padx=5, pady=5)
-        self.status_choices = ["In Development", "Pre-Production", "Production", "Ready"]
+        self.status_choices = list(STATUS_CHOICES)
         self.status_var = tk.StringVar(value=self.status_choices[0])
         self.status_combobox = ttk.Combobox(self, textvariable=self.status_var, values=self.status_choices,
                                             state="readonly", width=20)
@@ -71,7 +247,7 @@ class DocumentationGenerator(ttk.Frame):
         # --- License ---
         self.license_label = ttk.Label(self, text="License:")
         self.license_label.grid(row=2, column=0, sticky="w", padx=5, pady=5)
-        self.license_choices = ["MIT", "GNU GPL v3", "Apache License 2.0", "Other"]
+        self.license_choices = list(LICENSE_CHOICES)
         self.license_var = tk.StringVar(value=self.license_choices[0])
         self.license_combobox = ttk.Combobox(self, textvariable=self.license_var, values=self.license_choices,
                                              state="readonly", width=20)
@@ -146,6 +322,9 @@ class DocumentationGenerator(ttk.Frame):
         self.text_editor = tk.Text(self, wrap=tk.WORD, width=80, height=15)
         self.text_editor.grid(row=12, column=0, columnspan=3, sticky="nsew", padx=5, pady=5)
 
+        self.template_button = ttk.Button(self, text="Load Template", command=self.browse_template)
+        self.template_button.grid(row=13, column=0, sticky="w", padx=5, pady=10)
+
         self.generate_button = ttk.Button(self, text="Generate/Save", command=self.generate_and_save)
         self.generate_button.grid(row=13, column=1, sticky="e", padx=5, pady=10)
 
@@ -163,14 +342,22 @@ class DocumentationGenerator(ttk.Frame):
             self.metadata_dir_var.set(directory)
             self.load_metadata_and_populate()
 
+    def browse_template(self):
+        template_path = filedialog.askopenfilename(title="Select Documentation Template",
+                                                   filetypes=[("Markdown templates", "*.md"), ("All files", "*.*")])
+        if template_path:
+            self.template_path = template_path
+            if self.metadata_dir:
+                self.load_metadata_and_populate()
+
     def load_metadata_and_populate(self):
         try:
             metadata = self.load_metadata()
             if metadata:
+                self.metadata = metadata
+                self.template = load_template(find_template(self.metadata_dir, self.template_path))
                 self.populate_gui_elements(metadata)
-                initial_text = self.create_initial_markdown(metadata)
-                self.text_editor.delete("1.0", tk.END)
-                self.text_editor.insert("1.0", initial_text)
+                self.show_sections(self.template.render_sections(self.collect_fields(metadata)))
         except Exception as e:
             messagebox.showerror("Error", f"Error loading meta{e}")
 
@@ -179,15 +366,14 @@ class DocumentationGenerator(ttk.Frame):
             messagebox.showerror("Error", "No metadata directory selected.")
             return None
 
-        metadata_file_path = os.path.join(self.metadata_dir, "project_metadata.json")
+        metadata_file_path = metadata_store.metadata_path(self.metadata_dir)
         try:
-            with open(metadata_file_path, "r") as f:
-                return json.load(f)
+            return metadata_store.load_metadata(self.metadata_dir)
         except FileNotFoundError:
             messagebox.showerror("Error", f"Metadata file not found at {metadata_file_path}")
             return None
-        except json.JSONDecodeError:
-            messagebox.showerror("Error", "Error decoding JSON. The metadata file may be corrupted.")
+        except ValueError as e:
+            messagebox.showerror("Error", f"Error decoding JSON. The metadata file may be corrupted. ({e})")
             return None
 
     def populate_gui_elements(self, metadata):
@@ -212,142 +398,77 @@ class DocumentationGenerator(ttk.Frame):
         self.acknowledgements_text.delete("1.0", tk.END)
         self.acknowledgements_text.insert("1.0", metadata.get("acknowledgements", ""))
 
-    def create_initial_markdown(self, metadata):
-        project_name = metadata.get("project_name", "[Project Name Placeholder]")
-
-        # Get values from the GUI
-        project_status = self.status_var.get()
-        license_badge = self.license_var.get()
-        synopsis = self.synopsis_text.get("1.0", tk.END).strip()
-        project_code = self.project_code_entry.get()
-        client = self.client_entry.get()
-        pipeline_version = self.pipeline_version_entry.get()
-        lead_artist = self.lead_artist_entry.get()
-        key_themes_str = self.key_themes_entry.get()
-        contact_info = self.contact_var.get()
-        crew_members_text = self.crew_text.get("1.0", tk.END).strip()
-        acknowledgements = self.acknowledgements_text.get("1.0", tk.END).strip()
-
-        # Format Key Themes (comma-separated)
-        key_themes = [theme.strip() for theme in key_themes_str.split(",")]
-        formatted_themes = "\n".join([f"* {theme}" for theme in key_themes])
-
-        # Format Crew
-        crew_members = [member.strip() for member in crew_members_text.split("\n")]
-        formatted_crew = "\n".join([f"* **{member}**" for member in crew_members])
-
-        markdown = f"""# {project_name}
-
-[![Project Status](https://img.shields.io/badge/status-{project_status.replace(" ", "%20")}-yellow)](https://shields.io/)
-[![License](https://img.shields.io/badge/license-{license_badge.replace(" ", "%20")}-blue.svg)](LICENSE)
-
-## Synopsis
-
-{synopsis}
-
-## Project Code:
+    def collect_fields(self, metadata):
+        """Collects the template fields from the GUI (project name comes from the metadata)."""
+        return documentation_fields(
+            project_name=metadata.get("project_name", "[Project Name Placeholder]"),
+            project_status=self.status_var.get(),
+            license_name=self.license_var.get(),
+            synopsis=self.synopsis_text.get("1.0", tk.END).strip(),
+            project_code=self.project_code_entry.get(),
+            client=self.client_entry.get(),
+            pipeline_version=self.pipeline_version_entry.get(),
+            lead_artist=self.lead_artist_entry.get(),
+            key_themes=self.key_themes_entry.get(),
+            contact_info=self.contact_var.get(),
+            crew=self.crew_text.get("1.0", tk.END).strip(),
+            acknowledgements=self.acknowledgements_text.get("1.0", tk.END).strip(),
+        )
 
-{project_code}
-
-## Client:
-
-{client}
-
-## Pipeline Version:
-
-{pipeline_version}
-
-## Lead Artist:
-
-{lead_artist}
-
-## Key Themes
-
-{formatted_themes}
-
-## Crew
-
-{formatted_crew}
-
-## Contact
-
-{contact_info}
-
-## Acknowledgements
+    def create_initial_markdown(self, metadata):
+        return render_markdown(self.collect_fields(metadata), self.template)
+
+    def show_sections(self, sections):
+        """Replaces the editor contents, tagging each section's text with its name."""
+        self.text_editor.delete("1.0", tk.END)
+        for section_name, text in sections:
+            self.text_editor.insert("end-1c", text, (f"section:{section_name}",))
+        self.rendered_sections = sections
+        self.rendered_markdown = "".join(text for _, text in sections)
+
+    def update_sections(self, sections):
+        """Replaces only the sections whose text changed, keeping the rest of the editor untouched."""
+        if [name for name, _ in sections] != [name for name, _ in self.rendered_sections]:
+            self.show_sections(sections)
+            return
 
-{acknowledgements}
-"""
-        return markdown
+        for (section_name, text), (_, old_text) in zip(sections, self.rendered_sections):
+            if text == old_text:
+                continue
+            ranges = self.text_editor.tag_ranges(f"section:{section_name}")
+            if not ranges:  # The section was empty or edited away by hand, so there is no anchor
+                self.show_sections(sections)
+                return
+            start, end = ranges[0], ranges[-1]
+            self.text_editor.delete(start, end)
+            self.text_editor.insert(start, text, (f"section:{section_name}",))
+        self.rendered_sections = sections
+        self.rendered_markdown = "".join(text for _, text in sections)
+
+    def cached_metadata(self):
+        """Returns the metadata, re-reading the file only when it changed on disk."""
+        try:
+            self.metadata = metadata_store.load_metadata(self.metadata_dir)
+        except (OSError, ValueError):
+            pass  # Keep the last good metadata while typing; errors show on explicit loads
+        return self.metadata or {}
 
     def update_markdown(self, *args):
+        """Schedules a Markdown refresh; bursts of keystrokes result in one render."""
+        if self.render_job is not None:
+            self.after_cancel(self.render_job)
+        self.render_job = self.after(RENDER_DELAY_MS, self.render_preview)
+
+    def render_preview(self):
         """Updates the Markdown content in the text editor."""
+        self.render_job = None
+        if not self.metadata_dir:
+            return
         try:
-            # Get values from the GUI
-            metadata = self.load_metadata()  # Load metadata
-            project_name = metadata.get("project_name", "[Project Name Placeholder]")  # Get project name
-            project_status = self.status_var.get()
-            license_badge = self.license_var.get()
-            synopsis = self.synopsis_text.get("1.0", tk.END).strip()
-            project_code = self.project_code_entry.get()
-            client = self.client_entry.get()
-            pipeline_version = self.pipeline_version_entry.get()
-            lead_artist = self.lead_artist_entry.get()
-            key_themes_str = self.key_themes_entry.get()
-            contact_info = self.contact_var.get()
-            crew_members_text = self.crew_text.get("1.0", tk.END).strip()
-            acknowledgements = self.acknowledgements_text.get("1.0", tk.END).strip()
-
-            # Format Key Themes (comma-separated)
-            key_themes = [theme.strip() for theme in key_themes_str.split(",")]
-            formatted_themes = "\n".join([f"* {theme}" for theme in key_themes])
-
-            # Format Crew
-            crew_members = [member.strip() for member in crew_members_text.split("\n")]
-            formatted_crew = "\n".join([f"* **{member}**" for member in crew_members])
-
-            markdown = f"""# {project_name}
-
-[![Project Status](https://img.shields.io/badge/status-{project_status.replace(" ", "%20")}-yellow)](https://shields.io/)
-[![License](https://img.shields.io/badge/license-{license_badge.replace(" ", "%20")}-blue.svg)](LICENSE)
-
-## Synopsis
-
-{synopsis}
-
-## Project Code:
-
-{project_code}
-
-## Client:
-
-{client}
-
-## Pipeline Version:
-
-{pipeline_version}
-
-## Lead Artist:
-
-{lead_artist}
-
-## Key Themes
-
-{formatted_themes}
-
-## Crew
-
-{formatted_crew}
-
-## Contact
-
-{contact_info}
-
-## Acknowledgements
-
-{acknowledgements}
-"""
-            self.text_editor.delete("1.0", tk.END)
-            self.text_editor.insert("1.0", markdown)
+            if self.template is None:
+                self.template = load_template(find_template(self.metadata_dir, self.template_path))
+            # Unchanged sections come from the template's fragment cache and are left alone in the editor
+            self.update_sections(self.template.render_sections(self.collect_fields(self.cached_metadata())))
         except Exception as e:
             messagebox.showerror("Error", f"Error updating Markdown: {e}")
 
@@ -356,7 +477,7 @@ class DocumentationGenerator(ttk.Frame):
             messagebox.showerror("Error", "No metadata directory selected.")
             return
 
-        output_file_path = os.path.join(self.metadata_dir, "project_documentation.md")
+        output_file_path = os.path.join(self.metadata_dir, DOCUMENTATION_FILE)
         documentation = self.text_editor.get("1.0", tk.END)
 
         try:
@@ -373,7 +494,34 @@ def integrate_documentation_generator(main_frame):
     documentation_generator.pack(expand=True, fill="both")
 
 
+def run_batch(argv=None):
+    """Command line entry point for headless batch generation."""
+    parser = argparse.ArgumentParser(description="Generate project documentation for every project in a studio.")
+    parser.add_argument("--batch", metavar="STUDIO_ROOT", required=True,
+                        help="Render documentation for every project_metadata.json below this directory.")
+    parser.add_argument("--workers", type=int, default=BATCH_WORKERS, help="Projects rendered in parallel.")
+    parser.add_argument("--force", action="store_true", help="Re-render projects even if nothing changed.")
+    parser.add_argument("--template", help="Template file to use instead of each project's own template.")
+    add_logging_arguments(parser)
+    args = parser.parse_args(argv)
+    setup_logging(args.log_level)
+
+    report = RunReport("generate_documentation", os.path.abspath(args.batch))
+    results = generate_documentation_batch(args.batch, max_workers=args.workers, force=args.force,
+                                           template_path=args.template, report=report)
+    print(f"Rendered {len(results['rendered'])}, skipped {len(results['skipped'])} unchanged, "
+          f"failed {len(results['failed'])}.")
+    if report.errors:
+        print(report.dialog_text())
+        return 1
+    return 0
+
+
+if __name__ == "__main__" and "--batch" in sys.argv:
+    sys.exit(run_batch())
+
 if __name__ == "__main__":
+    setup_logging()
     root = tk.Tk()
     root.title("Project Documentation Generator")
     root.geometry("1000x700")
@@ -1,10 +1,11 @@
-import json
 import os
 import tkinter as tk
 import tkinter.messagebox
 import tkinter.ttk as ttk
 from tkinter import filedialog
 
+import metadata_store
+
 
 class MetadataForm(ttk.Frame):
     """form for entering and saving project metadata"""
@@ -93,7 +94,7 @@ class MetadataForm(ttk.Frame):
         """set metadata directory."""
         self.metadata_dir = filedialog.askdirectory(title="Select Metadata Directory")
         if self.metadata_dir:
-            self.metadata_file_path = os.path.join(self.metadata_dir, "project_metadata.json")
+            self.metadata_file_path = metadata_store.metadata_path(self.metadata_dir)
             self.load_button.config(state="normal")  # Enable load button
             print(f"Metadata directory set to: {self.metadata_dir}")  # Debugging
         else:
@@ -105,8 +106,7 @@ class MetadataForm(ttk.Frame):
         """Loads existing metadata from the JSON file (if it exists)."""
         if self.metadata_file_path and os.path.exists(self.metadata_file_path):  # Check file_path
             try:
-                with open(self.metadata_file_path, "r") as f:
-                    metadata = json.load(f)
+                metadata = metadata_store.load_metadata(self.metadata_dir)
                 self.project_name.set(metadata.get("project_name", ""))
                 self.project_code.set(metadata.get("project_code", ""))
                 self.client.set(metadata.get("client", ""))
@@ -117,7 +117,7 @@ class MetadataForm(ttk.Frame):
                 self.description_text.insert(tk.END, description)
                 tk.messagebox.showinfo("Metadata Load",
                                        f"Successfully loaded metadata from:\n{self.metadata_file_path}")
-            except (FileNotFoundError, json.JSONDecodeError):
+            except (FileNotFoundError, ValueError):
                 tk.messagebox.showerror("Load Error",
                                         "Error loading metadata. The file might be corrupted or not found.")
         else:
@@ -143,9 +143,8 @@ class MetadataForm(ttk.Frame):
             return
 
         try:
-            os.makedirs(os.path.dirname(self.metadata_file_path), exist_ok=True)  # Make path if doesn't exist
-            with open(self.metadata_file_path, "w") as f:
-                json.dump(metadata, f, indent=4)
+            # Merged under a lock and replaced atomically; fields other tools store are kept
+            metadata_store.update_metadata(self.metadata_dir, metadata)
             tk.messagebox.showinfo("Success", f"Project metadata saved to {self.metadata_file_path}")
         except Exception as e:
             tk.messagebox.showerror("Error", f"Error saving meta: {e}")
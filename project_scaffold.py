@@ -0,0 +1,193 @@
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from file_ops import copy_file
+
+try:
+    import yaml  # Optional, only needed for YAML specs
+except ImportError:
+    yaml = None
+
+# --- Constants ---
+SCAFFOLD_WORKERS = 8  # Directories of one depth level are created in parallel (helps on network shares)
+DEFAULT_ITEM_NAME = "item"  # Variable bound by for_each when the node has no "as"
+DEFAULT_NUMBER_NAME = "n"  # Variable bound by range when the node has no "as"
+
+# The structure the Advanced Template System has always created
+DEFAULT_SCAFFOLD_SPEC = {
+    "folders": [
+        {
+            "name": "{project}",
+            "children": [
+                {
+                    "name": "{project}_characters",
+                    "children": [
+                        {"name": "{project}_{character}", "for_each": "characters", "as": "character"},
+                    ],
+                },
+                {
+                    "name": "{project}_locations",
+                    "children": [
+                        {
+                            "name": "{project}_{location[name]}", "for_each": "locations", "as": "location",
+                            "children": [
+                                {"name": "{project}_{sub}", "for_each": "location.subfolders", "as": "sub"},
+                            ],
+                        },
+                    ],
+                },
+                {
+                    "name": "{project}_assets",
+                    "children": [
+                        {
+                            "name": "{project}_{asset[name]}", "for_each": "assets", "as": "asset",
+                            "children": [
+                                {"name": "{project}_{sub}", "for_each": "asset.subfolders", "as": "sub"},
+                            ],
+                        },
+                    ],
+                },
+                {"name": "{project}_scripts"},
+                {"name": "{project}_misc"},
+            ],
+        },
+    ],
+}
+
+
+# --- Helper Functions ---
+def load_scaffold_spec(spec_path):
+    """Loads a scaffold spec from a JSON or YAML file."""
+    with open(spec_path, "r") as f:
+        if spec_path.lower().endswith((".yaml", ".yml")):
+            if yaml is None:
+                raise ValueError("PyYAML is required to load YAML scaffold specs (pip install pyyaml).")
+            spec = yaml.safe_load(f)
+        else:
+            spec = json.load(f)
+
+    if not isinstance(spec, dict) or not isinstance(spec.get("folders"), list):
+        raise ValueError(f"Scaffold spec '{spec_path}' needs a top-level 'folders' list.")
+    return spec
+
+
+def _lookup(context, dotted_name):
+    """Resolves "a.b.c" against nested dicts in the context."""
+    value = context
+    for part in dotted_name.split("."):
+        value = value[part]
+    return value
+
+
+def _format_name(pattern, context):
+    name = pattern.format(**context)
+    if not name or name in (".", "..") or "/" in name or os.sep in name:
+        raise ValueError(f"Folder name pattern '{pattern}' produced an invalid name '{name}'.")
+    return name
+
+
+def _node_contexts(node, context):
+    """Yields one context per folder a node stands for (several with for_each or range)."""
+    if "for_each" in node:
+        for item in _lookup(context, node["for_each"]):
+            yield dict(context, **{node.get("as", DEFAULT_ITEM_NAME): item})
+    elif "range" in node:
+        bounds = node["range"]
+        start, stop = bounds[0], bounds[1]
+        step = bounds[2] if len(bounds) > 2 else 1
+        for number in range(start, stop + 1, step):  # Inclusive, "episodes 1 to 10"
+            yield dict(context, **{node.get("as", DEFAULT_NUMBER_NAME): number})
+    else:
+        yield context
+
+
+def compute_scaffold(spec, root_directory, variables=None):
+    """Expands a scaffold spec into the full set of directories and seed files.
+
+    Spec nodes have:
+        name: Folder name pattern (str.format with the current variables).
+        for_each: Name of a list variable (dotted names reach into dicts); one folder per item.
+        range: [start, stop] or [start, stop, step], inclusive; one folder per number.
+        as: Variable the item or number is bound to ("item" / "n" by default).
+        seed: File (or list of files) copied into the folder. Entries are a source path or
+            {"source": ..., "name": ...}, where name is a pattern like "{item}.blend".
+        children: Nested nodes.
+
+    Args:
+        spec: The spec dict (see load_scaffold_spec).
+        root_directory: The directory the spec's top-level folders are created in.
+        variables: Values for the patterns; the spec's own "variables" are used as defaults.
+
+    Returns:
+        (directories, seeds): every directory to create (parents included, de-duplicated and
+        sorted so parents come first) and a list of (source, destination) seed copies.
+    """
+    context = dict(spec.get("variables", {}))
+    context.update(variables or {})
+
+    directories = set()
+    seeds = []
+    stack = [(node, os.path.abspath(root_directory), context) for node in reversed(spec["folders"])]
+    while stack:
+        node, parent, node_context = stack.pop()
+        for folder_context in _node_contexts(node, node_context):
+            folder = os.path.join(parent, _format_name(node["name"], folder_context))
+            directories.add(folder)
+
+            node_seeds = node.get("seed", [])
+            for seed in node_seeds if isinstance(node_seeds, list) else [node_seeds]:
+                if isinstance(seed, str):
+                    seed = {"source": seed}
+                source = os.path.expanduser(seed["source"].format(**folder_context))
+                name = _format_name(seed.get("name", os.path.basename(source)), folder_context)
+                seeds.append((source, os.path.join(folder, name)))
+
+            for child in reversed(node.get("children", [])):
+                stack.append((child, folder, folder_context))
+
+    # A path sorts after all of its prefixes, so parents are always created first
+    return sorted(directories), seeds
+
+
+def create_scaffold(directories, seeds=(), max_workers=SCAFFOLD_WORKERS, overwrite_seeds=False):
+    """Creates the directories from compute_scaffold and copies the seed files.
+
+    Every directory costs exactly one mkdir call (existing ones are skipped on EEXIST), instead
+    of the stat-per-component that os.makedirs does. Directories of the same depth do not
+    depend on each other, so each depth level is created in parallel.
+
+    Returns:
+        (created_directories, copied_seeds) counts.
+    """
+    if directories:
+        base_depth = min(path.count(os.sep) for path in directories)
+        for parent in {os.path.dirname(path) for path in directories if path.count(os.sep) == base_depth}:
+            os.makedirs(parent, exist_ok=True)  # The root the scaffold is created in
+
+    def make_directory(path):
+        try:
+            os.mkdir(path)
+            return 1
+        except FileExistsError:
+            if not os.path.isdir(path):
+                raise
+            return 0
+
+    levels = {}
+    for path in directories:
+        levels.setdefault(path.count(os.sep), []).append(path)
+
+    def copy_seed(seed):
+        source, destination = seed
+        if not overwrite_seeds and os.path.exists(destination):
+            return 0
+        copy_file(source, destination)
+        return 1
+
+    created = 0
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        for depth in sorted(levels):
+            created += sum(executor.map(make_directory, levels[depth]))
+        copied = sum(executor.map(copy_seed, seeds))
+    return created, copied
@@ -1,178 +1,581 @@
+import json
+import logging
 import os
-import shutil
-import threading
+import re
 import tkinter as tk
 from tkinter import filedialog, messagebox, ttk
 
+import instrumentation
+from file_ops import copy_file, hash_file, write_json_atomic
+from job_runtime import CANCELLED, DONE, Job, JobRuntime
+from progress_journal import ProgressJournal, journal_path, read_journal
+from run_logging import RunReport, reporting, setup_logging
+from template_registry import CONFIG_FILE, load_template_registry
+
+logger = logging.getLogger(__name__)
+
 # --- Constants ---
-BLENDER_FILES_DIR = r"D:\Ierarchy\ELI_LAB STUDIO\8. Coding\eli_lab-multimedia-framework\blender_files"  # Raw string for Windows path
-TEMPLATE_FILES = {
-    "eli_lab territory_assets": "Asset.blend",
-    "eli_lab territory_characters": "Character.blend",
-    "eli_lab territory_locations": "Location.blend",
-}
 OUTPUT_FILE_EXTENSION = ".blend"
-TOP_LEVEL_FOLDERS = list(TEMPLATE_FILES.keys())  # list of top level directories
+SEEDING_MANIFEST_FILE = ".template_seeding.json"  # Template hashes and seeded files, kept in the project root
+SEEDING_CATEGORIES = ("create", "update", "keep_modified", "up_to_date", "existing", "no_template")
+COPY_WORKERS = 8  # Parallel template copies; copies are I/O bound
+JOURNAL_OPERATION = "template_seeding"  # Progress journal, covers a run until the manifest is saved
+COPY_MODE_LABELS = {
+    "Copy": "copy",
+    "Reflink (fallback to copy)": "reflink",
+    "Hardlink (fallback to copy)": "hardlink",
+}
 
 
 # --- Helper Functions ---
-def create_blender_file(directory, template_path):
+def blender_file_path(directory):
+    """Returns the path of the Blender file a leaf folder gets: <leaf_name>.blend inside it."""
+    folder_name = os.path.basename(directory).lower().replace(" ", "_")  # Get only the leaf folder name
+    return os.path.join(directory, folder_name + OUTPUT_FILE_EXTENSION)
+
+
+def create_blender_file(directory, template_path, copy_mode="copy", report=None):
     """Copies a Blender template file to the specified directory, renaming it.
 
     Args:
         directory: The directory to copy the Blender file into.
         template_path: The path to the template Blender file.
+        copy_mode: "copy", "reflink" or "hardlink" (see file_ops.copy_file).
+        report: A run_logging.RunReport collecting failures (safe to share between copy threads).
+
+    Returns:
+        True if the file was created.
     """
-    folder_name = os.path.basename(directory).lower().replace(" ", "_")  # Get only the leaf folder name
-    output_filename = folder_name + OUTPUT_FILE_EXTENSION
-    output_path = os.path.join(directory, output_filename)
+    output_path = blender_file_path(directory)
+    output_filename = os.path.basename(output_path)
 
     try:
-        shutil.copy2(template_path, output_path)  # Use copy2 to preserve metadata
-        print(f"Created Blender file '{output_filename}' in '{directory}'")
+        with instrumentation.span("copy", file=os.path.relpath(output_path, os.path.dirname(directory))):
+            used_mode = copy_file(template_path, output_path, copy_mode)
+        instrumentation.count("bytes_written", os.path.getsize(output_path))
+        logger.info(f"Created Blender file '{output_filename}' in '{directory}' ({used_mode})")
+        return True
     except Exception as e:
-        print(f"Error creating Blender file in '{directory}': {e}")
+        if report is None:
+            logger.error(f"Error creating Blender file in '{directory}': {e}")
+        else:
+            report.error(directory, f"Could not create '{output_filename}': {e}")
+        return False
 
 
-def validate_project(root_directory, progress_callback=None, start_progress_callback=None, end_progress_callback=None):
-    """Analyzes the directory structure and creates Blender files in leaf folders.
+def find_leaf_templates(root_directory, registry):
+    """Walks the tree once and pairs every leaf folder with its template.
 
-    Args:
-        root_directory: The starting directory to analyze.
-        progress_callback: A function to update the progress bar.
-        start_progress_callback: function to initialize the progress bar
-        end_progress_callback: function to finish the progress bar
-    """
+    Every folder is matched against the registry once, and templates are handed down from
+    parent to child during the walk. A leaf gets the template of the top-most matching
+    folder above it, as before.
 
-    leaf_folders = []
-    # Traverse the directory tree and find leaf folders
+    Returns:
+        A list of (leaf_folder, template_path or None) tuples.
+    """
+    root_directory = os.path.abspath(root_directory)
+
+    # Ancestors above the root can select the template too (by name)
+    root_template = None
+    for part in root_directory.split(os.sep)[:-1]:
+        root_template = registry.match_folder(part) if part else None
+        if root_template:
+            break
+
+    # Template inherited from the ancestors of each folder still to be walked
+    folder_templates = {root_directory: root_template}
+    leaves = []
     for root, dirs, files in os.walk(root_directory):
+        template_path = folder_templates.pop(root)
         if not dirs:
-            leaf_folders.append(root)  # It's a leaf folder
-
-    total_folders = len(leaf_folders)
-    processed_folders = 0
-
-    if start_progress_callback:
-        start_progress_callback(total_folders)
-
-    for leaf_folder in leaf_folders:
-        # Get the list of parent directories
-        parents = [os.path.basename(path) for path in leaf_folder.split(os.sep)[:-1]]
-
-        # Find the top level parent that matches the keys in the template files
-        top_level_parent = next((parent for parent in parents if parent in TOP_LEVEL_FOLDERS), None)
-
-        # Check if parent is in Template files
-        if top_level_parent in TEMPLATE_FILES:
-            template_filename = TEMPLATE_FILES[top_level_parent]
-            template_path = os.path.join(BLENDER_FILES_DIR, template_filename)
-            if not os.path.isfile(template_path):
-                print(f"Error: Template Blender file '{template_path}' not found.")
-                continue
-            create_blender_file(leaf_folder, template_path)
+            leaves.append((root, template_path))  # It's a leaf folder
+            continue
+        if not template_path:
+            relative_path = None
+            if root != root_directory:
+                relative_path = os.path.relpath(root, root_directory).replace(os.sep, "/")
+            template_path = registry.match_folder(os.path.basename(root), relative_path)
+        for name in dirs:
+            folder_templates[os.path.join(root, name)] = template_path
+    return leaves
+
+
+def load_seeding_manifest(root_directory):
+    """Loads the record of previous seeding runs (empty if the project was never seeded)."""
+    try:
+        with open(os.path.join(root_directory, SEEDING_MANIFEST_FILE), "r") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        manifest = {}
+    manifest.setdefault("templates", {})
+    manifest.setdefault("files", {})
+    return manifest
+
+
+def hash_templates(template_paths, manifest):
+    """Hashes every template, reusing the manifest's hash while size and mtime are unchanged."""
+    template_hashes = {}
+    for template_path in template_paths:
+        stat = os.stat(template_path)
+        known = manifest["templates"].get(template_path)
+        if known and known["size"] == stat.st_size and known["mtime_ns"] == stat.st_mtime_ns:
+            template_hashes[template_path] = known["hash"]
         else:
-            print(f"Skipping '{leaf_folder}': No matching top-level parent directory in template list.")
-
-        processed_folders += 1
-        if progress_callback:
-            progress_callback(processed_folders)
-
-    if end_progress_callback:
-        end_progress_callback()
-
-
-# --- GUI Setup ---
-root = tk.Tk()
-root.title("Project Validation Tool")
-root.geometry("600x350")
-
-# --- Styling ---
-style = ttk.Style(root)
-style.theme_use('clam')
-
-# Color scheme (from your previous code)
-bg_color = '#2e2e2e'
-fg_color = 'white'
-text_color = '#d3d3d3'
-button_bg_color = '#4a4a4a'
-entry_bg_color = "#4a4a4a"
-button_active_bg_color = '#606060'
-
-style.configure('.', background=bg_color, foreground=fg_color, font=("Bahnschrift", 10))
-style.configure('TLabel', background=bg_color, foreground=fg_color, padding=5, font=("Bahnschrift", 12))
-style.configure('TButton', background=button_bg_color, foreground=fg_color, padding=8, relief='flat',
-                font=("Bahnschrift", 11), borderwidth=0, focuscolor='gray',
-                activebackground=button_active_bg_color, activeforeground=fg_color)
-style.map('TButton',
-          background=[('active', button_active_bg_color), ('disabled', button_bg_color)],
-          foreground=[('disabled', 'gray')])
-style.configure('TEntry', fieldbackground=entry_bg_color, foreground=text_color, font=("Bahnschrift", 11))
-style.configure('Horizontal.TProgressbar', troughcolor=button_bg_color, background=fg_color)
+            template_hashes[template_path] = hash_file(template_path)
+    return template_hashes
 
-# --- Main Frame ---
-main_frame = ttk.Frame(root, padding=20)
-main_frame.pack(expand=True, fill='both')
 
-# --- Folder Selection ---
-folder_label = ttk.Label(main_frame, text="Project Folder:")
-folder_label.pack(pady=(0, 5), fill='x')
+def file_record(output_path, template_hash):
+    """Returns the manifest entry of a seeded file."""
+    stat = os.stat(output_path)
+    return {"template_hash": template_hash, "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
 
-folder_path_entry = ttk.Entry(main_frame, width=50)
-folder_path_entry.pack(pady=(0, 5), fill='x')
 
+def recover_interrupted_seeding(root_directory, manifest):
+    """Adds the files seeded by a killed run, which never saved its manifest, to the manifest.
 
-def browse_folder():
-    folder_path = filedialog.askdirectory()
-    if folder_path:
-        folder_path_entry.delete(0, tk.END)
-        folder_path_entry.insert(0, folder_path)
-
-
-browse_button = ttk.Button(main_frame, text="Browse", command=browse_folder)
-browse_button.pack(pady=(0, 10), fill='x')
+    Finished copies come from the run's progress journal. Copies that were in flight are
+    verified against the template hash (copies are atomic, so the file holds either the old
+    content or the complete template).
+    """
+    previous = read_journal(journal_path(root_directory, JOURNAL_OPERATION))
+    if not previous or previous["complete"]:
+        return
+    recovered = 0
+    for key, details in previous["completed"].items():
+        if details.get("record"):
+            manifest["files"][key] = details["record"]
+            recovered += 1
+    for key, details in previous["interrupted"].items():
+        output_path = os.path.join(root_directory, key)
+        try:
+            if hash_file(output_path) == details["template_hash"]:
+                manifest["files"][key] = file_record(output_path, details["template_hash"])
+                recovered += 1
+        except OSError:
+            pass  # Never created; the plan will create it
+    logger.info(f"Recovered {recovered} seeded files from an interrupted run")
+
+
+def plan_seeding(root_directory, registry=None):
+    """Works out which leaf folders need a Blender file, without touching anything.
+
+    Templates come from the project's template registry (see template_registry) unless a
+    registry is passed in.
+
+    Leaves are sorted into:
+        "create": no Blender file yet.
+        "update": the template changed since seeding and the file was not touched since.
+        "keep_modified": the template changed, but an artist has worked on the file.
+        "up_to_date": seeded from the current template.
+        "existing": a Blender file exists that was not created by seeding.
+        "no_template": no matching template folder.
+
+    Returns:
+        A plan dict with a list of (leaf_folder, template_path, output_path) per category,
+        plus "changed_templates" and the data needed to record the run.
+    """
+    root_directory = os.path.abspath(root_directory)
+    if registry is None:
+        registry = load_template_registry(root_directory)
+    manifest = load_seeding_manifest(root_directory)
+    recover_interrupted_seeding(root_directory, manifest)
+    with instrumentation.span("hash_templates"):
+        template_hashes = hash_templates(registry.template_paths(), manifest)
+
+    plan = {category: [] for category in SEEDING_CATEGORIES}
+    plan["changed_templates"] = sorted(
+        path for path, digest in template_hashes.items()
+        if path in manifest["templates"] and manifest["templates"][path]["hash"] != digest)
+    plan["root_directory"] = root_directory
+    plan["template_hashes"] = template_hashes
+    plan["manifest"] = manifest
+
+    with instrumentation.span("find_leaves"):
+        leaf_templates = find_leaf_templates(root_directory, registry)
+    for leaf_folder, template_path in leaf_templates:
+        if not template_path:
+            plan["no_template"].append((leaf_folder, None, None))
+            continue
+
+        output_path = blender_file_path(leaf_folder)
+        entry = (leaf_folder, template_path, output_path)
+        try:
+            stat = os.stat(output_path)
+        except FileNotFoundError:
+            plan["create"].append(entry)
+            continue
+
+        record = manifest["files"].get(os.path.relpath(output_path, root_directory))
+        if not record:
+            plan["existing"].append(entry)
+        elif record["template_hash"] == template_hashes[template_path]:
+            plan["up_to_date"].append(entry)
+        elif record["size"] == stat.st_size and record["mtime_ns"] == stat.st_mtime_ns:
+            plan["update"].append(entry)
+        else:
+            plan["keep_modified"].append(entry)
+    return plan
+
+
+def format_seeding_plan(plan, max_listed=20):
+    """Renders a seeding plan as a human-readable dry-run report."""
+    labels = {
+        "create": "Will create",
+        "update": "Will update (template changed, file untouched)",
+        "keep_modified": "Keeping (template changed, but file was modified)",
+        "up_to_date": "Up to date",
+        "existing": "Keeping (existing file not created by seeding)",
+        "no_template": "Skipped (no matching template)",
+    }
+    lines = [f"Seeding plan for '{plan['root_directory']}'", ""]
+    if plan["changed_templates"]:
+        lines.append("Templates changed since last seeding:")
+        lines.extend(f"  - {path}" for path in plan["changed_templates"])
+        lines.append("")
+
+    for category in SEEDING_CATEGORIES:
+        entries = plan[category]
+        lines.append(f"{labels[category]}: {len(entries)}")
+        if category in ("create", "update", "keep_modified"):
+            for leaf_folder, _, _ in entries[:max_listed]:
+                lines.append(f"  - {os.path.relpath(leaf_folder, plan['root_directory'])}")
+            if len(entries) > max_listed:
+                lines.append(f"  ... and {len(entries) - max_listed} more")
+    return "\n".join(lines)
+
+
+def record_seeding(plan, seeded):
+    """Stores template hashes and the state of newly seeded files in the project manifest.
+
+    Returns:
+        True if the manifest was saved.
+    """
+    root_directory = plan["root_directory"]
+    manifest = plan["manifest"]
+    for template_path, digest in plan["template_hashes"].items():
+        stat = os.stat(template_path)
+        manifest["templates"][template_path] = {
+            "hash": digest, "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
 
-# --- Progress Bar ---
-progress_bar = ttk.Progressbar(main_frame, orient="horizontal", length=400, mode="determinate")
-progress_bar.pack(pady=(10, 15), fill='x')
+    for leaf_folder, template_path, output_path in seeded:
+        manifest["files"][os.path.relpath(output_path, root_directory)] = file_record(
+            output_path, plan["template_hashes"][template_path])
 
+    try:
+        write_json_atomic(os.path.join(root_directory, SEEDING_MANIFEST_FILE), manifest, fsync=True)
+        return True
+    except OSError as e:
+        logger.error(f"Error saving seeding manifest: {e}")
+        return False
 
-# --- Validation Button ---
-def start_validation():
-    project_directory = folder_path_entry.get()
-    if not project_directory:
-        messagebox.showerror("Error", "Please select a project folder.")
-        return
 
-    # Disable GUI Elements
-    validate_button["state"] = "disabled"
-    browse_button["state"] = "disabled"
+def validate_project(root_directory, progress_callback=None, start_progress_callback=None, end_progress_callback=None,
+                     copy_mode="copy", max_workers=COPY_WORKERS, dry_run=False, plan=None, registry=None, job=None,
+                     report=None):
+    """Analyzes the directory structure and creates Blender files in leaf folders that need one.
 
-    def update_progress(value):
-        progress_bar["value"] = value
-        root.update_idletasks()
+    A plan is computed first (see plan_seeding); only "create" and "update" leaves are copied,
+    so repeated validation of a seeded project costs a tree scan.
 
-    def start_progress(max_value):
-        progress_bar["maximum"] = max_value
-        progress_bar["value"] = 0
+    Args:
+        root_directory: The starting directory to analyze.
+        progress_callback: A function to update the progress bar, called with the folders done
+            and the bytes copied so far (e.g. Job.progress).
+        start_progress_callback: function to initialize the progress bar
+        end_progress_callback: function to finish the progress bar
+        copy_mode: "copy", "reflink" or "hardlink" (reflink and hardlink fall back to copy).
+        max_workers: Number of template copies running at the same time.
+        dry_run: Only compute and print the plan.
+        plan: A plan from plan_seeding to execute instead of computing a new one.
+        registry: Template registry to plan with (defaults to the project's config).
+        job: The job_runtime Job to run the copies on; cancelling it stops after the copies in
+            flight (those are still recorded in the manifest).
+        report: A run_logging.RunReport for the copy outcomes and failures (created if not
+            given), written to the reports folder when the run ends.
+
+    Copies are journaled as they finish (see progress_journal), so if the process is killed
+    before the manifest is saved, the next plan still knows which files seeding created.
+    Planning, each copy and the manifest save are timed (see instrumentation).
+
+    Returns:
+        The seeding plan.
+    """
+    report = report or RunReport("validate_project", os.path.abspath(root_directory))
+    with instrumentation.run("validate_project") as metrics, reporting(report, metrics):
+        return _validate_project(root_directory, progress_callback, start_progress_callback, end_progress_callback,
+                                 copy_mode, max_workers, dry_run, plan, registry, job, report)
 
-    def end_progress():
-        progress_bar["value"] = 0
-        messagebox.showinfo("Info", "Project validation complete!")
-        validate_button["state"] = "normal"  # Re-enable button
-        browse_button["state"] = "normal"
 
-    # Run validation in a separate thread
-    threading.Thread(target=lambda: validate_project(
-        project_directory,
-        progress_callback=update_progress,
-        start_progress_callback=start_progress,
-        end_progress_callback=end_progress
-    ), daemon=True).start()
+def _validate_project(root_directory, progress_callback, start_progress_callback, end_progress_callback, copy_mode,
+                      max_workers, dry_run, plan, registry, job, report):
+    if plan is None:
+        with instrumentation.span("plan"):
+            plan = plan_seeding(root_directory, registry)
+    logger.info(format_seeding_plan(plan))
 
+    to_copy = plan["create"] + plan["update"]
+    processed_folders = 0
 
-validate_button = ttk.Button(main_frame, text="Validate Project", command=start_validation)
-validate_button.pack(pady=(15, 0), fill='x')
+    if start_progress_callback:
+        start_progress_callback(0 if dry_run else len(to_copy))
+
+    if not dry_run:
+        job = job or Job("validate_project")
+        root_directory = plan["root_directory"]
+        template_hashes = plan["template_hashes"]
+        journal = ProgressJournal(journal_path(root_directory, JOURNAL_OPERATION))
+
+        def relative(entry):
+            return os.path.relpath(entry[2], root_directory)
+
+        seeded = []
+        try:
+            # Progress is reported from this thread only, as copies finish
+            tracked = journal.track(to_copy, key=relative, details=lambda entry: {"template_hash": template_hashes[entry[1]]})
+            copy = instrumentation.instrumented(lambda entry: create_blender_file(entry[0], entry[1], copy_mode, report))
+            for entry, result in job.map(copy, tracked, max_workers=max_workers):
+                created = instrumentation.collect(result)
+                instrumentation.count("files")
+                report.count("created" if created else "failed")
+                if created:
+                    seeded.append(entry)
+                    journal.done(relative(entry), record=file_record(entry[2], template_hashes[entry[1]]))
+                else:
+                    journal.done(relative(entry), record=None)
+                processed_folders += 1
+                if progress_callback:
+                    progress_callback(processed_folders, instrumentation.counter("bytes_written"))
+        finally:
+            with instrumentation.span("record_manifest"):
+                recorded = record_seeding(plan, seeded)
+            if recorded:
+                journal.complete()  # The manifest now holds everything the journal knew
+            else:
+                report.error(SEEDING_MANIFEST_FILE, "Could not save the seeding manifest; the journal is kept")
+                journal.close()
 
-# --- Run the GUI ---
-root.mainloop()
+    if end_progress_callback:
+        end_progress_callback()
+    return plan
+
+
+def main():
+    setup_logging()
+
+    # --- GUI Setup ---
+    root = tk.Tk()
+    root.title("Project Validation Tool")
+    root.geometry("600x550")
+
+    # --- Styling ---
+    style = ttk.Style(root)
+    style.theme_use('clam')
+
+    # Color scheme (from your previous code)
+    bg_color = '#2e2e2e'
+    fg_color = 'white'
+    text_color = '#d3d3d3'
+    button_bg_color = '#4a4a4a'
+    entry_bg_color = "#4a4a4a"
+    button_active_bg_color = '#606060'
+
+    style.configure('.', background=bg_color, foreground=fg_color, font=("Bahnschrift", 10))
+    style.configure('TLabel', background=bg_color, foreground=fg_color, padding=5, font=("Bahnschrift", 12))
+    style.configure('TButton', background=button_bg_color, foreground=fg_color, padding=8, relief='flat',
+                    font=("Bahnschrift", 11), borderwidth=0, focuscolor='gray',
+                    activebackground=button_active_bg_color, activeforeground=fg_color)
+    style.map('TButton',
+              background=[('active', button_active_bg_color), ('disabled', button_bg_color)],
+              foreground=[('disabled', 'gray')])
+    style.configure('TEntry', fieldbackground=entry_bg_color, foreground=text_color, font=("Bahnschrift", 11))
+    style.configure('Horizontal.TProgressbar', troughcolor=button_bg_color, background=fg_color)
+
+    # --- Main Frame ---
+    main_frame = ttk.Frame(root, padding=20)
+    main_frame.pack(expand=True, fill='both')
+
+    # --- Folder Selection ---
+    folder_label = ttk.Label(main_frame, text="Project Folder:")
+    folder_label.pack(pady=(0, 5), fill='x')
+
+    folder_path_entry = ttk.Entry(main_frame, width=50)
+    folder_path_entry.pack(pady=(0, 5), fill='x')
+
+    def browse_folder():
+        folder_path = filedialog.askdirectory()
+        if folder_path:
+            folder_path_entry.delete(0, tk.END)
+            folder_path_entry.insert(0, folder_path)
+
+    browse_button = ttk.Button(main_frame, text="Browse", command=browse_folder)
+    browse_button.pack(pady=(0, 10), fill='x')
+
+    # --- Template Config Selection ---
+    config_label = ttk.Label(main_frame, text=f"Template Config (optional, default: <project>/{CONFIG_FILE}):")
+    config_label.pack(pady=(0, 5), fill='x')
+
+    config_path_entry = ttk.Entry(main_frame, width=50)
+    config_path_entry.pack(pady=(0, 5), fill='x')
+
+    def browse_config():
+        config_path = filedialog.askopenfilename(filetypes=[("JSON files", "*.json"), ("All files", "*.*")])
+        if config_path:
+            config_path_entry.delete(0, tk.END)
+            config_path_entry.insert(0, config_path)
+
+    config_browse_button = ttk.Button(main_frame, text="Browse Config", command=browse_config)
+    config_browse_button.pack(pady=(0, 10), fill='x')
+
+    def load_registry(project_directory):
+        """Loads the template registry for the GUI, reporting config errors."""
+        try:
+            return load_template_registry(project_directory, config_path_entry.get() or None)
+        except (OSError, ValueError, KeyError, re.error) as e:
+            messagebox.showerror("Error", f"Error loading template config: {e}")
+            return None
+
+    # --- Progress Bar ---
+    progress_bar = ttk.Progressbar(main_frame, orient="horizontal", length=400, mode="determinate")
+    progress_bar.pack(pady=(10, 0), fill='x')
+    progress_label = ttk.Label(main_frame, text="")  # Files/sec, MB/sec and ETA
+    progress_label.pack(pady=(0, 5), fill='x')
+
+    # --- Copy Mode Selection ---
+    copy_mode_label = ttk.Label(main_frame, text="Copy Mode:")
+    copy_mode_label.pack(pady=(0, 5), fill='x')
+
+    copy_mode_combobox = ttk.Combobox(main_frame, values=list(COPY_MODE_LABELS), state="readonly")
+    copy_mode_combobox.set("Copy")
+    copy_mode_combobox.pack(pady=(0, 10), fill='x')
+
+    # --- Validation Button ---
+    runtime = JobRuntime()
+    current_job = None
+
+    def start_validation(plan=None):
+        nonlocal current_job
+        project_directory = folder_path_entry.get()
+        if not project_directory:
+            messagebox.showerror("Error", "Please select a project folder.")
+            return
+
+        copy_mode = COPY_MODE_LABELS[copy_mode_combobox.get()]
+        registry = None
+        if plan is None:
+            registry = load_registry(project_directory)
+            if registry is None:
+                return
+
+        # Disable GUI Elements
+        validate_button["state"] = "disabled"
+        preview_button["state"] = "disabled"
+        browse_button["state"] = "disabled"
+        cancel_button["state"] = "normal"
+
+        # Job events are delivered on the Tk thread by the runtime, so these may touch widgets
+        def update_progress(value):
+            progress_bar["value"] = value
+            progress_label["text"] = current_job.meter.format()
+
+        def start_progress(max_value):
+            progress_bar["maximum"] = max_value
+            progress_bar["value"] = 0
+
+        report = RunReport("validate_project", os.path.abspath(project_directory))
+
+        def end_progress(job):
+            progress_bar["value"] = 0
+            progress_label["text"] = ""
+            if job.state == DONE and report.errors:
+                messagebox.showwarning("Warning", f"Project validation finished with errors ({job.run_time:.1f}s).\n\n"
+                                                  f"{report.dialog_text()}")
+            elif job.state == DONE:
+                messagebox.showinfo("Info", f"Project validation complete! ({job.run_time:.1f}s)")
+            elif job.state == CANCELLED:
+                messagebox.showinfo("Info", "Project validation cancelled; the files copied so far are kept.")
+            else:
+                messagebox.showerror("Error", f"Project validation failed: {job.error}")
+            validate_button["state"] = "normal"  # Re-enable button
+            preview_button["state"] = "normal"
+            browse_button["state"] = "normal"
+            cancel_button["state"] = "disabled"
+
+        current_job = runtime.submit(
+            lambda job: validate_project(
+                project_directory,
+                progress_callback=job.progress,
+                start_progress_callback=job.start,
+                copy_mode=copy_mode,
+                plan=plan,
+                registry=registry,
+                job=job,
+                report=report
+            ),
+            name="Validate Project", on_start=start_progress, on_progress=update_progress, on_done=end_progress)
+
+    def cancel_validation():
+        if current_job is not None:
+            current_job.cancel()
+
+    def show_plan(plan):
+        """Shows a dry-run report of the seeding plan, with the option to apply it."""
+        window = tk.Toplevel(root)
+        window.title("Seeding Plan (Dry Run)")
+        window.geometry("700x450")
+        window.configure(background=bg_color)
+
+        report_text = tk.Text(window, wrap=tk.NONE, background=entry_bg_color, foreground=text_color)
+        report_text.insert("1.0", format_seeding_plan(plan, max_listed=500))
+        report_text.config(state=tk.DISABLED)
+        report_text.pack(expand=True, fill='both', padx=10, pady=10)
+
+        def apply_plan():
+            window.destroy()
+            start_validation(plan)
+
+        apply_button = ttk.Button(window, text=f"Apply ({len(plan['create']) + len(plan['update'])} copies)",
+                                  command=apply_plan)
+        apply_button.pack(side='right', padx=10, pady=(0, 10))
+        close_button = ttk.Button(window, text="Close", command=window.destroy)
+        close_button.pack(side='right', pady=(0, 10))
+
+    def preview_validation():
+        project_directory = folder_path_entry.get()
+        if not project_directory:
+            messagebox.showerror("Error", "Please select a project folder.")
+            return
+
+        registry = load_registry(project_directory)
+        if registry is None:
+            return
+
+        preview_button["state"] = "disabled"
+
+        def plan_computed(job):
+            preview_button.config(state="normal")
+            if job.state == DONE:
+                show_plan(job.result)
+            elif job.error is not None:
+                messagebox.showerror("Error", f"Error computing seeding plan: {job.error}")
+
+        # Planning scans the whole tree, keep it off the GUI thread
+        runtime.submit(lambda job: plan_seeding(project_directory, registry), name="Plan Seeding", on_done=plan_computed)
+
+    preview_button = ttk.Button(main_frame, text="Preview Plan (Dry Run)", command=preview_validation)
+    preview_button.pack(pady=(15, 0), fill='x')
+
+    validate_button = ttk.Button(main_frame, text="Validate Project", command=start_validation)
+    validate_button.pack(pady=(5, 0), fill='x')
+
+    cancel_button = ttk.Button(main_frame, text="Cancel", command=cancel_validation, state="disabled")
+    cancel_button.pack(pady=(5, 0), fill='x')
+
+    # --- Run the GUI ---
+    runtime.attach(root)
+    root.mainloop()
+    runtime.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,224 @@
+import json
+import logging
+import logging.handlers
+import os
+import sys
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+from job_runtime import JobCancelled
+
+# --- Constants ---
+LOG_DIR_ENV = "ELI_LAB_LOG_DIR"
+DEFAULT_LOG_DIR = os.path.join(os.path.expanduser("~"), ".eli_lab", "logs")
+LOG_LEVEL_ENV = "ELI_LAB_LOG_LEVEL"  # Level switch for the GUIs, which have no command line
+LOG_LEVELS = ("DEBUG", "INFO", "WARNING", "ERROR")
+DEFAULT_LOG_LEVEL = "INFO"
+LOG_FILE = "eli_lab.jsonl"
+MAX_LOG_BYTES = 10 * 1024 * 1024  # The log file is rotated at this size...
+LOG_BACKUPS = 5  # ... keeping this many old files (eli_lab.jsonl.1 ... .5)
+REPORTS_DIR = "reports"
+MAX_LISTED_ERRORS = 10  # Errors listed in a dialog; the report file has all of them
+CONSOLE_FORMAT = "%(asctime)s %(levelname)-7s %(message)s"
+
+# LogRecord attributes that are not structured fields passed with extra=
+_RECORD_ATTRIBUTES = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+logger = logging.getLogger(__name__)
+
+
+# --- Helper Functions ---
+def default_log_dir():
+    return os.environ.get(LOG_DIR_ENV) or DEFAULT_LOG_DIR
+
+
+class JsonFormatter(logging.Formatter):
+    """Formats a record as one JSON object per line, with any fields passed via extra=."""
+
+    def format(self, record):
+        entry = {
+            "time": self.formatTime(record, "%Y-%m-%dT%H:%M:%S") + f".{int(record.msecs):03d}",
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "process": record.process,
+            "thread": record.threadName,
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+def setup_logging(level=None, log_dir=None, console=True):
+    """Configures logging for a tool: structured JSON lines in a rotating file, plain text on the console.
+
+    Safe to call more than once; only the level changes after the first call. Worker processes
+    forked from a configured tool inherit the handlers.
+
+    Args:
+        level: One of LOG_LEVELS (defaults to $ELI_LAB_LOG_LEVEL, then INFO).
+        log_dir: Where eli_lab.jsonl is written (defaults to $ELI_LAB_LOG_DIR or ~/.eli_lab/logs).
+        console: Also log to stderr.
+
+    Returns:
+        The path of the log file, or None if it could not be opened.
+    """
+    level = (level or os.environ.get(LOG_LEVEL_ENV) or DEFAULT_LOG_LEVEL).upper()
+    if level not in LOG_LEVELS:
+        raise ValueError(f"Unknown log level '{level}', expected one of {LOG_LEVELS}")
+    root = logging.getLogger()
+    root.setLevel(level)
+    for handler in root.handlers:
+        if isinstance(handler, logging.handlers.RotatingFileHandler):
+            return handler.baseFilename  # Already configured
+
+    if console:
+        console_handler = logging.StreamHandler(sys.stderr)
+        console_handler.setFormatter(logging.Formatter(CONSOLE_FORMAT, "%H:%M:%S"))
+        root.addHandler(console_handler)
+
+    log_dir = log_dir or default_log_dir()
+    path = os.path.join(log_dir, LOG_FILE)
+    try:
+        os.makedirs(log_dir, exist_ok=True)
+        file_handler = logging.handlers.RotatingFileHandler(path, maxBytes=MAX_LOG_BYTES, backupCount=LOG_BACKUPS,
+                                                            encoding="utf-8", delay=True)
+    except OSError as e:
+        logger.warning("Could not open the log file '%s': %s", path, e)
+        return None
+    file_handler.setFormatter(JsonFormatter())
+    root.addHandler(file_handler)
+    return path
+
+
+def add_logging_arguments(parser):
+    """Adds --log-level to a command line parser (apply it with setup_logging(args.log_level))."""
+    parser.add_argument("--log-level", choices=LOG_LEVELS, type=str.upper,
+                        help=f"Logging level (default: ${LOG_LEVEL_ENV} or {DEFAULT_LOG_LEVEL}).")
+
+
+class RunReport:
+    """Outcome counts and every error of one batch run, written as a JSON and a text report.
+
+    Batch tools record failures here instead of showing a dialog per file; the GUI shows one
+    summary (dialog_text) pointing at the report files once the run is over. Errors and
+    warnings are logged as they are recorded, with the item as a structured field.
+    """
+
+    def __init__(self, tool, target=None):
+        self.tool = tool
+        self.target = target
+        self.started = time.time()
+        self.finished = None
+        self.state = None
+        self.counts = defaultdict(int)
+        self.errors = []  # (item, message)
+        self.warnings = []
+        self.metrics = None
+        self.paths = None
+        self.logger = logging.getLogger(tool)
+
+    def count(self, outcome, amount=1):
+        self.counts[outcome] += amount
+
+    def error(self, item, message):
+        self.errors.append((item, str(message)))
+        self.logger.error("%s: %s", item, message, extra={"item": item, "tool": self.tool})
+
+    def warning(self, item, message):
+        self.warnings.append((item, str(message)))
+        self.logger.warning("%s: %s", item, message, extra={"item": item, "tool": self.tool})
+
+    def to_dict(self):
+        return {
+            "tool": self.tool,
+            "target": self.target,
+            "state": self.state,
+            "started": self.started,
+            "finished": self.finished,
+            "counts": dict(self.counts),
+            "errors": [{"item": item, "message": message} for item, message in self.errors],
+            "warnings": [{"item": item, "message": message} for item, message in self.warnings],
+            "metrics": self.metrics,
+        }
+
+    def format(self, max_listed=None):
+        """Renders the report as text; max_listed limits the errors and warnings shown."""
+        duration = (self.finished or time.time()) - self.started
+        lines = [f"{self.tool} {self.state or 'running'} in {duration:.1f}s"
+                 + (f": {self.target}" if self.target else "")]
+        if self.counts:
+            lines.append(", ".join(f"{count} {outcome}" for outcome, count in self.counts.items()))
+        for title, entries in (("Errors", self.errors), ("Warnings", self.warnings)):
+            if not entries:
+                continue
+            lines.append(f"{title} ({len(entries)}):")
+            for item, message in entries[:max_listed]:
+                lines.append(f"  {item}: {message}")
+            if max_listed is not None and len(entries) > max_listed:
+                lines.append(f"  ... and {len(entries) - max_listed} more")
+        return "\n".join(lines)
+
+    def finish(self, state="done", metrics=None, directory=None):
+        """Closes the run and writes <log dir>/reports/<tool>_<date>-<time>.json and .txt.
+
+        Args:
+            state: How the run ended ("done", "cancelled", "failed").
+            metrics: An instrumentation summary to include.
+
+        Returns:
+            (json_path, text_path), or None if the report could not be written.
+        """
+        self.finished = time.time()
+        self.state = state
+        self.metrics = metrics
+        directory = directory or os.path.join(default_log_dir(), REPORTS_DIR)
+        stamp = time.strftime("%Y%m%d-%H%M%S", time.localtime(self.started))
+        base = os.path.join(directory, f"{self.tool}_{stamp}_{os.getpid()}")
+        try:
+            os.makedirs(directory, exist_ok=True)
+            with open(base + ".json", "w", encoding="utf-8") as f:
+                json.dump(self.to_dict(), f, indent=4)
+            with open(base + ".txt", "w", encoding="utf-8") as f:
+                f.write(self.format() + "\n")
+        except OSError as e:
+            logger.error("Could not write the %s report: %s", self.tool, e)
+            return None
+        self.paths = (base + ".json", base + ".txt")
+        self.logger.info("%s %s: %s, %d errors (report: %s)", self.tool, state,
+                         ", ".join(f"{count} {outcome}" for outcome, count in self.counts.items()) or "nothing done",
+                         len(self.errors), self.paths[1], extra={"report": self.paths[0], "tool": self.tool})
+        return self.paths
+
+    def dialog_text(self, max_listed=MAX_LISTED_ERRORS):
+        """A short summary for a single message box at the end of a run."""
+        text = self.format(max_listed)
+        if self.paths:
+            text += f"\n\nFull report: {self.paths[1]}"
+        return text
+
+
+@contextmanager
+def reporting(report, metrics=None):
+    """Finishes a report when the enclosed run ends: "done", "cancelled" or "failed" (the error is recorded).
+
+    Args:
+        report: The RunReport of the run.
+        metrics: The instrumentation Metrics of the run, summarised into the report.
+    """
+    state = "done"
+    try:
+        yield report
+    except JobCancelled:
+        state = "cancelled"
+        raise
+    except BaseException as e:
+        state = "failed"
+        report.error(report.target or report.tool, e if str(e) else type(e).__name__)
+        raise
+    finally:
+        report.finish(state, metrics.summary() if metrics is not None else None)
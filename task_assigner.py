@@ -177,6 +177,7 @@ class TaskAssigner(ttk.Frame):
 
     def load_tasks(self):
         self.task_listbox.delete(0, tk.END)
+        self.task_files = []  # task file path for each listbox row
         if not self.project_dir:
             return
 
@@ -193,6 +194,7 @@ class TaskAssigner(ttk.Frame):
                                 task[key.strip()] = value.strip()
                         text = f"{task['task name']} - {task['assigned artist']} - {task['due date']}"
                         self.task_listbox.insert(tk.END, text)
+                        self.task_files.append(task_path)
                 except Exception as e:
                     messagebox.showerror("Error", f"Error loading task from {file_name}: {e}")
 
@@ -200,11 +202,7 @@ class TaskAssigner(ttk.Frame):
         selection = self.task_listbox.curselection()
         if selection:
             index = selection[0]
-            text = self.task_listbox.get(index)
-            task_name = text.split(" - ")[0]
-
-            file_name = f"task for {task_name}.txt"
-            task_path = os.path.join(self.project_dir, file_name)
+            task_path = self.task_files[index]
 
             try:
                 with open(task_path, "r") as f:
@@ -245,8 +243,7 @@ class TaskAssigner(ttk.Frame):
             index = selection[0]
             # New parameters for the selected directory
             task_name = self.task_listbox.get(index).split(" - ")[0]  # Task Name
-            file_name = f"task for {task_name}.txt"
-            task_path = os.path.join(self.project_dir, file_name)  # Full task for it to
+            task_path = self.task_files[index]  # Full task for it to
 
             # Get a new data
             new_task_name = self.task_name_entry.get()  # new parameter for a folder
@@ -283,9 +280,7 @@ class TaskAssigner(ttk.Frame):
             index = selection[0]
             text = self.task_listbox.get(index)
             task_name = text.split(" - ")[0]
-
-            file_name = f"task for {task_name}.txt"
-            task_path = os.path.join(self.project_dir, file_name)
+            task_path = self.task_files[index]
 
             try:
                 os.remove(task_path)
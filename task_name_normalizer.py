@@ -0,0 +1,203 @@
+import logging
+import os
+import re
+from collections import Counter, defaultdict
+
+logger = logging.getLogger(__name__)
+
+# --- Constants ---
+SIMILARITY_THRESHOLD = 0.6  # Dice coefficient over trigrams needed to merge two names
+MAX_POSTING_LENGTH = 500  # Trigrams shared by more names than this are too common to be useful
+TASK_FILE_PREFIX = "task for "
+TASK_FILE_EXTENSION = ".txt"
+
+_SEPARATORS = re.compile(r"[\s_\-.]+")
+_DIGITS = re.compile(r"\d+")
+
+
+# --- Helper Functions ---
+def normalize_task_name(name):
+    """Lower-cases a task name and collapses separators so trivial variants compare equal."""
+    return _SEPARATORS.sub(" ", name.strip().lower()).strip()
+
+
+def trigrams(text):
+    """Returns the set of character trigrams of a (padded) string."""
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def digit_runs(text):
+    """Returns the numbers in a name ("Shot 010 anim v2" -> (10, 2)); names with different ones are different tasks."""
+    return tuple(int(run) for run in _DIGITS.findall(text))
+
+
+def cluster_task_names(names, threshold=SIMILARITY_THRESHOLD):
+    """Groups near-duplicate task names.
+
+    Candidate pairs are found through an inverted trigram index, so only names that share
+    trigrams are ever compared instead of every pair in the history. Names whose numbers
+    differ ("Shot 010 animation" and "Shot 020 animation") are never merged.
+
+    Clusters are not transitive: the most used name (after normalization) becomes a
+    canonical name, and only names directly similar to it join its cluster, so a chain of
+    small differences cannot pull unrelated tasks together.
+
+    Args:
+        names: Iterable of raw task names (duplicates count towards the canonical choice).
+        threshold: Minimum trigram Dice similarity between a name and its cluster's canonical name.
+
+    Returns:
+        A list of clusters, largest first. Each cluster is a dict with "canonical" (the most
+        used spelling of the most used normalized name), "variants" (raw spellings, most used
+        first) and "count" (total uses).
+    """
+    raw_counts = Counter(name for name in names if name)
+
+    # Collapse raw spellings onto their normalized key first; those are always the same task
+    by_key = defaultdict(Counter)
+    for name, count in raw_counts.items():
+        by_key[normalize_task_name(name)][name] += count
+
+    keys = list(by_key)
+    key_counts = [sum(by_key[key].values()) for key in keys]
+    key_grams = [trigrams(key) for key in keys]
+    key_digits = [digit_runs(key) for key in keys]
+
+    index = defaultdict(list)
+    for key_id, grams in enumerate(key_grams):
+        for gram in grams:
+            index[gram].append(key_id)
+
+    similar = defaultdict(set)
+    for key_id, grams in enumerate(key_grams):
+        shared = Counter()
+        for gram in grams:
+            posting = index[gram]
+            if len(posting) > MAX_POSTING_LENGTH:
+                continue
+            for other_id in posting:
+                if other_id > key_id:  # every pair is scored once
+                    shared[other_id] += 1
+
+        for other_id, common in shared.items():
+            if key_digits[key_id] != key_digits[other_id]:
+                continue
+            similarity = 2.0 * common / (len(grams) + len(key_grams[other_id]))
+            if similarity >= threshold:
+                similar[key_id].add(other_id)
+                similar[other_id].add(key_id)
+
+    # Most used names become canonical first. Ties go to the name with more similar uses around it,
+    # then the longer one (typos mostly drop letters), then alphabetical order
+    support = [sum(key_counts[other_id] for other_id in similar[key_id]) for key_id in range(len(keys))]
+    order = sorted(range(len(keys)),
+                   key=lambda key_id: (-key_counts[key_id], -support[key_id], -len(keys[key_id]), keys[key_id]))
+    rank = {key_id: position for position, key_id in enumerate(order)}
+    assigned = set()
+    clusters = []
+    for key_id in order:
+        if key_id in assigned:
+            continue
+        member_ids = [key_id] + sorted(similar[key_id] - assigned, key=rank.__getitem__)
+        assigned.update(member_ids)
+
+        canonical_counts = by_key[keys[key_id]]
+        canonical = min(canonical_counts, key=lambda v: (-canonical_counts[v], v))
+        variant_counts = Counter()
+        for member_id in member_ids:
+            variant_counts.update(by_key[keys[member_id]])
+        clusters.append({
+            "canonical": canonical,
+            "variants": sorted(variant_counts, key=lambda v: (-variant_counts[v], v)),
+            "count": sum(variant_counts.values()),
+        })
+
+    clusters.sort(key=lambda c: (-c["count"], c["canonical"]))
+    return clusters
+
+
+def canonical_name_map(clusters):
+    """Maps every non-canonical variant to its cluster's canonical name."""
+    name_map = {}
+    for cluster in clusters:
+        for variant in cluster["variants"]:
+            if variant != cluster["canonical"]:
+                name_map[variant] = cluster["canonical"]
+    return name_map
+
+
+def task_file_path(directory, task_name, taken=None):
+    """Returns the path of the task file the Task Assigner uses for a task name.
+
+    If a path is given in `taken` and the plain file name already exists, a numbered
+    variant ("task for X (2).txt") is returned instead.
+    """
+    path = os.path.join(directory, f"{TASK_FILE_PREFIX}{task_name}{TASK_FILE_EXTENSION}")
+    number = 2
+    while taken and os.path.exists(path) and os.path.normcase(path) != os.path.normcase(taken):
+        path = os.path.join(directory, f"{TASK_FILE_PREFIX}{task_name} ({number}){TASK_FILE_EXTENSION}")
+        number += 1
+    return path
+
+
+def rewrite_task_records(task_paths, name_map, report=None):
+    """Rewrites task files whose name has a canonical replacement.
+
+    The "task name" line is rewritten and the file is renamed to match. If another task
+    already uses the canonical file name, the record gets a numbered file name instead.
+
+    Args:
+        task_paths: Paths of the task files to consider.
+        name_map: Mapping of variant name -> canonical name (see canonical_name_map).
+        report: A run_logging.RunReport to record the outcomes and failures in (errors are
+            only logged without one).
+
+    Returns:
+        (rewritten, failed) lists of (old_path, new_path) tuples.
+    """
+    rewritten = []
+    failed = []
+
+    def fail(task_path, new_path, message):
+        failed.append((task_path, new_path))
+        if report is not None:
+            report.error(task_path, message)
+            report.count("failed")
+        else:
+            logger.error(f"{task_path}: {message}")
+
+    for task_path in task_paths:
+        try:
+            with open(task_path, "r") as f:
+                lines = f.readlines()
+        except OSError as e:
+            fail(task_path, None, f"Error reading task file: {e}")
+            continue
+
+        new_name = None
+        for i, line in enumerate(lines):
+            if ":" in line:
+                key, value = line.strip().split(":", 1)
+                if key.strip() == "task name":
+                    new_name = name_map.get(value.strip())
+                    if new_name:
+                        lines[i] = f"task name: {new_name}\n"
+                    break
+
+        if not new_name:
+            continue
+
+        new_path = task_file_path(os.path.dirname(task_path), new_name, taken=task_path)
+        try:
+            with open(new_path, "w") as f:
+                f.writelines(lines)
+            if os.path.normcase(new_path) != os.path.normcase(task_path):
+                os.remove(task_path)
+            rewritten.append((task_path, new_path))
+            if report is not None:
+                report.count("rewritten")
+        except OSError as e:
+            fail(task_path, new_path, f"Error rewriting task file: {e}")
+
+    return rewritten, failed
@@ -0,0 +1,136 @@
+import fnmatch
+import json
+import logging
+import os
+import re
+
+logger = logging.getLogger(__name__)
+
+# --- Constants ---
+CONFIG_FILE = "project_templates.json"  # Looked up in the project root
+DEFAULT_TEMPLATES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "blender_files")
+TEMPLATES_DIR_ENV = "ELI_LAB_TEMPLATES_DIR"  # Overrides the default templates directory (e.g. on the farm)
+DEFAULT_RULES = [
+    {"pattern": "*_assets", "template": "Asset.blend"},
+    {"pattern": "*_characters", "template": "Character.blend"},
+    {"pattern": "*_locations", "template": "Location.blend"},
+]
+MATCH_TYPES = ("glob", "regex")
+SCOPES = ("name", "path")
+
+
+# --- Helper Functions ---
+def _rule_regex(rule):
+    """Translates one rule's pattern to a regex source string."""
+    match_type = rule.get("match", "glob")
+    if match_type not in MATCH_TYPES:
+        raise ValueError(f"Unknown match type '{match_type}', expected one of {MATCH_TYPES}")
+    if match_type == "glob":
+        return fnmatch.translate(rule["pattern"])
+    return rf"(?:{rule['pattern']})\Z"
+
+
+def _compile(indexed_rules):
+    """Compiles rules into one alternation; the name of the matching group is the rule index."""
+    if not indexed_rules:
+        return None
+    return re.compile("|".join(f"(?P<r{index}>{_rule_regex(rule)})" for index, rule in indexed_rules))
+
+
+class TemplateRegistry:
+    """Maps project folders to template files through an ordered list of rules.
+
+    Each rule is a dict with:
+        pattern: glob (default) or regex matched against the whole folder name or path.
+        match: "glob" or "regex".
+        scope: "name" to match the folder name (default) or "path" to match the folder's
+            path relative to the project root, with "/" separators.
+        template: template file, relative to the templates directory.
+
+    All rules of a scope are compiled into a single regex, so a folder is tested against every
+    rule in one match call. Earlier rules win over later ones.
+    """
+
+    def __init__(self, rules, templates_dir=DEFAULT_TEMPLATES_DIR):
+        self.templates_dir = templates_dir
+        self.rules = []
+        for rule in rules:
+            if rule.get("scope", "name") not in SCOPES:
+                raise ValueError(f"Unknown rule scope '{rule.get('scope')}', expected one of {SCOPES}")
+            template_path = os.path.normpath(os.path.join(templates_dir, rule["template"]))
+            if not os.path.isfile(template_path):
+                logger.error(f"Template Blender file '{template_path}' not found.")
+                continue
+            self.rules.append(dict(rule, template_path=template_path))
+
+        indexed = list(enumerate(self.rules))
+        self._name_matcher = _compile([(i, r) for i, r in indexed if r.get("scope", "name") == "name"])
+        self._path_matcher = _compile([(i, r) for i, r in indexed if r.get("scope", "name") == "path"])
+        self._name_cache = {}  # Folder names repeat a lot across a project
+
+    def _rule_index(self, matcher, text):
+        match = matcher.match(text)
+        return int(match.lastgroup[1:]) if match else None
+
+    def match_folder(self, name, relative_path=None):
+        """Returns the template path for a folder, or None if no rule matches.
+
+        Args:
+            name: The folder name.
+            relative_path: The folder path relative to the project root ("/" separated), needed
+                for path rules.
+        """
+        if name in self._name_cache:
+            name_index = self._name_cache[name]
+        else:
+            name_index = self._rule_index(self._name_matcher, name) if self._name_matcher else None
+            self._name_cache[name] = name_index
+
+        path_index = None
+        if self._path_matcher and relative_path is not None:
+            path_index = self._rule_index(self._path_matcher, relative_path)
+
+        indexes = [index for index in (name_index, path_index) if index is not None]
+        return self.rules[min(indexes)]["template_path"] if indexes else None
+
+    def template_paths(self):
+        """Returns the distinct template files used by the rules."""
+        return sorted({rule["template_path"] for rule in self.rules})
+
+
+def default_templates_dir():
+    """Returns the templates directory used when a config does not name one."""
+    return os.environ.get(TEMPLATES_DIR_ENV, DEFAULT_TEMPLATES_DIR)
+
+
+def load_template_registry(root_directory=None, config_path=None):
+    """Loads the template registry of a project.
+
+    The config is taken from config_path, or from project_templates.json in the project root.
+    Without a config, the built-in rules for the asset/character/location folders are used.
+    A relative "templates_dir" in the config is resolved against the config's directory.
+
+    Config format:
+        {
+            "templates_dir": "../blender_files",
+            "rules": [
+                {"pattern": "*_assets", "template": "Asset.blend"},
+                {"pattern": "episodes/*/shots", "scope": "path", "template": "Shot.blend"},
+                {"pattern": "ch_[a-z]+", "match": "regex", "template": "Character.blend"}
+            ]
+        }
+    """
+    if config_path is None and root_directory:
+        candidate = os.path.join(root_directory, CONFIG_FILE)
+        if os.path.isfile(candidate):
+            config_path = candidate
+
+    if not config_path:
+        return TemplateRegistry(DEFAULT_RULES, default_templates_dir())
+
+    with open(config_path, "r") as f:
+        config = json.load(f)
+
+    templates_dir = config.get("templates_dir") or default_templates_dir()
+    templates_dir = os.path.join(os.path.dirname(os.path.abspath(config_path)), os.path.expanduser(templates_dir))
+    return TemplateRegistry(config.get("rules", DEFAULT_RULES), templates_dir)
@@ -1,12 +1,39 @@
+import argparse
+import glob
+import logging
 import os
-import threading
+import shutil
+import sys
+import time
 import tkinter as tk
+from functools import partial
 from tkinter import filedialog, messagebox, ttk
 
 from PIL import Image
 
+from encoder_presets import (DEFAULT_PRESET, ENCODER_PRESETS, MAX_MIP_LEVELS, MIP_SUFFIX, encode_image,
+                             get_preset, mip_chain, mip_path, output_path, prepare_for_format)
+import instrumentation
+from file_ops import copy_file, fsync_directory, fsync_file
+from job_daemon import DaemonJobPoller, daemon_available
+from job_runtime import CANCELLED, DONE, Job, JobRuntime
+from progress_journal import ProgressJournal, journal_path
+from profiling import add_profiling_arguments, profiled
+from run_logging import RunReport, add_logging_arguments, reporting, setup_logging
+from texture_dedup import duplicate_map
+from throughput import TextProgress
+from thumbnail_cache import add_to_cache
+
+logger = logging.getLogger(__name__)
+
 # --- Constants ---
 ALLOWED_EXTENSIONS = (".jpg", ".jpeg", ".tga", ".exr", ".hdr", ".bmp", ".gif", ".tiff", ".tif", ".png")
+JOURNAL_OPERATION = "texture_convert"  # Progress journal: <directory>/.texture_convert_journal.jsonl
+TEMP_SUFFIX = ".converting.tmp"  # <name>.png.<pid>.converting.tmp until the output is committed
+TRASH_DIR = ".converted_originals"  # Originals are moved here, in one folder per day, instead of deleted
+TRASH_KEEP_DAYS = 14
+COMMIT_BATCH_SIZE = 64  # Converted files made durable and renamed into place together
+COMMIT_INTERVAL = 2.0  # Seconds before a partial batch is committed anyway
 
 
 # --- Helper Functions ---
@@ -15,193 +42,663 @@ def is_image_file(filename):
     return filename.lower().endswith(ALLOWED_EXTENSIONS)
 
 
-def convert_texture_to_png(filepath, output_dir, lock):
+def is_complete_image(path):
+    """Checks that an image file exists and decodes completely (a truncated file fails to load)."""
     try:
-        if not os.path.isfile(filepath):
-            print(f"Skipping '{filepath}' - not a valid file.")
-            return False
-
-        filename = os.path.basename(filepath)
-        if not is_image_file(filename):
-            print(f"Skipping '{filename}' - not an image file.")
-            return False
-
-        # Skip if already a PNG
-        if filename.lower().endswith(".png"):
-            print(f"Skipping '{filename}' - already a PNG")
-            return False
-
-        img = Image.open(filepath)
-        name, _ = os.path.splitext(filename)
-        output_path = os.path.join(output_dir, name + ".png")
-
-        if output_path == filepath:
-            print(f"Skipping '{filename}' - already in PNG")
-            return False
-
-        img.save(output_path, "PNG")
-        print(f"Converted '{filename}' to '{output_path}'")
-
-        # Delete the original file (replacement)
-        try:
-            os.remove(filepath)
-            print(f"Removed original '{filename}'")
-        except OSError as e:
-            print(f"Error deleting '{filename}': {e}")
-
+        with Image.open(path) as img:
+            img.load()
         return True
-
-    except Exception as e:
-        print(f"Error processing '{filepath}': {e}")
+    except Exception:
         return False
 
 
-def convert_textures(directory, progress_callback, start_progress_callback, end_progress_callback, lock):
-    """Converts all textures in a directory to PNG format."""
-
-    if not os.path.isdir(directory):
-        print(f"Error: '{directory}' is not a valid directory.")
-        return
-
-    all_files = [f for f in os.listdir(directory) if os.path.isfile(os.path.join(directory, f)) and is_image_file(f)]
-    total_files = len(all_files)
-    processed_count = 0
-    output_dir = directory  # output is in the same folder
-
-    start_progress_callback(total_files)
-
-    for filename in all_files:
-        filepath = os.path.join(directory, filename)
-        if convert_texture_to_png(filepath, output_dir, lock):
-            pass  # Successfully converted
+def trash_dir_for(directory):
+    """Returns today's trash folder for originals replaced in a directory."""
+    return os.path.join(directory, TRASH_DIR, time.strftime("%Y-%m-%d"))
 
-        processed_count += 1
-        progress_callback(processed_count)
 
-    end_progress_callback()
+def move_to_trash(filepath, trash_dir):
+    """Moves a file into the trash folder (a rename, so nothing is copied) and returns its new path."""
+    os.makedirs(trash_dir, exist_ok=True)
+    name, extension = os.path.splitext(os.path.basename(filepath))
+    trash_path = os.path.join(trash_dir, name + extension)
+    counter = 1
+    while os.path.exists(trash_path):  # Converted twice on the same day
+        trash_path = os.path.join(trash_dir, f"{name}.{counter}{extension}")
+        counter += 1
+    os.replace(filepath, trash_path)
+    return trash_path
 
 
-# --- GUI Setup ---
-root = tk.Tk()
-root.title("Texture Batch Converter")
-root.geometry("600x350")
+def restore_from_trash(filepath):
+    """Moves the most recently trashed copy of a file back into place.
 
-# --- Styling ---
-style = ttk.Style(root)
-style.theme_use('clam')
+    Returns:
+        True if a copy was found and restored.
+    """
+    directory, filename = os.path.split(filepath)
+    trash_root = os.path.join(directory, TRASH_DIR)
+    try:
+        days = sorted(os.listdir(trash_root), reverse=True)
+    except FileNotFoundError:
+        return False
+    for day in days:
+        candidate = os.path.join(trash_root, day, filename)
+        if os.path.isfile(candidate):
+            os.replace(candidate, filepath)
+            logger.info(f"Restored '{filename}' from '{os.path.join(trash_root, day)}'")
+            return True
+    return False
+
+
+def purge_trash(directory, keep_days=TRASH_KEEP_DAYS):
+    """Deletes trash folders older than keep_days."""
+    trash_root = os.path.join(directory, TRASH_DIR)
+    cutoff = time.strftime("%Y-%m-%d", time.localtime(time.time() - keep_days * 86400))
+    try:
+        days = os.listdir(trash_root)
+    except FileNotFoundError:
+        return
+    for day in days:
+        if day < cutoff:
+            shutil.rmtree(os.path.join(trash_root, day), ignore_errors=True)
+            logger.info(f"Purged trashed originals from {day}")
+
+
+def remove_stale_temp_files(output_path):
+    """Removes temp files a killed run left next to output_path (and its mip levels)."""
+    base, extension = os.path.splitext(output_path)
+    patterns = [glob.escape(output_path) + ".*" + TEMP_SUFFIX,
+                glob.escape(base + MIP_SUFFIX) + "*" + glob.escape(extension) + ".*" + TEMP_SUFFIX]
+    for pattern in patterns:
+        for temp_path in glob.glob(pattern):
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+
+
+def verify_interrupted_conversion(filepath, output_dir, preset=DEFAULT_PRESET):
+    """Checks a file whose conversion was in flight when a previous run was killed.
+
+    Returns:
+        "redo" if the original is still there, or could be restored from the trash because
+        its output is missing or truncated; "converted" if the original is gone and the
+        output is complete; or "lost" if neither can be recovered.
+    """
+    converted = output_path(filepath, output_dir, preset)
+    remove_stale_temp_files(converted)
+    if os.path.isfile(filepath):
+        return "redo"
+    if is_complete_image(converted):
+        return "converted"
+    if restore_from_trash(filepath):
+        return "redo"
+    return "lost"
+
+
+def write_converted(filepath, output_dir, preset=DEFAULT_PRESET, mip_levels=0, thumbnails=False):
+    """Converts one texture to verified temp files next to their final paths (phase one of a conversion).
+
+    The output, and each mip level if asked for, is encoded with the preset (see
+    encoder_presets), then read back: the format and size must match and, for PNG, every
+    chunk's CRC is checked. commit_conversions makes the files durable and renames them.
+    With thumbnails, the decoded image also feeds the thumbnail cache (see thumbnail_cache),
+    so previews of the output never need to decode it again.
+
+    Returns:
+        (outputs, error): outputs is a list of (temp_path, final_path), main output first, or
+        None if the file was skipped or could not be converted; error says why it could not
+        be converted (None otherwise).
+    """
+    if not os.path.isfile(filepath):
+        logger.debug(f"Skipping '{filepath}' - not a valid file.")
+        return None, None
+
+    filename = os.path.basename(filepath)
+    if not is_image_file(filename):
+        logger.debug(f"Skipping '{filename}' - not an image file.")
+        return None, None
+
+    # Skip if already in the target format
+    final_path = output_path(filepath, output_dir, preset)
+    if filename.lower().endswith(get_preset(preset)["extension"]):
+        logger.debug(f"Skipping '{filename}' - already a {get_preset(preset)['format']}")
+        return None, None
+
+    outputs = []
+    try:
+        with Image.open(filepath) as img:
+            with instrumentation.span("decode", file=filename):
+                img.load()
+            instrumentation.count("bytes_read", os.path.getsize(filepath))
+            with instrumentation.span("mips", file=filename):
+                prepared = prepare_for_format(img, get_preset(preset)["format"])
+                levels = [(0, prepared)] + list(mip_chain(prepared, mip_levels))
+            for level, level_img in levels:
+                target = final_path if level == 0 else mip_path(final_path, level)
+                temp_path = f"{target}.{os.getpid()}{TEMP_SUFFIX}"
+                outputs.append((temp_path, target))
+                with instrumentation.span("encode", file=filename, level=level):
+                    encode_image(level_img, temp_path, preset)
+                with instrumentation.span("verify", file=filename, level=level):
+                    verify_output(temp_path, get_preset(preset)["format"], level_img.size)
+                instrumentation.count("bytes_written", os.path.getsize(temp_path))
+            if thumbnails:
+                with instrumentation.span("thumbnails", file=filename):
+                    add_to_cache(final_path, img, content_path=outputs[0][0])
+        return outputs, None
+    except Exception as e:
+        logger.debug(f"Error processing '{filepath}': {e}")  # Returned to the caller, which reports it
+        for temp_path, _ in outputs:
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+        return None, str(e)
+
+
+def verify_output(path, image_format, size):
+    """Re-reads a written file's header, raising ValueError if it is not the expected image."""
+    with Image.open(path) as written:
+        if written.format != image_format or written.size != size:
+            raise ValueError(f"written file is not a {size[0]}x{size[1]} {image_format}")
+        written.verify()  # Checks every chunk's CRC for PNG
+
+
+def commit_conversions(converted, trash_dir=None, report=None):
+    """Makes a batch of converted PNGs durable, renames them into place and trashes the originals.
+
+    The temp files are fsynced back to back (most of their data was already written back while
+    the batch was encoding), then renamed, and each directory is fsynced once per step for the
+    whole batch instead of once per file. Originals are only moved to the trash after their
+    PNG is on disk, so a crash at any point leaves the original, the PNG, or both.
+
+    Args:
+        converted: List of (filepath, [(temp_path, final_path), ...]) from write_converted.
+        trash_dir: Folder for the originals (defaults to today's trash folder of each file).
+        report: A run_logging.RunReport collecting the files that could not be saved.
+
+    Returns:
+        The filepaths that were committed.
+    """
+    durable = []
+    with instrumentation.span("commit_files", files=len(converted)):
+        for filepath, outputs in converted:
+            try:
+                for temp_path, _ in outputs:
+                    fsync_file(temp_path)
+                for temp_path, final_path in outputs:
+                    os.replace(temp_path, final_path)
+                durable.append((filepath, outputs[0][1]))
+            except OSError as e:
+                logger.error(f"Error saving the output of '{filepath}': {e}")
+                if report is not None:
+                    report.error(os.path.basename(filepath), f"Could not save the output: {e}")
+                for temp_path, _ in outputs:
+                    try:
+                        os.remove(temp_path)
+                    except OSError:
+                        pass
+
+        directories = {os.path.dirname(os.path.abspath(final_path)) for _, final_path in durable}
+        for directory in directories:
+            fsync_directory(directory)
+
+    committed = []
+    trash_dirs = set()
+    with instrumentation.span("trash_originals", files=len(durable)):
+        for filepath, final_path in durable:
+            logger.info(f"Converted '{os.path.basename(filepath)}' to '{final_path}'")
+            target = trash_dir or trash_dir_for(os.path.dirname(filepath))
+            try:
+                move_to_trash(filepath, target)
+                trash_dirs.add(target)
+            except OSError as e:
+                logger.warning(f"Error moving '{filepath}' to the trash: {e}")
+                if report is not None:
+                    report.warning(os.path.basename(filepath), f"Converted, but the original stays in place: {e}")
+            committed.append(filepath)
+
+        for directory in trash_dirs | {os.path.dirname(os.path.abspath(filepath)) for filepath in committed}:
+            fsync_directory(directory)
+    return committed
+
+
+def reuse_conversion(final_paths, duplicate, output_dir, preset, copy_mode, trash_dir, report=None):
+    """Gives a texture the outputs converted from an identical one, then trashes it.
+
+    Args:
+        final_paths: The committed outputs of the identical texture, main output first.
+        duplicate: The texture to give the same outputs to.
+        copy_mode: How outputs are shared (see file_ops.copy_file): "reflink" or "hardlink".
+        report: A run_logging.RunReport collecting failures.
+
+    Returns:
+        True if the outputs were created.
+    """
+    target = output_path(duplicate, output_dir, preset)
+    targets = [target] + [mip_path(target, level) for level in range(1, len(final_paths))]
+    try:
+        for source, destination in zip(final_paths, targets):
+            copy_file(source, destination, copy_mode)
+        move_to_trash(duplicate, trash_dir)
+    except OSError as e:
+        logger.error(f"Error reusing the conversion for '{duplicate}': {e}")
+        if report is not None:
+            report.error(os.path.basename(duplicate), f"Could not reuse the conversion of an identical texture: {e}")
+        return False
+    logger.info(f"Converted '{os.path.basename(duplicate)}' to '{target}' (identical to an already converted texture)")
+    return True
 
-# Font
-font_name = "Bahnschrift"
 
-# Color scheme
-bg_color = '#2e2e2e'
-fg_color = 'white'
-text_color = '#d3d3d3'
-button_bg_color = '#4a4a4a'
-entry_bg_color = "#4a4a4a"
-button_active_bg_color = '#606060'
+def convert_texture_to_png(filepath, output_dir, preset=DEFAULT_PRESET, mip_levels=0):
+    """Converts one texture (to PNG unless another preset is given) and moves the original to the trash.
 
-# Configure styles
-style.configure('.', background=bg_color, foreground=fg_color, font=(font_name, 10))
-style.configure('TLabel', background=bg_color, foreground=fg_color, padding=5, font=(font_name, 12))
-style.configure('TButton', background=button_bg_color, foreground=fg_color, padding=8, relief='flat',
-                font=(font_name, 11),
-                borderwidth=0, focuscolor='gray',
-                activebackground=button_active_bg_color, activeforeground=fg_color)
-style.map('TButton',
-          background=[('active', button_active_bg_color), ('disabled', button_bg_color)],
-          foreground=[('disabled', 'gray')])
-style.configure('TCombobox', selectbackground=button_bg_color, fieldbackground=button_bg_color,
-                background=button_bg_color, foreground=text_color,
-                arrowcolor=fg_color, borderwidth=0, lightcolor=button_bg_color, darkcolor=button_bg_color,
-                font=(font_name, 11))  # style of ComboBox
+    Stages are timed in the caller's instrumentation run, if there is one (see instrumentation).
 
-style.map('TCombobox', fieldbackground=[('readonly', entry_bg_color)])
+    Returns:
+        True if the texture was converted.
+    """
+    with instrumentation.span("convert", file=os.path.basename(filepath)):
+        outputs, error = write_converted(filepath, output_dir, preset, mip_levels)
+        if outputs is None:
+            if error:
+                logger.error(f"Error processing '{filepath}': {error}")
+            return False
+        return bool(commit_conversions([(filepath, outputs)]))
 
-style.configure('TEntry', fieldbackground="#4a4a4a", foreground=text_color, font=(font_name, 11))
 
-style.configure('Horizontal.TProgressbar', troughcolor=button_bg_color, background=fg_color)
+def convert_textures(directory, progress_callback=None, start_progress_callback=None, end_progress_callback=None,
+                     job=None, preset=DEFAULT_PRESET, mip_levels=0, thumbnails=True, dedup=None, report=None):
+    """Converts all textures in a directory to PNG format, or to the format of another encoder preset.
 
-# --- Main Frame ---
-main_frame = ttk.Frame(root, padding=20)
-main_frame.pack(expand=True, fill='both')
+    Files are decoded and encoded in parallel on the job's process pool (Pillow work is CPU
+    bound). Without a job, a standalone one is used so the function also runs from scripts.
 
-# --- Folder Selection ---
-folder_label = ttk.Label(main_frame, text="Folder:")
-folder_label.pack(pady=(0, 5), fill='x')
+    preset names one of encoder_presets.ENCODER_PRESETS; with mip_levels, that many halved
+    copies are written next to each output (wood_mip1.png, wood_mip2.png, ...). With
+    thumbnails, previews of every output are cached on the way (see thumbnail_cache).
 
-folder_path_entry = ttk.Entry(main_frame, width=50)
-folder_path_entry.pack(pady=(0, 5), fill='x')
+    With dedup ("reflink" or "hardlink", see file_ops.copy_file), byte-identical textures are
+    found first (see texture_dedup) and each is converted once; its copies get the outputs
+    shared in that mode.
 
+    Each output is written to a temp file and verified by the worker; the batch is then committed
+    in groups of COMMIT_BATCH_SIZE files (or every COMMIT_INTERVAL seconds), which keeps the
+    fsync cost per file low. Originals are moved to <directory>/.converted_originals/<date>,
+    and trash folders older than TRASH_KEEP_DAYS are purged at the start of a run.
 
-def browse_folder():
-    folder_path = filedialog.askdirectory()
-    if folder_path:
-        folder_path_entry.delete(0, tk.END)
-        folder_path_entry.insert(0, folder_path)
+    Progress is kept in a journal in the directory (see progress_journal). Converted originals
+    leave the directory, so a re-run after a crash only sees the files still to do; the files
+    that were in flight are verified first, and the journal is removed once the batch finished.
 
+    Every stage (decode, mips, encode, verify, thumbnails, commit) is timed per file and
+    summarised with p50/p95/p99 at the end of the run (see instrumentation).
 
-browse_button = ttk.Button(main_frame, text="Browse", command=browse_folder)
-browse_button.pack(pady=(0, 10), fill='x')
+    Failures are collected in report (a run_logging.RunReport, created if not given) rather
+    than stopping the batch; it is written to the reports folder when the run ends.
 
-# --- Quality Selection ---
-quality_label = ttk.Label(main_frame, text="Quality Preset:")
-quality_label.pack(pady=(10, 5), fill='x')
+    progress_callback is called with the files processed and the bytes read so far, which
+    is what Job.progress takes for its throughput meter.
 
-quality_values_list = ["Very Low", "Low", "Medium", "High"]
-quality_combobox = ttk.Combobox(main_frame, values=quality_values_list, state="readonly")
-quality_combobox.set("Medium")
-quality_combobox.pack(pady=(0, 10), fill='x')
+    Returns:
+        The number of converted files.
+    """
 
-# --- Progress Bar ---
-progress_bar = ttk.Progressbar(main_frame, orient="horizontal", length=400, mode="determinate")
-progress_bar.pack(pady=(10, 15), fill='x')
+    if not os.path.isdir(directory):
+        logger.error(f"'{directory}' is not a valid directory.")
+        return 0
+    report = report or RunReport("convert_textures", directory)
+    with instrumentation.run("convert_textures") as metrics, reporting(report, metrics):
+        return _convert_textures(directory, progress_callback, start_progress_callback, end_progress_callback,
+                                 job, preset, mip_levels, thumbnails, dedup, report)
 
-# --- Compression Button ---
-# Create a thread lock
-thread_lock = threading.Lock()
 
+def _convert_textures(directory, progress_callback, start_progress_callback, end_progress_callback, job, preset,
+                      mip_levels, thumbnails, dedup, report):
 
-def start_compression():
-    directory = folder_path_entry.get()
-    if not directory:
-        messagebox.showerror("Error", "Please select a folder.")
-        return
+    job = job or Job("convert_textures")
+    output_dir = directory  # output is in the same folder
+    trash_dir = trash_dir_for(directory)
+    purge_trash(directory)
+
+    get_preset(preset)  # Fail before anything is written
+    journal = ProgressJournal(journal_path(directory, JOURNAL_OPERATION),
+                              options={"preset": preset, "mip_levels": mip_levels})
+    for filename in list(journal.interrupted):
+        state = verify_interrupted_conversion(os.path.join(directory, filename), output_dir, preset)
+        if state == "redo":
+            logger.info(f"Re-converting '{filename}', interrupted by the previous run")
+        elif state == "converted":
+            logger.info(f"Verified '{filename}', converted before the previous run was interrupted")
+            journal.done(filename, converted=True)
+        else:
+            report.error(filename, "Removed by the interrupted run, but its output is missing or truncated")
+            journal.done(filename, converted=False, lost=True)
 
-    # Disable the button and other controls
-    compress_button["state"] = "disabled"
-    browse_button["state"] = "disabled"
-    quality_combobox["state"] = "disabled"
-
-    # Update the progress bar
-    def update_progress(value):
-        progress_bar["value"] = value
-        root.update_idletasks()
-
-    def start_progress(max_value):
-        progress_bar["maximum"] = max_value
-        progress_bar["value"] = 0
-
-    def end_progress():
-        progress_bar["value"] = 0
-        messagebox.showinfo("Info", "Texture conversion complete!")
-        # Re-enable controls here as well
-        compress_button["state"] = "normal"
-        browse_button["state"] = "normal"
-        quality_combobox["state"] = "readonly"
-
-    # Start the conversion in a separate thread
-    threading.Thread(target=lambda: convert_textures(
-        directory,
-        progress_callback=update_progress,
-        start_progress_callback=start_progress,
-        end_progress_callback=end_progress,
-        lock=thread_lock
-    ), daemon=True).start()
-
-
-compress_button = ttk.Button(main_frame, text="Convert Textures", command=start_compression)
-compress_button.pack(pady=(15, 0), fill='x')
-
-# --- Run the GUI ---
-root.mainloop()
+    all_files = [f for f in os.listdir(directory) if os.path.isfile(os.path.join(directory, f)) and is_image_file(f)]
+    total_files = len(all_files)
+    processed_count = 0
+    converted_count = 0
+
+    if start_progress_callback:
+        start_progress_callback(total_files)
+
+    pending = []
+    last_commit = time.monotonic()
+
+    filepaths = [os.path.join(directory, filename) for filename in all_files]
+    duplicates = {}
+    if dedup:
+        with instrumentation.span("find_duplicates", files=len(filepaths)):
+            filepaths, duplicates = duplicate_map(filepaths, job)
+        logger.info(f"{sum(len(copies) for copies in duplicates.values())} textures are identical to another one "
+                    f"and will reuse its conversion")
+
+    def finish_duplicates(filepath, final_paths, outcome="converted"):
+        # Runs after filepath was committed, or with final_paths None once it was "skipped" or "failed"
+        nonlocal processed_count, converted_count
+        for duplicate in duplicates.get(filepath, ()):
+            if outcome == "skipped":
+                reused = False
+                report.count("skipped")  # Skipped for the same reason as the identical texture
+            elif final_paths is None:
+                reused = False
+                report.error(os.path.basename(duplicate), "Not converted: an identical texture failed to convert")
+                report.count("failed")
+            else:
+                reused = reuse_conversion(final_paths, duplicate, output_dir, preset, dedup, trash_dir, report)
+                report.count("reused" if reused else "failed")
+            journal.done(os.path.basename(duplicate), converted=reused)
+            converted_count += reused
+            processed_count += 1
+            if progress_callback:
+                progress_callback(processed_count, instrumentation.counter("bytes_read"))
+
+    def commit():
+        nonlocal converted_count
+        committed = set(commit_conversions(pending, trash_dir, report))
+        for filepath, outputs in pending:
+            journal.done(os.path.basename(filepath), converted=filepath in committed)
+            report.count("converted" if filepath in committed else "failed")
+            if filepath in committed:
+                finish_duplicates(filepath, [final for _, final in outputs])
+            else:
+                finish_duplicates(filepath, None, "failed")
+        converted_count += len(committed)
+        pending.clear()
+
+    convert = instrumentation.instrumented(partial(write_converted, output_dir=output_dir, preset=preset,
+                                                   mip_levels=mip_levels, thumbnails=thumbnails))
+    try:
+        for filepath, result in job.map(convert, journal.track(filepaths, key=os.path.basename), kind="process"):
+            outputs, error = instrumentation.collect(result)
+            instrumentation.count("files")
+            if outputs is None:
+                journal.done(os.path.basename(filepath), converted=False)
+                if error:
+                    report.error(os.path.basename(filepath), error)
+                report.count("failed" if error else "skipped")
+                finish_duplicates(filepath, None, "failed" if error else "skipped")
+            else:
+                pending.append((filepath, outputs))
+                if len(pending) >= COMMIT_BATCH_SIZE or time.monotonic() - last_commit >= COMMIT_INTERVAL:
+                    commit()
+                    last_commit = time.monotonic()
+
+            processed_count += 1
+            if progress_callback:
+                progress_callback(processed_count, instrumentation.counter("bytes_read"))
+    except BaseException:
+        commit()  # Files already verified are kept
+        journal.close()
+        raise
+    commit()
+    journal.complete()
+
+    if end_progress_callback:
+        end_progress_callback()
+    return converted_count
+
+
+def main():
+    setup_logging()
+
+    # --- GUI Setup ---
+    root = tk.Tk()
+    root.title("Texture Batch Converter")
+    root.geometry("600x460")
+
+    # --- Styling ---
+    style = ttk.Style(root)
+    style.theme_use('clam')
+
+    # Font
+    font_name = "Bahnschrift"
+
+    # Color scheme
+    bg_color = '#2e2e2e'
+    fg_color = 'white'
+    text_color = '#d3d3d3'
+    button_bg_color = '#4a4a4a'
+    entry_bg_color = "#4a4a4a"
+    button_active_bg_color = '#606060'
+
+    # Configure styles
+    style.configure('.', background=bg_color, foreground=fg_color, font=(font_name, 10))
+    style.configure('TLabel', background=bg_color, foreground=fg_color, padding=5, font=(font_name, 12))
+    style.configure('TButton', background=button_bg_color, foreground=fg_color, padding=8, relief='flat',
+                    font=(font_name, 11),
+                    borderwidth=0, focuscolor='gray',
+                    activebackground=button_active_bg_color, activeforeground=fg_color)
+    style.map('TButton',
+              background=[('active', button_active_bg_color), ('disabled', button_bg_color)],
+              foreground=[('disabled', 'gray')])
+    style.configure('TCombobox', selectbackground=button_bg_color, fieldbackground=button_bg_color,
+                    background=button_bg_color, foreground=text_color,
+                    arrowcolor=fg_color, borderwidth=0, lightcolor=button_bg_color, darkcolor=button_bg_color,
+                    font=(font_name, 11))  # style of ComboBox
+
+    style.map('TCombobox', fieldbackground=[('readonly', entry_bg_color)])
+
+    style.configure('TEntry', fieldbackground="#4a4a4a", foreground=text_color, font=(font_name, 11))
+
+    style.configure('Horizontal.TProgressbar', troughcolor=button_bg_color, background=fg_color)
+
+    # --- Main Frame ---
+    main_frame = ttk.Frame(root, padding=20)
+    main_frame.pack(expand=True, fill='both')
+
+    # --- Folder Selection ---
+    folder_label = ttk.Label(main_frame, text="Folder:")
+    folder_label.pack(pady=(0, 5), fill='x')
+
+    folder_path_entry = ttk.Entry(main_frame, width=50)
+    folder_path_entry.pack(pady=(0, 5), fill='x')
+
+    def browse_folder():
+        folder_path = filedialog.askdirectory()
+        if folder_path:
+            folder_path_entry.delete(0, tk.END)
+            folder_path_entry.insert(0, folder_path)
+
+    browse_button = ttk.Button(main_frame, text="Browse", command=browse_folder)
+    browse_button.pack(pady=(0, 10), fill='x')
+
+    # --- Quality Selection ---
+    quality_label = ttk.Label(main_frame, text="Quality Preset:")
+    quality_label.pack(pady=(10, 5), fill='x')
+
+    quality_combobox = ttk.Combobox(main_frame, values=list(ENCODER_PRESETS), state="readonly")
+    quality_combobox.set(DEFAULT_PRESET)
+    quality_combobox.pack(pady=(0, 10), fill='x')
+
+    mip_label = ttk.Label(main_frame, text="Mip Levels:")
+    mip_label.pack(pady=(0, 5), fill='x')
+
+    mip_combobox = ttk.Combobox(main_frame, values=[str(level) for level in range(MAX_MIP_LEVELS + 1)],
+                                state="readonly")
+    mip_combobox.set("0")
+    mip_combobox.pack(pady=(0, 10), fill='x')
+
+    dedup_var = tk.BooleanVar(value=False)
+    dedup_check = ttk.Checkbutton(main_frame, text="Convert identical textures once (copies share the result)",
+                                  variable=dedup_var)
+    dedup_check.pack(pady=(0, 5), fill='x')
+
+    # --- Progress Bar ---
+    progress_bar = ttk.Progressbar(main_frame, orient="horizontal", length=400, mode="determinate")
+    progress_bar.pack(pady=(10, 0), fill='x')
+    progress_label = ttk.Label(main_frame, text="")  # Files/sec, MB/sec and ETA
+    progress_label.pack(pady=(0, 5), fill='x')
+
+    # --- Background Job ---
+    background_var = tk.BooleanVar(value=False)
+    if daemon_available():
+        background_check = ttk.Checkbutton(main_frame, text="Run in background (keeps running if this window closes)",
+                                           variable=background_var)
+        background_check.pack(pady=(0, 5), fill='x')
+
+    # --- Compression Button ---
+    runtime = JobRuntime()
+    current_job = None
+
+    def start_compression():
+        nonlocal current_job
+        directory = folder_path_entry.get()
+        if not directory:
+            messagebox.showerror("Error", "Please select a folder.")
+            return
+        preset = quality_combobox.get()
+        mip_levels = int(mip_combobox.get())
+        dedup = "reflink" if dedup_var.get() else None
+
+        # Disable the button and other controls
+        compress_button["state"] = "disabled"
+        browse_button["state"] = "disabled"
+        quality_combobox["state"] = "disabled"
+        mip_combobox["state"] = "disabled"
+        cancel_button["state"] = "normal"
+
+        # Job events are delivered on the Tk thread by the runtime, so these may touch widgets
+        def update_progress(value):
+            progress_bar["value"] = value
+            progress_label["text"] = current_job.meter.format()
+
+        def start_progress(max_value):
+            progress_bar["maximum"] = max_value
+            progress_bar["value"] = 0
+
+        # Failures are collected in one report instead of a dialog per file
+        report = RunReport("convert_textures", os.path.abspath(directory))
+
+        def end_progress(job):
+            if job.state == DONE:
+                show_result(DONE, f"{job.result} converted in {job.run_time:.1f}s",
+                            report.dialog_text() if report.errors else None)
+            else:
+                show_result(job.state, job.error)
+
+        def end_daemon_job(job):
+            if job["state"] == DONE:
+                result = job["result"]
+                errors = f"{result['failed']} failed, see {result['report']}" if result.get("failed") else None
+                show_result(DONE, f"{result['converted']} converted in the background", errors)
+            else:
+                show_result(job["state"], job["error"])
+
+        def show_result(state, detail, errors=None):
+            progress_bar["value"] = 0
+            progress_label["text"] = ""
+            if state == DONE and errors:
+                messagebox.showwarning("Warning", f"Texture conversion finished with errors ({detail}).\n\n{errors}")
+            elif state == DONE:
+                messagebox.showinfo("Info", f"Texture conversion complete! ({detail})")
+            elif state == CANCELLED:
+                messagebox.showinfo("Info", "Texture conversion cancelled.")
+            else:
+                messagebox.showerror("Error", f"Texture conversion failed: {detail}")
+            # Re-enable controls here as well
+            compress_button["state"] = "normal"
+            browse_button["state"] = "normal"
+            quality_combobox["state"] = "readonly"
+            mip_combobox["state"] = "readonly"
+            cancel_button["state"] = "disabled"
+
+        if background_var.get():
+            # The job daemon runs the job; closing this window only stops following it
+            def daemon_progress(value, maximum):
+                progress_bar["maximum"] = maximum or 1
+                progress_bar["value"] = value
+
+            current_job = DaemonJobPoller(root, "convert_textures",
+                                          {"directory": os.path.abspath(directory), "preset": preset,
+                                           "mip_levels": mip_levels, "dedup": dedup},
+                                          daemon_progress, end_daemon_job)
+            return
+
+        current_job = runtime.submit(
+            lambda job: convert_textures(directory, progress_callback=job.progress,
+                                         start_progress_callback=job.start, job=job, preset=preset,
+                                         mip_levels=mip_levels, dedup=dedup, report=report),
+            name="Convert Textures", on_start=start_progress, on_progress=update_progress, on_done=end_progress)
+
+    def cancel_compression():
+        if current_job is not None:
+            current_job.cancel()
+
+    compress_button = ttk.Button(main_frame, text="Convert Textures", command=start_compression)
+    compress_button.pack(pady=(15, 0), fill='x')
+
+    cancel_button = ttk.Button(main_frame, text="Cancel", command=cancel_compression, state="disabled")
+    cancel_button.pack(pady=(5, 0), fill='x')
+
+    # --- Run the GUI ---
+    runtime.attach(root)
+    root.mainloop()
+    runtime.shutdown()
+
+
+def run_cli(argv=None):
+    """Command line entry point: converts a folder without opening the GUI."""
+    parser = argparse.ArgumentParser(description="Convert every texture in a folder.")
+    parser.add_argument("directory", nargs="?", help="Folder with the textures to convert.")
+    parser.add_argument("--preset", default=DEFAULT_PRESET, choices=list(ENCODER_PRESETS),
+                        help=f"Encoder preset (default: {DEFAULT_PRESET}).")
+    parser.add_argument("--mips", type=int, default=0, choices=range(MAX_MIP_LEVELS + 1), metavar="LEVELS",
+                        help="Also write this many halved mip levels per texture.")
+    parser.add_argument("--dedup", choices=("reflink", "hardlink"),
+                        help="Convert identical textures once; copies get the result as a reflink or hardlink.")
+    parser.add_argument("--list-presets", action="store_true", help="Print the encoder presets and exit.")
+    add_logging_arguments(parser)
+    add_profiling_arguments(parser)
+    args = parser.parse_args(argv)
+    setup_logging(args.log_level)
+
+    if args.list_presets:
+        for name, preset in ENCODER_PRESETS.items():
+            options = ", ".join(f"{key}={value}" for key, value in preset["options"].items()) or "defaults"
+            print(f"{name}: {preset['format']} ({preset['extension']}), {options}")
+        return 0
+    if not args.directory:
+        parser.error("a directory is required")
+
+    report = RunReport("convert_textures", os.path.abspath(args.directory))
+    job = Job("convert_textures", on_start=lambda total: print(f"Converting {total} files"))
+    job.on_progress = TextProgress(job.meter).show
+    with profiled("convert_textures", args.profile):
+        converted = convert_textures(args.directory, progress_callback=job.progress, start_progress_callback=job.start,
+                                     job=job, preset=args.preset, mip_levels=args.mips, dedup=args.dedup,
+                                     report=report)
+    print(f"{converted} converted with preset '{args.preset}'.")
+    if report.errors:
+        print(report.dialog_text())
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        sys.exit(run_cli())
+    main()
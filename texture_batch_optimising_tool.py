@@ -1,10 +1,49 @@
+import logging
 import os
+import shutil
 import subprocess
 import tkinter as tk
+from functools import partial
 from tkinter import filedialog, messagebox, ttk
 
-from PIL import Image
-
+from PIL import Image, features
+
+import instrumentation
+from job_daemon import DaemonJobPoller, daemon_available
+from file_ops import copy_file
+from job_runtime import CANCELLED, DONE, Job, JobRuntime
+from progress_journal import ProgressJournal, journal_path
+from run_logging import RunReport, reporting, setup_logging
+from texture_batch_converter import is_complete_image
+from texture_dedup import duplicate_map
+from thumbnail_cache import add_to_cache
+
+logger = logging.getLogger(__name__)
+
+# --- Constants ---
+QUALITY_VALUES = {
+    "Very Low": "30-50",
+    "Low": "50-70",
+    "Medium": "60-80",
+    "High": "70-90",
+}
+DEFAULT_QUALITY = "65-85"
+# Pillow has no quality metric, so each pngquant quality range maps to a palette size instead
+PILLOW_COLORS = {
+    "30-50": 32,
+    "50-70": 64,
+    "60-80": 128,
+    "65-85": 192,
+    "70-90": 256,
+}
+BACKENDS = ("auto", "pngquant", "pillow")
+DEFAULT_BACKEND = "auto"
+SMALL_PNG_BYTES = 256 * 1024  # "auto" quantizes files below this in-process: a pngquant spawn costs more than the work
+MAX_LISTED_FAILURES = 10
+JOURNAL_OPERATION = "texture_optimise"  # Progress journal: <root folder>/.texture_optimise_journal.jsonl
+
+
+# --- Helper Functions ---
 
 def is_already_quantized(image_path):
     """Checks if the PNG file is already quantized"""
@@ -12,163 +51,446 @@ def is_already_quantized(image_path):
         img = Image.open(image_path)
         return img.mode == "P"  # "P" mode indicates quantized image
     except Exception as e:
-        print(f"Error opening image {image_path} for check: {e}")  # log errors
+        logger.warning(f"Error opening image {image_path} for check: {e}")
         return False  # Assume not quantized on error
 
 
-def compress_textures(root_folder, quality_setting):
-    """Compresses textures recursively, skipping already quantized images."""
-
-    if not os.path.exists(root_folder):
-        messagebox.showerror("Error", "Folder not found!")
-        return
-
-    quality_values = {
-        "Very Low": "30-50",
-        "Low": "50-70",
-        "Medium": "60-80",
-        "High": "70-90",
-    }
-
-    quality = quality_values.get(quality_setting, "65-85")  # Default
-
-    all_png_files = []
-    for dirpath, dirnames, filenames in os.walk(root_folder):
-        png_files = [os.path.join(dirpath, f) for f in filenames if f.lower().endswith(".png")]
-        all_png_files.extend(png_files)  # Accumulate all PNG files
-
-    total_files = len(all_png_files)
-    if total_files == 0:
-        messagebox.showinfo("Info", "No PNG files found in the selected folder or its subfolders.")
-        return
-
-    progress_bar["maximum"] = total_files  # Set the maximum value for the progress bar
-    progress_bar["value"] = 0  # Reset the progress bar
-    root.update_idletasks()
-
-    for i, input_path in enumerate(all_png_files):
-        if is_already_quantized(input_path):
-            print(f"Skipping already quantized: {input_path}")
-            progress_bar["value"] = i + 1
-            root.update()
-            continue  # Skip to the next file
-
-        try:
-            command = [
-                "pngquant",
-                "--quality", quality,
-                "--force",  # Overwrite existing files
-                "--ext", ".png",  # Keep the same extension
-                "--skip-if-larger",  # Skip files larger than original
-                input_path
-            ]
-            result = subprocess.run(command, check=True, capture_output=True, text=True)
-            print(f"Compressed: {input_path}")
-            print(result.stderr)
-
-        except subprocess.CalledProcessError as e:
-            messagebox.showerror("Error",
-                                 f"Failed to compress {os.path.basename(input_path)} in {os.path.dirname(input_path)}:\n{e.stderr}")
-            print(f"Error compressing {input_path}: {e.stderr}")
-        except FileNotFoundError:
-            messagebox.showerror("Error", "pngquant is not installed or not in your system's PATH.")
-            return  # Stop
-
-        progress_bar["value"] = i + 1  # Increment progress bar
-        root.update()  # Force GUI update
-
-    messagebox.showinfo("Success", "Texture compression complete!")
-
-
-def browse_folder():
-    """Opens a folder selection dialog."""
-    folder_selected = filedialog.askdirectory()
-    folder_path_entry.delete(0, tk.END)
-    folder_path_entry.insert(0, folder_selected)
-
-
-def start_compression():
-    """Starts the compression process."""
-    folder_path = folder_path_entry.get()
-    quality_setting = quality_combobox.get()
-
-    if not folder_path:
-        messagebox.showerror("Error", "Please select a folder.")
-        return
-
-    compress_textures(folder_path, quality_setting)
-
-
-# --- GUI Setup ---
-root = tk.Tk()
-root.title("Texture Batch Optimising Tool")
-root.geometry("600x350")
-
-# --- Styling ---
-style = ttk.Style(root)
-style.theme_use('clam')
+def file_state(path):
+    """Returns [size, mtime_ns] of a file (None if it is gone), to notice files changed since they were journaled."""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return [stat.st_size, stat.st_mtime_ns]
 
-# Font
-font_name = "Bahnschrift"
 
-# Color scheme
-bg_color = '#2e2e2e'
-fg_color = 'white'
-text_color = '#d3d3d3'
-button_bg_color = '#4a4a4a'
-entry_bg_color = "#4a4a4a"
-button_active_bg_color = '#606060'
+def pngquant_available():
+    return shutil.which("pngquant") is not None
 
-# Configure styles
-style.configure('.', background=bg_color, foreground=fg_color, font=(font_name, 10))
-style.configure('TLabel', background=bg_color, foreground=fg_color, padding=5, font=(font_name, 12))
-style.configure('TButton', background=button_bg_color, foreground=fg_color, padding=8, relief='flat',
-                font=(font_name, 11),
-                borderwidth=0, focuscolor='gray',
-                activebackground=button_active_bg_color, activeforeground=fg_color)
-style.map('TButton',
-          background=[('active', button_active_bg_color), ('disabled', button_bg_color)],
-          foreground=[('disabled', 'gray')])
-style.configure('TCombobox', selectbackground=button_bg_color, fieldbackground=button_bg_color,
-                background=button_bg_color, foreground=text_color,
-                arrowcolor=fg_color, borderwidth=0, lightcolor=button_bg_color, darkcolor=button_bg_color,
-                font=(font_name, 11))  # style of ComboBox
 
-style.map('TCombobox', fieldbackground=[('readonly', entry_bg_color)])
+def choose_backend(input_path, backend):
+    """Resolves "auto" for one file: Pillow for small files or when pngquant is missing, pngquant otherwise."""
+    if backend != "auto":
+        return backend
+    if not pngquant_available():
+        return "pillow"
+    try:
+        small = os.path.getsize(input_path) < SMALL_PNG_BYTES
+    except OSError:
+        small = False
+    return "pillow" if small else "pngquant"
 
-style.configure('TEntry', fieldbackground="#4a4a4a", foreground=text_color, font=(font_name, 11))
 
-style.configure('Horizontal.TProgressbar', troughcolor=button_bg_color, background=fg_color)
+def quantize_method(img):
+    """Returns the best Pillow quantizer for an image: libimagequant (pngquant's library) if Pillow has it."""
+    if features.check("libimagequant"):
+        return Image.Quantize.LIBIMAGEQUANT
+    if img.mode == "RGBA":
+        return Image.Quantize.FASTOCTREE  # Median cut does not support alpha
+    return Image.Quantize.MEDIANCUT
 
-# --- Main Frame ---
-main_frame = ttk.Frame(root, padding=20)
-main_frame.pack(expand=True, fill='both')
 
-# --- Folder Selection ---
-folder_label = ttk.Label(main_frame, text="Folder:")
-folder_label.pack(pady=(0, 5), fill='x')
+def quantize_with_pillow(input_path, quality, thumbnails=False):
+    """Quantizes one PNG in-process with Pillow, replacing it only if the result is smaller (like --skip-if-larger).
 
-folder_path_entry = ttk.Entry(main_frame, width=50)
-folder_path_entry.pack(pady=(0, 5), fill='x')
+    With thumbnails, the quantized image also feeds the thumbnail cache (see thumbnail_cache).
 
-browse_button = ttk.Button(main_frame, text="Browse", command=browse_folder)
-browse_button.pack(pady=(0, 10), fill='x')
+    Returns:
+        ("compressed" | "skipped" | "failed", detail)
+    """
+    colors = PILLOW_COLORS.get(quality, PILLOW_COLORS[DEFAULT_QUALITY])
+    temp_path = f"{input_path}.{os.getpid()}.quantize.tmp"
+    filename = os.path.basename(input_path)
+    try:
+        with Image.open(input_path) as img:
+            with instrumentation.span("decode", file=filename):
+                img.load()
+            with instrumentation.span("quantize", file=filename):
+                if img.mode not in ("RGB", "RGBA"):
+                    img = img.convert("RGBA" if "A" in img.mode or "transparency" in img.info else "RGB")
+                quantized = img.quantize(colors=colors, method=quantize_method(img),
+                                         dither=Image.Dither.FLOYDSTEINBERG)
+        with instrumentation.span("encode", file=filename):
+            quantized.save(temp_path, "PNG", optimize=True)
+        instrumentation.count("bytes_written", os.path.getsize(temp_path))
+        if os.path.getsize(temp_path) >= os.path.getsize(input_path):
+            os.remove(temp_path)
+            logger.debug(f"Skipping, quantized file is not smaller: {input_path}")
+            return "skipped", None
+        os.replace(temp_path, input_path)
+        if thumbnails:
+            with instrumentation.span("thumbnails", file=filename):
+                add_to_cache(input_path, quantized)
+    except Exception as e:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        logger.debug(f"Error compressing {input_path}: {e}")
+        return "failed", str(e)
+    logger.info(f"Compressed (Pillow, {colors} colors): {input_path}")
+    return "compressed", None
+
+
+def compress_texture(input_path, quality, backend="pngquant", thumbnails=False):
+    """Quantizes one PNG with pngquant or Pillow (see choose_backend), unless it is already quantized.
+
+    Returns:
+        ("skipped" | "compressed" | "failed", detail)
+    """
+    filename = os.path.basename(input_path)
+    with instrumentation.span("check_quantized", file=filename):
+        quantized = is_already_quantized(input_path)
+    if quantized:
+        logger.debug(f"Skipping already quantized: {input_path}")
+        return "skipped", None
 
-# --- Quality Selection ---
-quality_label = ttk.Label(main_frame, text="Quality Preset:")
-quality_label.pack(pady=(10, 5), fill='x')
+    try:
+        instrumentation.count("bytes_read", os.path.getsize(input_path))
+    except OSError:
+        pass
+    if choose_backend(input_path, backend) == "pillow":
+        return quantize_with_pillow(input_path, quality, thumbnails)
+
+    command = [
+        "pngquant",
+        "--quality", quality,
+        "--force",  # Overwrite existing files
+        "--ext", ".png",  # Keep the same extension
+        "--skip-if-larger",  # Skip files larger than original
+        input_path
+    ]
+    try:
+        with instrumentation.span("pngquant", file=filename):
+            result = subprocess.run(command, check=True, capture_output=True, text=True)
+    except subprocess.CalledProcessError as e:
+        logger.debug(f"Error compressing {input_path}: {e.stderr}")
+        return "failed", e.stderr
+    except FileNotFoundError:
+        raise FileNotFoundError("pngquant is not installed or not in your system's PATH.") from None
+    logger.info(f"Compressed: {input_path}")
+    logger.debug(result.stderr)
+    return "compressed", None
+
+
+def compress_textures(root_folder, quality_setting, job=None, backend=DEFAULT_BACKEND, thumbnails=True, dedup=None,
+                      report=None):
+    """Compresses textures recursively, skipping already quantized images.
+
+    backend is "pngquant" (one subprocess per file), "pillow" (in-process quantize, works
+    without pngquant) or "auto" (Pillow for small files and when pngquant is missing). Files
+    are compressed in parallel on the job's thread pool, or its process pool for "pillow",
+    which is CPU bound. Failures are collected instead of stopping the batch. With thumbnails,
+    files quantized by Pillow also refresh their previews in the thumbnail cache (pngquant
+    output is not decoded; thumbnail_cache builds those on demand or as a batch job).
+
+    With dedup ("reflink" or "hardlink", see file_ops.copy_file), byte-identical PNGs are found
+    first (see texture_dedup) and each is compressed once; its copies are then replaced by the
+    result in that mode ("hardlink" also keeps the copies from taking space twice).
+
+    Progress is kept in a journal in the root folder (see progress_journal). A re-run with the
+    same quality after a crash or cancel skips the files finished since (unless they changed
+    on disk), checks that the files in flight still decode before compressing them again, and
+    reports totals for the whole batch.
+
+    The quantized check, then pngquant or Pillow's decode, quantize and encode, are timed for
+    every file; the run prints their percentiles when it ends (see instrumentation).
+
+    Outcomes and failures also go to report (a run_logging.RunReport, created if not given),
+    which is written to the reports folder when the run ends.
+
+    Returns:
+        {"total": n, "compressed": n, "skipped": n, "failed": [(path, pngquant error), ...],
+         "report": path of the text report}
+    """
+    report = report or RunReport("compress_textures", root_folder)
+    with instrumentation.run("compress_textures") as metrics, reporting(report, metrics):
+        summary = _compress_textures(root_folder, quality_setting, job, backend, thumbnails, dedup, report)
+    summary["report"] = report.paths and report.paths[1]
+    return summary
+
+
+def _compress_textures(root_folder, quality_setting, job, backend, thumbnails, dedup, report):
+    if not os.path.exists(root_folder):
+        raise FileNotFoundError(f"Folder not found: {root_folder}")
 
-quality_values_list = ["Very Low", "Low", "Medium", "High"]
-quality_combobox = ttk.Combobox(main_frame, values=quality_values_list, state="readonly")
-quality_combobox.set("Medium")
-quality_combobox.pack(pady=(0, 10), fill='x')
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown backend '{backend}', expected one of {BACKENDS}")
+    if backend == "pngquant" and not pngquant_available():
+        raise FileNotFoundError("pngquant is not installed or not in your system's PATH.")
 
-# --- Progress Bar ---
-progress_bar = ttk.Progressbar(main_frame, orient="horizontal", length=400, mode="determinate")
-progress_bar.pack(pady=(10, 15), fill='x')  # Increased padding for visibility
+    job = job or Job("compress_textures")
+    quality = QUALITY_VALUES.get(quality_setting, DEFAULT_QUALITY)
 
-# --- Compression Button ---
-compress_button = ttk.Button(main_frame, text="Compress Textures", command=start_compression)
-compress_button.pack(pady=(15, 0), fill='x')
+    all_png_files = []
+    with instrumentation.span("scan"):
+        for dirpath, dirnames, filenames in os.walk(root_folder):
+            png_files = [os.path.join(dirpath, f) for f in filenames if f.lower().endswith(".png")]
+            all_png_files.extend(png_files)  # Accumulate all PNG files
+
+    summary = {"total": len(all_png_files), "compressed": 0, "skipped": 0, "failed": []}
+    journal = ProgressJournal(journal_path(root_folder, JOURNAL_OPERATION),
+                              options={"quality": quality, "backend": backend})
+
+    def relative(path):
+        return os.path.relpath(path, root_folder)
+
+    def record(input_path, outcome, detail):
+        report.count(outcome)
+        if outcome == "failed":
+            summary["failed"].append((input_path, detail))
+            report.error(relative(input_path), detail)
+        else:
+            summary[outcome] += 1
+
+    to_compress = []
+    for input_path in all_png_files:
+        key = relative(input_path)
+        finished = journal.completed.get(key)
+        if finished and finished["outcome"] != "failed" and file_state(input_path) == finished["state"]:
+            record(input_path, finished["outcome"], None)  # Finished by the interrupted run
+        elif key in journal.interrupted and not is_complete_image(input_path):
+            record(input_path, "failed", "Truncated while the previous run was compressing it")
+            journal.done(key, outcome="failed", state=file_state(input_path))
+        else:
+            to_compress.append(input_path)
+
+    processed = len(all_png_files) - len(to_compress)
+    job.start(len(all_png_files), processed)
+    job.progress(processed)
+
+    duplicates = {}
+    if dedup:
+        with instrumentation.span("find_duplicates", files=len(to_compress)):
+            to_compress, duplicates = duplicate_map(to_compress, job)
+        logger.info(f"{sum(len(copies) for copies in duplicates.values())} PNGs are identical to another one "
+                    f"and will reuse its result")
+
+    def share_result(input_path, outcome, detail):
+        """Hands the result of a compressed file on to its identical copies."""
+        for duplicate in duplicates.get(input_path, ()):
+            duplicate_outcome, duplicate_detail = outcome, detail
+            if outcome == "compressed":
+                try:
+                    copy_file(input_path, duplicate, dedup)
+                except OSError as e:
+                    duplicate_outcome = "failed"
+                    duplicate_detail = f"Could not reuse the result of '{input_path}': {e}"
+            journal.done(relative(duplicate), outcome=duplicate_outcome, state=file_state(duplicate))
+            record(duplicate, duplicate_outcome, duplicate_detail)
 
-root.mainloop()
+    try:
+        kind = "process" if backend == "pillow" else "thread"
+        compress = instrumentation.instrumented(partial(compress_texture, quality=quality, backend=backend,
+                                                        thumbnails=thumbnails))
+        for input_path, result in job.map(compress, journal.track(to_compress, key=relative), kind=kind):
+            outcome, detail = instrumentation.collect(result)
+            instrumentation.count("files")
+            journal.done(relative(input_path), outcome=outcome, state=file_state(input_path))
+            record(input_path, outcome, detail)
+            share_result(input_path, outcome, detail)
+            processed += 1 + len(duplicates.get(input_path, ()))
+            job.progress(processed, instrumentation.counter("bytes_read"))
+    except BaseException:
+        journal.close()
+        raise
+    journal.complete()
+
+    return summary
+
+
+def main():
+    setup_logging()
+
+    # --- GUI Setup ---
+    root = tk.Tk()
+    root.title("Texture Batch Optimising Tool")
+    root.geometry("600x460")
+
+    # --- Styling ---
+    style = ttk.Style(root)
+    style.theme_use('clam')
+
+    # Font
+    font_name = "Bahnschrift"
+
+    # Color scheme
+    bg_color = '#2e2e2e'
+    fg_color = 'white'
+    text_color = '#d3d3d3'
+    button_bg_color = '#4a4a4a'
+    entry_bg_color = "#4a4a4a"
+    button_active_bg_color = '#606060'
+
+    # Configure styles
+    style.configure('.', background=bg_color, foreground=fg_color, font=(font_name, 10))
+    style.configure('TLabel', background=bg_color, foreground=fg_color, padding=5, font=(font_name, 12))
+    style.configure('TButton', background=button_bg_color, foreground=fg_color, padding=8, relief='flat',
+                    font=(font_name, 11),
+                    borderwidth=0, focuscolor='gray',
+                    activebackground=button_active_bg_color, activeforeground=fg_color)
+    style.map('TButton',
+              background=[('active', button_active_bg_color), ('disabled', button_bg_color)],
+              foreground=[('disabled', 'gray')])
+    style.configure('TCombobox', selectbackground=button_bg_color, fieldbackground=button_bg_color,
+                    background=button_bg_color, foreground=text_color,
+                    arrowcolor=fg_color, borderwidth=0, lightcolor=button_bg_color, darkcolor=button_bg_color,
+                    font=(font_name, 11))  # style of ComboBox
+
+    style.map('TCombobox', fieldbackground=[('readonly', entry_bg_color)])
+
+    style.configure('TEntry', fieldbackground="#4a4a4a", foreground=text_color, font=(font_name, 11))
+
+    style.configure('Horizontal.TProgressbar', troughcolor=button_bg_color, background=fg_color)
+
+    # --- Main Frame ---
+    main_frame = ttk.Frame(root, padding=20)
+    main_frame.pack(expand=True, fill='both')
+
+    # --- Folder Selection ---
+    folder_label = ttk.Label(main_frame, text="Folder:")
+    folder_label.pack(pady=(0, 5), fill='x')
+
+    folder_path_entry = ttk.Entry(main_frame, width=50)
+    folder_path_entry.pack(pady=(0, 5), fill='x')
+
+    def browse_folder():
+        """Opens a folder selection dialog."""
+        folder_selected = filedialog.askdirectory()
+        folder_path_entry.delete(0, tk.END)
+        folder_path_entry.insert(0, folder_selected)
+
+    browse_button = ttk.Button(main_frame, text="Browse", command=browse_folder)
+    browse_button.pack(pady=(0, 10), fill='x')
+
+    # --- Quality Selection ---
+    quality_label = ttk.Label(main_frame, text="Quality Preset:")
+    quality_label.pack(pady=(10, 5), fill='x')
+
+    quality_values_list = list(QUALITY_VALUES)
+    quality_combobox = ttk.Combobox(main_frame, values=quality_values_list, state="readonly")
+    quality_combobox.set("Medium")
+    quality_combobox.pack(pady=(0, 10), fill='x')
+
+    backend_label = ttk.Label(main_frame, text="Quantizer:")
+    backend_label.pack(pady=(0, 5), fill='x')
+
+    backend_combobox = ttk.Combobox(main_frame, values=list(BACKENDS), state="readonly")
+    backend_combobox.set(DEFAULT_BACKEND if pngquant_available() else "pillow")
+    backend_combobox.pack(pady=(0, 10), fill='x')
+
+    dedup_var = tk.BooleanVar(value=False)
+    dedup_check = ttk.Checkbutton(main_frame, text="Compress identical textures once (copies are hardlinked)",
+                                  variable=dedup_var)
+    dedup_check.pack(pady=(0, 5), fill='x')
+
+    # --- Progress Bar ---
+    progress_bar = ttk.Progressbar(main_frame, orient="horizontal", length=400, mode="determinate")
+    progress_bar.pack(pady=(10, 0), fill='x')
+    progress_label = ttk.Label(main_frame, text="")  # Files/sec, MB/sec and ETA
+    progress_label.pack(pady=(0, 5), fill='x')
+
+    # --- Background Job ---
+    background_var = tk.BooleanVar(value=False)
+    if daemon_available():
+        background_check = ttk.Checkbutton(main_frame, text="Run in background (keeps running if this window closes)",
+                                           variable=background_var)
+        background_check.pack(pady=(0, 5), fill='x')
+
+    # --- Compression Button ---
+    runtime = JobRuntime()
+    current_job = None
+
+    def start_compression():
+        """Starts the compression process."""
+        nonlocal current_job
+        folder_path = folder_path_entry.get()
+        quality_setting = quality_combobox.get()
+        backend = backend_combobox.get()
+        dedup = "hardlink" if dedup_var.get() else None
+
+        if not folder_path:
+            messagebox.showerror("Error", "Please select a folder.")
+            return
+
+        compress_button["state"] = "disabled"
+        browse_button["state"] = "disabled"
+        quality_combobox["state"] = "disabled"
+        backend_combobox["state"] = "disabled"
+        cancel_button["state"] = "normal"
+
+        # Job events are delivered on the Tk thread by the runtime, so these may touch widgets
+        def start_progress(max_value):
+            progress_bar["maximum"] = max_value  # Set the maximum value for the progress bar
+            progress_bar["value"] = 0  # Reset the progress bar
+
+        def update_progress(value):
+            progress_bar["value"] = value
+            progress_label["text"] = current_job.meter.format()
+
+        def end_progress(job):
+            show_result(job.state, job.result, job.error, f"{job.run_time:.1f}s")
+
+        def end_daemon_job(job):
+            show_result(job["state"], job["result"], job["error"], "in the background")
+
+        def show_result(state, result, error, timing):
+            progress_bar["value"] = 0
+            progress_label["text"] = ""
+            compress_button["state"] = "normal"
+            browse_button["state"] = "normal"
+            quality_combobox["state"] = "readonly"
+            backend_combobox["state"] = "readonly"
+            cancel_button["state"] = "disabled"
+
+            if state == CANCELLED:
+                messagebox.showinfo("Info", "Texture compression cancelled.")
+            elif state != DONE:
+                messagebox.showerror("Error", str(error))
+            elif result["total"] == 0:
+                messagebox.showinfo("Info", "No PNG files found in the selected folder or its subfolders.")
+            elif result["failed"]:
+                failures = "\n".join(f"{os.path.basename(path)} in {os.path.dirname(path)}:\n{error}"
+                                      for path, error in result["failed"][:MAX_LISTED_FAILURES])
+                if len(result["failed"]) > MAX_LISTED_FAILURES:
+                    failures += f"\n... and {len(result['failed']) - MAX_LISTED_FAILURES} more"
+                if result.get("report"):
+                    failures += f"\n\nFull report: {result['report']}"
+                messagebox.showerror("Error", f"Failed to compress {len(result['failed'])} file(s):\n{failures}")
+            else:
+                messagebox.showinfo("Success", f"Texture compression complete! ({result['compressed']} compressed, "
+                                               f"{result['skipped']} already quantized, {timing})")
+
+        if background_var.get():
+            # The job daemon runs the job; closing this window only stops following it
+            def daemon_progress(value, maximum):
+                progress_bar["maximum"] = maximum or 1
+                progress_bar["value"] = value
+
+            current_job = DaemonJobPoller(root, "compress_textures",
+                                          {"root_folder": os.path.abspath(folder_path),
+                                           "quality_setting": quality_setting, "backend": backend, "dedup": dedup},
+                                          daemon_progress, end_daemon_job)
+            return
+
+        current_job = runtime.submit(compress_textures, folder_path, quality_setting, backend=backend, dedup=dedup,
+                                     name="Compress Textures",
+                                     on_start=start_progress, on_progress=update_progress, on_done=end_progress)
+
+    def cancel_compression():
+        if current_job is not None:
+            current_job.cancel()
+
+    compress_button = ttk.Button(main_frame, text="Compress Textures", command=start_compression)
+    compress_button.pack(pady=(15, 0), fill='x')
+
+    cancel_button = ttk.Button(main_frame, text="Cancel", command=cancel_compression, state="disabled")
+    cancel_button.pack(pady=(5, 0), fill='x')
+
+    runtime.attach(root)
+    root.mainloop()
+    runtime.shutdown()
+
+
+if __name__ == "__main__":
+    main()
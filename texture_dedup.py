@@ -0,0 +1,291 @@
+import argparse
+import hashlib
+import json
+import logging
+import os
+import sys
+from collections import defaultdict
+
+from file_ops import copy_file, hash_file
+from profiling import add_profiling_arguments, profiled
+from run_logging import add_logging_arguments, setup_logging
+
+logger = logging.getLogger(__name__)
+
+# --- Constants ---
+TEXTURE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".tga", ".exr", ".hdr", ".bmp", ".gif", ".tiff", ".tif", ".webp")
+PARTIAL_HASH_BYTES = 64 * 1024  # Read from the start and the end of each candidate before hashing it fully
+PERCEPTUAL_HASH_SIZE = 8  # dHash of an 8x8 gradient grid: 64 bits
+PERCEPTUAL_THRESHOLD = 3  # Max differing bits for near-duplicates; must stay below PERCEPTUAL_BANDS
+PERCEPTUAL_BANDS = 4  # 64-bit hashes are bucketed by 16-bit bands (see find_near_duplicates)
+MAX_LISTED_GROUPS = 20
+
+
+# --- Helper Functions ---
+def collect_textures(root, recursive=True):
+    """Lists texture files below root (hidden folders, like the converter's trash, are skipped)."""
+    if not recursive:
+        return sorted(os.path.join(root, name) for name in os.listdir(root)
+                      if name.lower().endswith(TEXTURE_EXTENSIONS) and os.path.isfile(os.path.join(root, name)))
+    paths = []
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = [name for name in dirnames if not name.startswith(".")]
+        paths.extend(os.path.join(dirpath, name) for name in filenames if name.lower().endswith(TEXTURE_EXTENSIONS))
+    return sorted(paths)
+
+
+def partial_hash(path, size):
+    """Hashes the first and last PARTIAL_HASH_BYTES of a file (the whole file if it is smaller)."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        digest.update(f.read(PARTIAL_HASH_BYTES))
+        if size > 2 * PARTIAL_HASH_BYTES:
+            f.seek(-PARTIAL_HASH_BYTES, os.SEEK_END)
+            digest.update(f.read(PARTIAL_HASH_BYTES))
+        elif size > PARTIAL_HASH_BYTES:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+def _split_group(group, key_function, job=None):
+    """Splits a group by a key, returning {key: entries} for the keys shared by more than one entry."""
+    buckets = defaultdict(list)
+    for entry in group:
+        if job is not None:
+            job.check()
+        try:
+            buckets[key_function(entry)].append(entry)
+        except OSError as e:
+            logger.warning(f"Error reading '{entry[0]}': {e}")
+    return {key: bucket for key, bucket in buckets.items() if len(bucket) > 1}
+
+
+def find_duplicates(paths, job=None):
+    """Groups byte-identical files, reading as little as possible.
+
+    Files are grouped by size first (a stat), then by a hash of their first and last 64 KiB,
+    and only the files still sharing a group are hashed in full. Paths that are already
+    hardlinked to each other are hashed once and do not count as wasted space.
+
+    Returns:
+        A list of groups, largest waste first: {"digest" (SHA-256), "size", "paths" (sorted),
+        "wasted" (bytes that linking would free)}.
+    """
+    by_inode = defaultdict(list)
+    sizes = {}
+    for path in paths:
+        try:
+            stat = os.stat(path)
+        except OSError as e:
+            logger.warning(f"Error reading '{path}': {e}")
+            continue
+        by_inode[(stat.st_dev, stat.st_ino)].append(path)
+        sizes[(stat.st_dev, stat.st_ino)] = stat.st_size
+
+    # One entry per inode: (representative path, size, all paths)
+    by_size = defaultdict(list)
+    for inode, inode_paths in by_inode.items():
+        by_size[sizes[inode]].append((inode_paths[0], sizes[inode], sorted(inode_paths)))
+    candidates = [group for size, group in by_size.items() if len(group) > 1 and size > 0]
+
+    groups = []
+    for candidate in candidates:
+        size = candidate[0][1]
+        for digest, group in _split_group(candidate, lambda entry: partial_hash(entry[0], entry[1]), job).items():
+            if size > 2 * PARTIAL_HASH_BYTES:
+                split = _split_group(group, lambda entry: hash_file(entry[0]), job).items()
+            else:
+                split = [(digest, group)]  # The partial hash already read the whole file, so it is the full hash
+            for digest, identical in split:
+                groups.append({
+                    "digest": digest,
+                    "size": size,
+                    "paths": sorted(path for entry in identical for path in entry[2]),
+                    "wasted": size * (len(identical) - 1),
+                })
+    groups.sort(key=lambda group: group["wasted"], reverse=True)
+    return groups
+
+
+def duplicate_map(paths, job=None):
+    """Picks one file per group of identical files, for batch tools that should process each once.
+
+    Returns:
+        (unique, duplicates): the paths to process, in input order, and a dict mapping each
+        processed path to the identical paths that can reuse its result.
+    """
+    duplicates = {}
+    skipped = set()
+    for group in find_duplicates(paths, job):
+        canonical, *others = group["paths"]
+        duplicates[canonical] = others
+        skipped.update(others)
+    unique = [path for path in paths if path not in skipped]
+    return unique, duplicates
+
+
+def perceptual_hash(path):
+    """Returns the 64-bit difference hash (dHash) of an image, or None if it cannot be read.
+
+    The image is shrunk to 9x8 greyscale and each bit records whether a pixel is brighter
+    than its right neighbour, so re-encodes, small colour shifts and resizes hash the same.
+    """
+    from PIL import Image
+
+    try:
+        with Image.open(path) as img:
+            img.draft("L", (PERCEPTUAL_HASH_SIZE * 4, PERCEPTUAL_HASH_SIZE * 4))
+            small = img.convert("L").resize((PERCEPTUAL_HASH_SIZE + 1, PERCEPTUAL_HASH_SIZE),
+                                            Image.Resampling.BOX)
+    except Exception as e:
+        logger.warning(f"Error hashing image '{path}': {e}")
+        return None
+    pixels = small.tobytes()  # One byte per "L" pixel
+    value = 0
+    width = PERCEPTUAL_HASH_SIZE + 1
+    for row in range(PERCEPTUAL_HASH_SIZE):
+        for column in range(PERCEPTUAL_HASH_SIZE):
+            left = pixels[row * width + column]
+            value = (value << 1) | (left > pixels[row * width + column + 1])
+    return value
+
+
+def find_near_duplicates(paths, threshold=PERCEPTUAL_THRESHOLD, job=None):
+    """Groups images whose perceptual hashes differ in at most `threshold` bits.
+
+    Comparing every pair is quadratic, so hashes are bucketed by each of their 16-bit bands:
+    two hashes within `threshold` < PERCEPTUAL_BANDS bits of each other share at least one
+    band exactly, so only hashes sharing a bucket are compared.
+
+    Returns:
+        A list of path groups (sorted), each with more than one image.
+    """
+    if threshold >= PERCEPTUAL_BANDS:
+        raise ValueError(f"threshold must be below {PERCEPTUAL_BANDS}")
+    hashes = {}
+    for path in paths:
+        if job is not None:
+            job.check()
+        value = perceptual_hash(path)
+        if value is not None:
+            hashes[path] = value
+
+    band_bits = PERCEPTUAL_HASH_SIZE * PERCEPTUAL_HASH_SIZE // PERCEPTUAL_BANDS
+    mask = (1 << band_bits) - 1
+    buckets = defaultdict(list)
+    for path, value in hashes.items():
+        for band in range(PERCEPTUAL_BANDS):
+            buckets[(band, (value >> (band * band_bits)) & mask)].append(path)
+
+    # Union-find over every close pair
+    parent = {path: path for path in hashes}
+
+    def find(path):
+        while parent[path] != path:
+            parent[path] = parent[parent[path]]
+            path = parent[path]
+        return path
+
+    for bucket in buckets.values():
+        for i, first in enumerate(bucket):
+            for second in bucket[i + 1:]:
+                if bin(hashes[first] ^ hashes[second]).count("1") <= threshold:
+                    parent[find(first)] = find(second)
+
+    groups = defaultdict(list)
+    for path in hashes:
+        groups[find(path)].append(path)
+    return sorted((sorted(group) for group in groups.values() if len(group) > 1), key=lambda group: group[0])
+
+
+def link_duplicates(groups, dry_run=False):
+    """Replaces every duplicate with a hardlink to the first file of its group.
+
+    Each link is created under a temp name and renamed over the duplicate, so a failure never
+    leaves a path missing. Files on another device than their group's first file are reported
+    as failed.
+
+    Returns:
+        {"linked": n, "saved_bytes": n, "failed": [(path, error), ...]}
+    """
+    summary = {"linked": 0, "saved_bytes": 0, "failed": []}
+    for group in groups:
+        canonical, *others = group["paths"]
+        canonical_stat = os.stat(canonical)
+        for path in others:
+            stat = os.stat(path)
+            if (stat.st_dev, stat.st_ino) == (canonical_stat.st_dev, canonical_stat.st_ino):
+                continue  # Already linked
+            if dry_run:
+                logger.info(f"Would link '{path}' -> '{canonical}'")
+                summary["linked"] += 1
+                summary["saved_bytes"] += group["size"]
+                continue
+            try:
+                used_mode = copy_file(canonical, path, "hardlink")
+            except OSError as e:
+                logger.error(f"Error linking '{path}': {e}")
+                summary["failed"].append((path, str(e)))
+                continue
+            if used_mode != "hardlink":
+                # copy_file fell back to a copy (another device): the file is unchanged, nothing saved
+                summary["failed"].append((path, "cannot hardlink across devices"))
+                continue
+            summary["linked"] += 1
+            summary["saved_bytes"] += group["size"]
+    return summary
+
+
+def format_report(groups, near_groups=None, max_listed=MAX_LISTED_GROUPS):
+    """Renders duplicate groups as a human-readable report."""
+    wasted = sum(group["wasted"] for group in groups)
+    files = sum(len(group["paths"]) for group in groups)
+    lines = [f"{len(groups)} groups of identical files ({files} files), "
+             f"{wasted / (1024 * 1024):.1f} MB reclaimable by linking."]
+    for group in groups[:max_listed]:
+        lines.append(f"  {group['size'] / 1024:.0f} KiB x {len(group['paths'])}:")
+        lines.extend(f"    {path}" for path in group["paths"])
+    if len(groups) > max_listed:
+        lines.append(f"  ... and {len(groups) - max_listed} more groups")
+    if near_groups is not None:
+        lines.append(f"{len(near_groups)} groups of near-duplicate images:")
+        for group in near_groups[:max_listed]:
+            lines.append("  " + ", ".join(group))
+        if len(near_groups) > max_listed:
+            lines.append(f"  ... and {len(near_groups) - max_listed} more groups")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Find duplicate textures in a project.")
+    parser.add_argument("root")
+    parser.add_argument("--near", action="store_true", help="Also group visually similar images (perceptual hash).")
+    parser.add_argument("--threshold", type=int, default=PERCEPTUAL_THRESHOLD,
+                        help=f"Max differing hash bits for near-duplicates (below {PERCEPTUAL_BANDS}).")
+    parser.add_argument("--link", action="store_true", help="Replace identical files with hardlinks.")
+    parser.add_argument("--dry-run", action="store_true", help="With --link, only print what would be linked.")
+    parser.add_argument("--json", help="Also write the report as JSON to this file.")
+    add_logging_arguments(parser)
+    add_profiling_arguments(parser)
+    args = parser.parse_args(argv)
+    setup_logging(args.log_level)
+
+    with profiled("find_duplicates", args.profile):
+        paths = collect_textures(args.root)
+        groups = find_duplicates(paths)
+        near_groups = find_near_duplicates(paths, args.threshold) if args.near else None
+    print(format_report(groups, near_groups))
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"duplicates": groups, "near_duplicates": near_groups}, f, indent=4)
+    if args.link:
+        summary = link_duplicates(groups, args.dry_run)
+        print(f"Linked {summary['linked']} files, {summary['saved_bytes'] / (1024 * 1024):.1f} MB saved, "
+              f"{len(summary['failed'])} failed.")
+        return 1 if summary["failed"] else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,129 @@
+import sys
+import time
+
+# --- Constants ---
+SAMPLE_SECONDS = 0.5  # Rates are measured over windows of at least this long...
+SMOOTHING = 0.3  # ... and each window's rate gets this weight in the running average
+PROGRESS_LINE_SECONDS = 2.0  # Interval between the progress lines of a command line run
+
+
+# --- Helper Functions ---
+def format_eta(seconds):
+    """Formats a remaining time as 1h02m, 3m05s or 12s ("--" if unknown)."""
+    if seconds is None:
+        return "--"
+    seconds = int(round(seconds))
+    if seconds >= 3600:
+        return f"{seconds // 3600}h{seconds % 3600 // 60:02d}m"
+    if seconds >= 60:
+        return f"{seconds // 60}m{seconds % 60:02d}s"
+    return f"{seconds}s"
+
+
+class ThroughputMeter:
+    """Smoothed files/sec, MB/sec and ETA of a batch run.
+
+    Rates are measured over windows of SAMPLE_SECONDS and combined in an exponential moving
+    average, so a few slow files do not make the ETA jump around; until the first window is
+    complete the average since the start is used. Steps that were already done when the run
+    started (a resumed batch) do not count towards the rate.
+    """
+
+    def __init__(self, smoothing=SMOOTHING):
+        self.smoothing = smoothing
+        self.start()
+
+    def start(self, total=0, done=0):
+        self.total = total
+        self.done = done
+        self.bytes_done = 0
+        self.started = time.perf_counter()
+        self._initial = done
+        self._sample = (self.started, done, 0)  # Time, steps and bytes at the start of the current window
+        self._files_rate = None
+        self._bytes_rate = None
+
+    def _smooth(self, average, rate):
+        return rate if average is None else self.smoothing * rate + (1 - self.smoothing) * average
+
+    def update(self, done, bytes_done=None):
+        """Records the steps (and bytes) completed so far."""
+        now = time.perf_counter()
+        self.done = done
+        if bytes_done is not None:
+            self.bytes_done = bytes_done
+        sample_time, sample_done, sample_bytes = self._sample
+        elapsed = now - sample_time
+        if elapsed < SAMPLE_SECONDS:
+            return
+        self._files_rate = self._smooth(self._files_rate, (done - sample_done) / elapsed)
+        self._bytes_rate = self._smooth(self._bytes_rate, (self.bytes_done - sample_bytes) / elapsed)
+        self._sample = (now, done, self.bytes_done)
+
+    @property
+    def elapsed(self):
+        return time.perf_counter() - self.started
+
+    @property
+    def files_per_second(self):
+        if self._files_rate is not None:
+            return self._files_rate
+        return (self.done - self._initial) / max(self.elapsed, 1e-9)
+
+    @property
+    def bytes_per_second(self):
+        if self._bytes_rate is not None:
+            return self._bytes_rate
+        return self.bytes_done / max(self.elapsed, 1e-9)
+
+    @property
+    def eta(self):
+        """Seconds until the remaining steps are done at the current rate, or None if unknown."""
+        rate = self.files_per_second
+        if not self.total or rate <= 0:
+            return None
+        return max(self.total - self.done, 0) / rate
+
+    def snapshot(self):
+        return {
+            "done": self.done,
+            "total": self.total,
+            "bytes": self.bytes_done,
+            "elapsed": self.elapsed,
+            "files_per_second": self.files_per_second,
+            "bytes_per_second": self.bytes_per_second,
+            "eta": self.eta,
+        }
+
+    def format(self):
+        """Renders the progress as one line, e.g. "120/800 files, 4.2 files/s, 18.3 MB/s, ETA 2m42s"."""
+        parts = [f"{self.done}/{self.total} files" if self.total else f"{self.done} files",
+                 f"{self.files_per_second:.1f} files/s"]
+        if self.bytes_done:
+            parts.append(f"{self.bytes_per_second / (1024 * 1024):.1f} MB/s")
+        parts.append(f"ETA {format_eta(self.eta)}")
+        return ", ".join(parts)
+
+
+class TextProgress:
+    """Prints a ThroughputMeter as a progress line for command line runs.
+
+    A full line is printed every `interval` seconds and for the last step, rather than
+    rewriting one line in place, so it stays readable when interleaved with the log output
+    and when redirected to a file.
+    """
+
+    def __init__(self, meter, stream=None, interval=PROGRESS_LINE_SECONDS):
+        self.meter = meter
+        self.stream = stream or sys.stdout
+        self.interval = interval
+        self._printed = None
+
+    def show(self, value=None):
+        """Progress callback (e.g. a Job's on_progress): prints the line if it is due."""
+        now = time.perf_counter()
+        finished = self.meter.total and self.meter.done >= self.meter.total
+        if not finished and self._printed is not None and now - self._printed < self.interval:
+            return
+        self._printed = now
+        print(self.meter.format(), file=self.stream, flush=True)
@@ -0,0 +1,292 @@
+import argparse
+import logging
+import os
+import sqlite3
+import sys
+import time
+from functools import partial
+
+from PIL import Image
+
+from file_ops import hash_file
+from job_runtime import Job
+from profiling import add_profiling_arguments, profiled
+from run_logging import add_logging_arguments, setup_logging
+
+logger = logging.getLogger(__name__)
+
+# --- Constants ---
+CACHE_DIR_ENV = "ELI_LAB_THUMBNAIL_CACHE"  # Shared cache location (e.g. on the farm)
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".eli_lab", "thumbnails")
+INDEX_FILE = "index.sqlite3"
+MAX_CACHE_BYTES = 1024 * 1024 * 1024  # Least recently used entries are evicted above this
+EVICT_TO = 0.9  # Eviction frees space down to this fraction of the limit
+CACHE_SIZES = (128, 256, 512)  # Longest side of the cached levels; previews use the closest one
+PREVIEW_SIZE = 256
+THUMBNAIL_OPTIONS = {"compress_level": 1}  # Thumbnails are small; encode speed matters more than size
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".tga", ".bmp", ".gif", ".tiff", ".tif", ".webp")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    digest TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS thumbnails (
+    digest TEXT NOT NULL,
+    level INTEGER NOT NULL,
+    bytes INTEGER NOT NULL,
+    last_used REAL NOT NULL,
+    PRIMARY KEY (digest, level)
+);
+CREATE INDEX IF NOT EXISTS thumbnails_last_used ON thumbnails (last_used);
+"""
+
+
+# --- Helper Functions ---
+def default_cache_dir():
+    return os.environ.get(CACHE_DIR_ENV) or DEFAULT_CACHE_DIR
+
+
+def is_cacheable(path):
+    return path.lower().endswith(IMAGE_EXTENSIONS)
+
+
+def decode_for_size(path, size):
+    """Opens an image decoded no larger than needed for `size` (JPEG decodes at 1/2, 1/4 or 1/8 scale)."""
+    img = Image.open(path)
+    img.draft(None, (size, size))
+    img.load()
+    return img
+
+
+class ThumbnailCache:
+    """A content-addressed cache of downscaled previews, bounded in size with LRU eviction.
+
+    Thumbnails are stored as <cache>/<digest[:2]>/<digest>_<level>.png, where digest is the
+    SHA-256 of the source file, so copies of a texture share their thumbnails and a renamed
+    file keeps them. A sqlite index maps paths (checked by size and mtime) to digests, so a
+    lookup never reads the source, and records the bytes and last use of every thumbnail for
+    eviction. Each level is made from the next larger one, like a mip chain, so the source is
+    decoded once.
+
+    Several processes may share one cache (the index uses WAL and a busy timeout); within a
+    process, use one ThumbnailCache per thread.
+    """
+
+    def __init__(self, cache_dir=None, max_bytes=MAX_CACHE_BYTES):
+        self.cache_dir = cache_dir or default_cache_dir()
+        self.max_bytes = max_bytes
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self.connection = sqlite3.connect(os.path.join(self.cache_dir, INDEX_FILE), timeout=30)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.executescript(SCHEMA)
+
+    def close(self):
+        self.connection.close()
+
+    # --- Paths ---
+    def thumbnail_path(self, digest, level):
+        return os.path.join(self.cache_dir, digest[:2], f"{digest}_{level}.png")
+
+    def digest(self, path, content_path=None):
+        """Returns the content digest of a file, hashing it only if it changed since it was indexed.
+
+        content_path is the file to read and stat when path does not exist yet (a temp file
+        that is about to be renamed to path; a rename keeps the size and mtime).
+        """
+        path = os.path.abspath(path)
+        stat = os.stat(content_path or path)
+        row = self.connection.execute("SELECT size, mtime_ns, digest FROM files WHERE path = ?", (path,)).fetchone()
+        if row and row[0] == stat.st_size and row[1] == stat.st_mtime_ns:
+            return row[2]
+        digest = hash_file(content_path or path)
+        with self.connection:
+            self.connection.execute("INSERT OR REPLACE INTO files (path, size, mtime_ns, digest) VALUES (?, ?, ?, ?)",
+                                    (path, stat.st_size, stat.st_mtime_ns, digest))
+        return digest
+
+    # --- Lookup ---
+    def level_for(self, size):
+        """Returns the smallest cached level that is at least `size` (or the largest level)."""
+        for level in CACHE_SIZES:
+            if level >= size:
+                return level
+        return CACHE_SIZES[-1]
+
+    def lookup(self, path, size=PREVIEW_SIZE):
+        """Returns the cached thumbnail of path for a preview of `size`, or None if it is not cached."""
+        try:
+            digest = self.digest(path)
+        except OSError:
+            return None
+        level = self.level_for(size)
+        thumbnail = self.thumbnail_path(digest, level)
+        if not os.path.isfile(thumbnail):
+            return None
+        with self.connection:
+            self.connection.execute("UPDATE thumbnails SET last_used = ? WHERE digest = ? AND level = ?",
+                                    (time.time(), digest, level))
+        return thumbnail
+
+    def get(self, path, size=PREVIEW_SIZE):
+        """Returns the thumbnail of path for a preview of `size`, generating the levels if needed.
+
+        Returns:
+            The thumbnail path, or None if the file could not be read as an image.
+        """
+        cached = self.lookup(path, size)
+        if cached is not None:
+            return cached
+        try:
+            with decode_for_size(path, max(CACHE_SIZES)) as img:
+                self.add(path, img)
+        except Exception as e:
+            logger.warning(f"Error creating thumbnail for '{path}': {e}")
+            return None
+        return self.lookup(path, size)
+
+    # --- Storing ---
+    def add(self, path, img, content_path=None):
+        """Stores every level for an image that is already decoded (a side effect of converting it).
+
+        Args:
+            path: The file the image belongs to.
+            img: The decoded image (not modified).
+            content_path: The file to hash instead of path (see digest).
+        """
+        digest = self.digest(path, content_path)
+        if img.mode not in ("RGB", "RGBA", "L", "LA"):
+            img = img.convert("RGBA" if "A" in img.mode or "transparency" in img.info else "RGB")
+
+        rows = []
+        now = time.time()
+        for level in sorted(CACHE_SIZES, reverse=True):
+            img = img.copy() if level == max(CACHE_SIZES) else img
+            img.thumbnail((level, level), Image.Resampling.LANCZOS, reducing_gap=2.0)
+            thumbnail = self.thumbnail_path(digest, level)
+            os.makedirs(os.path.dirname(thumbnail), exist_ok=True)
+            temp_path = f"{thumbnail}.{os.getpid()}.tmp"
+            img.save(temp_path, "PNG", **THUMBNAIL_OPTIONS)
+            os.replace(temp_path, thumbnail)  # Readers never see a partial thumbnail
+            size = os.path.getsize(thumbnail)
+            rows.append((digest, level, size, now))
+
+        with self.connection:
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO thumbnails (digest, level, bytes, last_used) VALUES (?, ?, ?, ?)", rows)
+        # The total comes from the shared index, so the limit holds however many instances add to it
+        if self.total_bytes() > self.max_bytes:
+            self.evict()
+
+    # --- Eviction ---
+    def total_bytes(self):
+        return self.connection.execute("SELECT COALESCE(SUM(bytes), 0) FROM thumbnails").fetchone()[0]
+
+    def evict(self):
+        """Deletes least recently used thumbnails until the cache is below EVICT_TO of its limit.
+
+        Returns:
+            The number of thumbnails deleted.
+        """
+        total = self.total_bytes()
+        if total <= self.max_bytes:
+            return 0
+        target = self.max_bytes * EVICT_TO
+        evicted = []
+        for digest, level, size in self.connection.execute(
+                "SELECT digest, level, bytes FROM thumbnails ORDER BY last_used"):
+            if total <= target:
+                break
+            try:
+                os.remove(self.thumbnail_path(digest, level))
+            except OSError:
+                pass
+            evicted.append((digest, level))
+            total -= size
+        with self.connection:
+            self.connection.executemany("DELETE FROM thumbnails WHERE digest = ? AND level = ?", evicted)
+        logger.info(f"Evicted {len(evicted)} thumbnails from '{self.cache_dir}'")
+        return len(evicted)
+
+
+def add_to_cache(path, img, content_path=None, cache_dir=None):
+    """Side-effect hook for the batch tools: caches thumbnails of an image they already decoded.
+
+    Never raises, so a cache problem cannot fail a conversion.
+    """
+    try:
+        cache = ThumbnailCache(cache_dir)
+        try:
+            cache.add(path, img, content_path)
+        finally:
+            cache.close()
+    except Exception as e:
+        logger.warning(f"Error caching thumbnails for '{path}': {e}")
+
+
+def get_thumbnail(path, size=PREVIEW_SIZE, cache_dir=None):
+    """Returns the thumbnail path of one file (see ThumbnailCache.get), from any thread or process."""
+    cache = ThumbnailCache(cache_dir)
+    try:
+        return cache.get(path, size)
+    finally:
+        cache.close()
+
+
+def cache_library(root, cache_dir=None, job=None):
+    """Batch job: generates thumbnails for every image below root that is not cached yet.
+
+    Hidden folders (like the converter's trash of originals) are skipped.
+
+    Returns:
+        {"total": n, "cached": n, "failed": n}
+    """
+    paths = []
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = [name for name in dirnames if not name.startswith(".")]
+        paths.extend(os.path.join(dirpath, filename) for filename in filenames if is_cacheable(filename))
+    job = job or Job("cache_thumbnails")
+    job.start(len(paths))
+    summary = {"total": len(paths), "cached": 0, "failed": 0}
+    for processed, (path, cached) in enumerate(
+            job.map(partial(get_thumbnail, cache_dir=cache_dir), paths, kind="process"), start=1):
+        summary["cached" if cached is not None else "failed"] += 1
+        job.progress(processed)
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Texture thumbnail and mip cache.")
+    parser.add_argument("--cache-dir", help=f"Cache directory (default: ${CACHE_DIR_ENV} or {DEFAULT_CACHE_DIR}).")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    build_parser = subparsers.add_parser("build", help="Generate thumbnails for a texture library.")
+    build_parser.add_argument("root")
+    subparsers.add_parser("stats", help="Show the cache size.")
+    evict_parser = subparsers.add_parser("evict", help="Evict least recently used thumbnails.")
+    evict_parser.add_argument("--max-mb", type=int, default=MAX_CACHE_BYTES // (1024 * 1024))
+    add_logging_arguments(parser)
+    add_profiling_arguments(parser)
+    args = parser.parse_args(argv)
+    setup_logging(args.log_level)
+
+    if args.command == "build":
+        with profiled("cache_thumbnails", args.profile):
+            summary = cache_library(args.root, args.cache_dir)
+        print(f"Cached {summary['cached']} of {summary['total']} images ({summary['failed']} failed).")
+        return 0
+    cache = ThumbnailCache(args.cache_dir)
+    try:
+        if args.command == "evict":
+            cache.max_bytes = args.max_mb * 1024 * 1024
+            cache.evict()
+        print(f"{cache.cache_dir}: {cache.total_bytes() / (1024 * 1024):.1f} MB")
+    finally:
+        cache.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
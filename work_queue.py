@@ -0,0 +1,408 @@
+import argparse
+import json
+import logging
+import os
+import socket
+import sqlite3
+import sys
+import threading
+import time
+from functools import partial
+
+import instrumentation
+from job_runtime import Job
+from profiling import add_profiling_arguments, profiled
+from run_logging import add_logging_arguments, setup_logging
+
+logger = logging.getLogger(__name__)
+
+# --- Constants ---
+QUEUE_FILE = ".texture_work_queue.sqlite3"  # Default queue location: the library root (a shared mount)
+OPERATIONS = ("convert", "compress")
+CHUNK_SIZE = 50  # Files per chunk; small enough to rebalance, large enough to keep queue traffic low
+LEASE_SECONDS = 120  # A chunk whose worker stops heartbeating for this long is handed to another worker
+HEARTBEAT_INTERVAL = 15
+MAX_ATTEMPTS = 3  # Chunks failing this often are reported instead of retried
+IDLE_POLL_SECONDS = 5  # Worker wait while the remaining chunks are leased by other nodes
+SQLITE_TIMEOUT = 60
+
+PENDING = "pending"
+LEASED = "leased"
+DONE = "done"
+FAILED = "failed"
+
+
+# --- Helper Functions ---
+def connect(queue_path):
+    connection = sqlite3.connect(queue_path, timeout=SQLITE_TIMEOUT, isolation_level=None)
+    connection.execute("""
+        CREATE TABLE IF NOT EXISTS runs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            operation TEXT NOT NULL,
+            root TEXT NOT NULL,
+            options TEXT NOT NULL,
+            created_at REAL NOT NULL
+        )""")
+    connection.execute("""
+        CREATE TABLE IF NOT EXISTS chunks (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            run_id INTEGER NOT NULL REFERENCES runs(id),
+            files TEXT NOT NULL,
+            state TEXT NOT NULL,
+            attempts INTEGER NOT NULL DEFAULT 0,
+            worker TEXT,
+            lease_expires REAL,
+            heartbeat_at REAL,
+            started_at REAL,
+            finished_at REAL,
+            result TEXT,
+            error TEXT
+        )""")
+    connection.execute("CREATE INDEX IF NOT EXISTS chunks_by_state ON chunks (run_id, state)")
+    return connection
+
+
+def default_worker_id():
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def collect_files(operation, root, options=None):
+    """Lists the files an operation works on, relative to root ("/" separated).
+
+    Conversion covers the images in the root folder not yet in the target format (like the
+    Texture Batch Converter), compression every PNG below it (like the Texture Batch
+    Optimising Tool).
+    """
+    if operation == "convert":
+        from encoder_presets import DEFAULT_PRESET, get_preset
+        from texture_batch_converter import is_image_file
+
+        extension = get_preset((options or {}).get("preset", DEFAULT_PRESET))["extension"]
+        return sorted(name for name in os.listdir(root)
+                      if os.path.isfile(os.path.join(root, name)) and is_image_file(name)
+                      and not name.lower().endswith(extension))
+
+    files = []
+    for dirpath, dirnames, filenames in os.walk(root):
+        relative_dir = os.path.relpath(dirpath, root)
+        for filename in filenames:
+            if filename.lower().endswith(".png"):
+                files.append(filename if relative_dir == "." else f"{relative_dir}/{filename}".replace(os.sep, "/"))
+    return sorted(files)
+
+
+def create_run(queue_path, operation, root, options=None, chunk_size=CHUNK_SIZE):
+    """Coordinator: shards the files of an operation into chunks on the queue.
+
+    Returns:
+        (run_id, file_count, chunk_count)
+    """
+    if operation not in OPERATIONS:
+        raise ValueError(f"Unknown operation '{operation}', expected one of {OPERATIONS}")
+    files = collect_files(operation, root, options)
+    chunks = [files[i:i + chunk_size] for i in range(0, len(files), chunk_size)]
+
+    connection = connect(queue_path)
+    try:
+        connection.execute("BEGIN IMMEDIATE")
+        run_id = connection.execute(
+            "INSERT INTO runs (operation, root, options, created_at) VALUES (?, ?, ?, ?)",
+            (operation, os.path.abspath(root), json.dumps(options or {}), time.time())).lastrowid
+        connection.executemany("INSERT INTO chunks (run_id, files, state) VALUES (?, ?, ?)",
+                               [(run_id, json.dumps(chunk), PENDING) for chunk in chunks])
+        connection.execute("COMMIT")
+    finally:
+        connection.close()
+    return run_id, len(files), len(chunks)
+
+
+def claim_chunk(connection, run_id, worker_id, lease_seconds=LEASE_SECONDS):
+    """Leases the next pending chunk, or one whose lease expired. Returns (chunk_id, files) or None."""
+    now = time.time()
+    connection.execute("BEGIN IMMEDIATE")  # One claimer at a time, across all nodes
+    try:
+        row = connection.execute(
+            "SELECT id, files FROM chunks WHERE run_id = ? AND "
+            "(state = ? OR (state = ? AND lease_expires < ?)) AND attempts < ? ORDER BY id LIMIT 1",
+            (run_id, PENDING, LEASED, now, MAX_ATTEMPTS)).fetchone()
+        if row is not None:
+            connection.execute(
+                "UPDATE chunks SET state = ?, worker = ?, attempts = attempts + 1, lease_expires = ?, "
+                "heartbeat_at = ?, started_at = ?, error = NULL WHERE id = ?",
+                (LEASED, worker_id, now + lease_seconds, now, now, row[0]))
+        # Leases that expired on their last attempt will never be claimed again
+        connection.execute(
+            "UPDATE chunks SET state = ?, error = 'Lease expired on the last attempt' "
+            "WHERE run_id = ? AND state = ? AND lease_expires < ? AND attempts >= ?",
+            (FAILED, run_id, LEASED, now, MAX_ATTEMPTS))
+        connection.execute("COMMIT")
+    except BaseException:
+        connection.execute("ROLLBACK")
+        raise
+    return (row[0], json.loads(row[1])) if row else None
+
+
+def remaining_chunks(connection, run_id):
+    """Number of chunks that are still pending or leased."""
+    return connection.execute("SELECT COUNT(*) FROM chunks WHERE run_id = ? AND state IN (?, ?)",
+                              (run_id, PENDING, LEASED)).fetchone()[0]
+
+
+class Heartbeat(threading.Thread):
+    """Extends the lease of the chunk a worker is processing, until stopped."""
+
+    def __init__(self, queue_path, chunk_id, worker_id, interval=HEARTBEAT_INTERVAL, lease_seconds=LEASE_SECONDS):
+        super().__init__(daemon=True)
+        self.queue_path = queue_path
+        self.chunk_id = chunk_id
+        self.worker_id = worker_id
+        self.interval = interval
+        self.lease_seconds = lease_seconds
+        self._stopped = threading.Event()
+
+    def run(self):
+        connection = connect(self.queue_path)
+        try:
+            while not self._stopped.wait(self.interval):
+                now = time.time()
+                try:
+                    connection.execute("UPDATE chunks SET heartbeat_at = ?, lease_expires = ? "
+                                       "WHERE id = ? AND worker = ? AND state = ?",
+                                       (now, now + self.lease_seconds, self.chunk_id, self.worker_id, LEASED))
+                except sqlite3.Error as e:
+                    logger.warning(f"Heartbeat for chunk {self.chunk_id} failed: {e}")
+        finally:
+            connection.close()
+
+    def stop(self):
+        self._stopped.set()
+        self.join()
+
+
+def process_file(relative_path, operation, root, options):
+    """Processes one file of a chunk; module level so it can run on a process pool.
+
+    Returns:
+        (outcome, detail), with outcome "converted", "compressed", "skipped" or "failed".
+    """
+    path = os.path.join(root, relative_path)
+    if operation == "convert":
+        from encoder_presets import DEFAULT_PRESET
+        from texture_batch_converter import convert_texture_to_png
+
+        if convert_texture_to_png(path, os.path.dirname(path), preset=options.get("preset", DEFAULT_PRESET),
+                                  mip_levels=options.get("mip_levels", 0)):
+            return "converted", None
+        if os.path.exists(path):  # The original is only kept when decoding or encoding failed
+            return "failed", "Could not convert, see the worker log."
+        return "skipped", None
+
+    from texture_batch_optimising_tool import DEFAULT_QUALITY, QUALITY_VALUES, compress_texture
+
+    quality = QUALITY_VALUES.get(options.get("quality_setting"), DEFAULT_QUALITY)
+    return compress_texture(path, quality, options.get("backend", "auto"))
+
+
+def process_chunk(operation, root, options, files, job):
+    """Runs one chunk on the local pools. Returns {"outcomes": {...}, "failed": [[file, detail], ...]}."""
+    # Decoding and Pillow quantizing are CPU bound, pngquant is a subprocess
+    kind = "process" if operation == "convert" or options.get("backend") == "pillow" else "thread"
+    result = {"outcomes": {}, "failed": []}
+    work = instrumentation.instrumented(partial(process_file, operation=operation, root=root, options=options))
+    for relative_path, file_result in job.map(work, files, kind=kind):
+        outcome, detail = instrumentation.collect(file_result)
+        instrumentation.count("files")
+        result["outcomes"][outcome] = result["outcomes"].get(outcome, 0) + 1
+        if outcome == "failed":
+            result["failed"].append([relative_path, detail])
+    return result
+
+
+def run_worker(queue_path, run_id, worker_id=None, root=None, job=None):
+    """Worker: pulls chunks of a run until none are left, heartbeating while it works.
+
+    Chunks that raise (e.g. pngquant missing on this node, the share went away) go back on the
+    queue for another attempt, up to MAX_ATTEMPTS. Per-file failures are part of the result.
+
+    Args:
+        queue_path: The queue database, usually on the shared library mount.
+        run_id: The run to work on.
+        worker_id: Name shown in reports (defaults to host:pid).
+        root: Where this node mounts the library, if not at the coordinator's path.
+
+    Returns:
+        The number of chunks this worker completed.
+    """
+    worker_id = worker_id or default_worker_id()
+    job = job or Job(f"work_queue worker {worker_id}")
+    connection = connect(queue_path)
+    completed = 0
+    try:
+        run = connection.execute("SELECT operation, root, options FROM runs WHERE id = ?", (run_id,)).fetchone()
+        if run is None:
+            raise ValueError(f"Run {run_id} does not exist in {queue_path}")
+        operation, run_root, options = run[0], root or run[1], json.loads(run[2])
+
+        with instrumentation.run(f"work_queue_{operation}"):  # Stage timings of every chunk this worker ran
+            while True:
+                job.check()
+                claimed = claim_chunk(connection, run_id, worker_id)
+                if claimed is None:
+                    if remaining_chunks(connection, run_id) == 0:
+                        break
+                    time.sleep(IDLE_POLL_SECONDS)  # Others hold the rest; their leases may still expire
+                    continue
+
+                chunk_id, files = claimed
+                logger.info(f"[{worker_id}] Processing chunk {chunk_id} ({len(files)} files)")
+                heartbeat = Heartbeat(queue_path, chunk_id, worker_id)
+                heartbeat.start()
+                try:
+                    result = process_chunk(operation, run_root, options, files, job)
+                except Exception as e:
+                    heartbeat.stop()
+                    logger.error(f"[{worker_id}] Chunk {chunk_id} failed: {e}")
+                    connection.execute(
+                        "UPDATE chunks SET state = CASE WHEN attempts >= ? THEN ? ELSE ? END, error = ?, "
+                        "finished_at = ? WHERE id = ? AND worker = ?",
+                        (MAX_ATTEMPTS, FAILED, PENDING, str(e), time.time(), chunk_id, worker_id))
+                    continue
+                except BaseException:
+                    heartbeat.stop()
+                    # Cancelled or interrupted: hand the chunk back without using up an attempt
+                    connection.execute(
+                        "UPDATE chunks SET state = ?, attempts = attempts - 1 WHERE id = ? AND worker = ?",
+                        (PENDING, chunk_id, worker_id))
+                    raise
+                heartbeat.stop()
+                connection.execute(
+                    "UPDATE chunks SET state = ?, result = ?, finished_at = ? WHERE id = ? AND worker = ?",
+                    (DONE, json.dumps(result), time.time(), chunk_id, worker_id))
+                completed += 1
+    finally:
+        connection.close()
+    return completed
+
+
+def merge_report(queue_path, run_id):
+    """Merges the chunk results of a run into one report dict."""
+    connection = connect(queue_path)
+    try:
+        run = connection.execute("SELECT operation, root, options, created_at FROM runs WHERE id = ?",
+                                 (run_id,)).fetchone()
+        if run is None:
+            raise ValueError(f"Run {run_id} does not exist in {queue_path}")
+        rows = connection.execute("SELECT id, files, state, attempts, worker, started_at, finished_at, result, error "
+                                  "FROM chunks WHERE run_id = ? ORDER BY id", (run_id,)).fetchall()
+    finally:
+        connection.close()
+
+    report = {
+        "run_id": run_id,
+        "operation": run[0],
+        "root": run[1],
+        "options": json.loads(run[2]),
+        "files": 0,
+        "chunks": {PENDING: 0, LEASED: 0, DONE: 0, FAILED: 0},
+        "outcomes": {},
+        "failed_files": [],
+        "failed_chunks": [],
+        "workers": {},
+        "retried_chunks": 0,
+    }
+    for chunk_id, files, state, attempts, worker, started_at, finished_at, result, error in rows:
+        files = json.loads(files)
+        report["files"] += len(files)
+        report["chunks"][state] += 1
+        if attempts > 1:
+            report["retried_chunks"] += 1
+        if state == FAILED:
+            report["failed_chunks"].append({"chunk": chunk_id, "files": len(files), "error": error})
+        if state == DONE:
+            result = json.loads(result)
+            for outcome, count in result["outcomes"].items():
+                report["outcomes"][outcome] = report["outcomes"].get(outcome, 0) + count
+            report["failed_files"].extend(result["failed"])
+            stats = report["workers"].setdefault(worker, {"chunks": 0, "files": 0, "seconds": 0.0})
+            stats["chunks"] += 1
+            stats["files"] += len(files)
+            stats["seconds"] += (finished_at or 0) - (started_at or 0)
+    report["complete"] = report["chunks"][PENDING] == 0 and report["chunks"][LEASED] == 0
+    return report
+
+
+def format_report(report):
+    lines = [f"Run {report['run_id']}: {report['operation']} in '{report['root']}' "
+             f"({'complete' if report['complete'] else 'in progress'})",
+             f"Files: {report['files']}  Chunks: " + ", ".join(f"{state} {count}" for state, count in
+                                                                report["chunks"].items()),
+             "Outcomes: " + (", ".join(f"{outcome} {count}" for outcome, count in
+                                       sorted(report["outcomes"].items())) or "none yet"),
+             f"Retried chunks: {report['retried_chunks']}"]
+    for worker, stats in sorted(report["workers"].items()):
+        lines.append(f"  {worker}: {stats['chunks']} chunks, {stats['files']} files, {stats['seconds']:.1f}s")
+    for path, detail in report["failed_files"]:
+        lines.append(f"  Failed file: {path}: {(detail or '').strip()}")
+    for chunk in report["failed_chunks"]:
+        lines.append(f"  Failed chunk {chunk['chunk']} ({chunk['files']} files): {chunk['error']}")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Distribute texture conversion/optimisation over several machines.")
+    parser.add_argument("--queue", help=f"Queue database (default: <root>/{QUEUE_FILE}).")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    create_parser = subparsers.add_parser("create", help="Coordinator: shard a library into chunks.")
+    create_parser.add_argument("operation", choices=OPERATIONS)
+    create_parser.add_argument("root")
+    create_parser.add_argument("--quality", default="Medium", help="Quality preset for compression.")
+    create_parser.add_argument("--backend", default="auto", choices=("auto", "pngquant", "pillow"),
+                               help="Quantizer for compression.")
+    create_parser.add_argument("--preset", default="PNG", help="Encoder preset for conversion (see encoder_presets).")
+    create_parser.add_argument("--mips", type=int, default=0, help="Mip levels written per converted texture.")
+    create_parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+
+    worker_parser = subparsers.add_parser("worker", help="Process chunks until the run is finished.")
+    worker_parser.add_argument("run_id", type=int)
+    worker_parser.add_argument("--root", help="Library path on this node, if mounted elsewhere.")
+    worker_parser.add_argument("--worker-id", help="Name for reports (default: host:pid).")
+
+    report_parser = subparsers.add_parser("report", help="Merge the chunk results into one report.")
+    report_parser.add_argument("run_id", type=int)
+    report_parser.add_argument("--json", help="Also write the report as JSON to this file.")
+    add_logging_arguments(parser)
+    add_profiling_arguments(parser)
+    args = parser.parse_args(argv)
+    setup_logging(args.log_level)
+
+    queue_path = args.queue
+    if queue_path is None:
+        if args.command == "create" or getattr(args, "root", None):
+            queue_path = os.path.join(args.root, QUEUE_FILE)
+        else:
+            parser.error("--queue is required unless a root is given")
+
+    if args.command == "create":
+        run_id, file_count, chunk_count = create_run(queue_path, args.operation, args.root,
+                                                     {"quality_setting": args.quality, "backend": args.backend, "preset": args.preset,
+                                                      "mip_levels": args.mips}, args.chunk_size)
+        print(f"Run {run_id}: {file_count} files in {chunk_count} chunks. Start workers with:\n"
+              f"  python work_queue.py --queue \"{os.path.abspath(queue_path)}\" worker {run_id}")
+    elif args.command == "worker":
+        with profiled(f"work_queue_worker_{args.run_id}", args.profile):
+            completed = run_worker(queue_path, args.run_id, args.worker_id, args.root)
+        print(f"Worker finished after {completed} chunks.")
+        print(format_report(merge_report(queue_path, args.run_id)))
+    elif args.command == "report":
+        report = merge_report(queue_path, args.run_id)
+        print(format_report(report))
+        if args.json:
+            with open(args.json, "w") as f:
+                json.dump(report, f, indent=4)
+        return 0 if report["complete"] and not report["failed_chunks"] else 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())